@@ -29,6 +29,7 @@ import plans.models
 import features.models
 import invoices.models
 import rule_engine.models
+import webhooks.models
 
 target_metadata = [Base.metadata]
 
@@ -1,9 +1,12 @@
+import random
+import reprlib
 from typing import Callable
 
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
 
 from config.logging import logger
+from config.settings import loaded_config
 from utils.common import get_user_data_from_request
 
 
@@ -31,12 +34,39 @@ def sanitize_label(value):
     return value.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
 
 
+log_payload_repr = reprlib.Repr()
+log_payload_repr.maxlevel = 3
+log_payload_repr.maxlist = log_payload_repr.maxtuple = log_payload_repr.maxdict = 10
+log_payload_repr.maxstring = log_payload_repr.maxother = loaded_config.log_payload_max_length
+
+
+def cap_log_payload(payload: dict) -> dict:
+    """
+    Replaces the values of a log payload by reprs of at most `log_payload_max_length` characters,
+    so large results (e.g. lists of ORM rows) cost a few elements to log instead of their full repr.
+    """
+    capped_payload = {}
+    for key, value in payload.items():
+        if isinstance(value, str):
+            value = value[:loaded_config.log_payload_max_length]
+        elif not isinstance(value, (int, float, bool, type(None))):
+            value = log_payload_repr.repr(value)[:loaded_config.log_payload_max_length]
+        capped_payload[key] = value
+    return capped_payload
+
+
 def log_api_requests_to_gcp(request_data, response_data, consumed_time):
+    """
+    Logs a request and its response. Successful ones are only logged for a
+    `log_success_sample_rate` share of the calls.
+    """
+    if response_data['status_code'] == 200 and random.random() >= loaded_config.log_success_sample_rate:
+        return
     api_logs = {
         "status": response_data['status_code'],
         'consumed_time': consumed_time or 0,
-        'request': request_data,
-        'response': response_data
+        'request': cap_log_payload(request_data),
+        'response': cap_log_payload(response_data)
     }
     if response_data['status_code'] == 200:
         logger.info(api_logs)
@@ -22,6 +22,15 @@ parser.add('--realm', help='realm')
 # debug flag
 parser.add('--debug', help='debug', action="store_true")
 parser.add('--postgres_fynix_wayne_read_write', help='postgres_fynix_wayne_read_write')
+parser.add('--db_pool_size', help='db_pool_size', default=10)
+parser.add('--db_max_overflow', help='db_max_overflow', default=20)
+parser.add('--db_pool_timeout', help='db_pool_timeout', default=30)
+parser.add('--db_pool_recycle', help='db_pool_recycle', default=1800)
+parser.add('--db_pool_pre_ping', help='db_pool_pre_ping', default=True)
+parser.add('--db_prepared_statement_cache_size', help='db_prepared_statement_cache_size', default=100)
+parser.add('--postgres_fynix_wayne_read_only', help='postgres_fynix_wayne_read_only')
+parser.add('--db_replica_max_lag_seconds', help='db_replica_max_lag_seconds', default=5)
+parser.add('--db_replica_health_check_interval', help='db_replica_health_check_interval', default=5)
 
 parser.add('--azure_openai_key', help='azure_openai_key')
 parser.add('--azure_openai_endpoint', help='azure_openai_endpoint')
@@ -56,6 +65,13 @@ parser.add('--repo_clone_dir', help='repo_clone_dir')
 parser.add('--serp_api_key', help='serp_api_key')
 parser.add('--ydc_api_key', help='ydc_api_key')
 parser.add('--redis_payments_url', help='redis_payments_url')
+parser.add('--redis_max_connections', help='redis_max_connections', default=50)
+parser.add('--redis_pool_timeout', help='redis_pool_timeout', default=5)
+parser.add('--redis_health_check_interval', help='redis_health_check_interval', default=30)
+parser.add('--redis_socket_timeout', help='redis_socket_timeout', default=5)
+parser.add('--redis_socket_connect_timeout', help='redis_socket_connect_timeout', default=5)
+parser.add('--rule_usage_storage_mode', help='rule_usage_storage_mode', default='keys')
+parser.add('--rule_usage_index_scan_fallback', help='rule_usage_index_scan_fallback', default=False)
 
 # prometheus flag
 parser.add('--prometheus', help='prometheus', action="store_true")
@@ -65,6 +81,9 @@ parser.add('--K8S_POD_NAMESPACE', help='K8S_POD_NAMESPACE')
 parser.add('--K8S_POD_NAME', help='K8S_POD_NAME')
 
 parser.add('--sentry_dsn', help='SENTRY_DSN')
+parser.add('--log_queue_size', help='log_queue_size', default=10000)
+parser.add('--log_success_sample_rate', help='log_success_sample_rate', default=0.1)
+parser.add('--log_payload_max_length', help='log_payload_max_length', default=1000)
 parser.add('--sentry_environment', help='SENTRY_ENVIRONMENT')
 
 parser.add('--google_app_id', help='GOOGLE_APP_ID')
@@ -83,6 +102,26 @@ parser.add('--pro_trial_expiration_time_seconds', help='pro_trial_expiration_tim
 parser.add('--clerk_secret_key', help='clerk_secret_key')
 
 parser.add('--paddle_api_secret', help='paddle_api_secret')
+parser.add('--psp_http_max_connections', help='psp_http_max_connections', default=20)
+parser.add('--psp_http_max_keepalive_connections', help='psp_http_max_keepalive_connections', default=10)
+parser.add('--psp_http_keepalive_expiry', help='psp_http_keepalive_expiry', default=30)
+parser.add('--psp_http_connect_timeout', help='psp_http_connect_timeout', default=5)
+parser.add('--psp_http_read_timeout', help='psp_http_read_timeout', default=30)
+parser.add('--psp_http2', help='psp_http2', default=True)
+parser.add('--psp_circuit_failure_threshold', help='psp_circuit_failure_threshold', default=5)
+parser.add('--psp_circuit_recovery_timeout', help='psp_circuit_recovery_timeout', default=30)
+parser.add('--psp_retry_budget_ratio', help='psp_retry_budget_ratio', default=0.2)
+parser.add('--psp_retry_budget_min_per_second', help='psp_retry_budget_min_per_second', default=1)
+parser.add('--psp_response_cache_ttl', help='psp_response_cache_ttl', default=30)
+parser.add('--webhook_worker_concurrency', help='webhook_worker_concurrency', default=8)
+parser.add('--webhook_max_attempts', help='webhook_max_attempts', default=8)
+parser.add('--webhook_retry_base_delay', help='webhook_retry_base_delay', default=5)
+parser.add('--webhook_lease_timeout', help='webhook_lease_timeout', default=300)
+parser.add('--webhook_poll_interval', help='webhook_poll_interval', default=1)
+parser.add('--webhook_dedup_ttl', help='webhook_dedup_ttl', default=345600)
+parser.add('--downgrade_batch_size', help='downgrade_batch_size', default=1000)
+parser.add('--downgrade_sweep_interval', help='downgrade_sweep_interval', default=300)
+parser.add('--trial_expiry_poll_interval', help='trial_expiry_poll_interval', default=1)
 parser.add('--paddle_client_token', help='paddle_client_token')
 parser.add('--paddle_api_base_url', help='paddle_api_base_url')
 parser.add('--fallback_plan_id', help='fallback_plan_id')
@@ -1,4 +1,8 @@
+import atexit
 import inspect
+import queue
+import sys
+import threading
 from datetime import datetime
 import structlog, logging
 from structlog import contextvars
@@ -19,6 +23,89 @@ def add_call_stack(_, __, event_dict):
     return event_dict
 
 
+LOG_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+
+def snapshot_log_value(value, depth: int = 0):
+    """
+    Copies a log event value into plain data: containers are copied and any other object is
+    replaced by its repr, as the renderers would print it. Deeper than 10 levels the whole
+    value is repr'd.
+    """
+    if isinstance(value, LOG_PRIMITIVE_TYPES):
+        return value
+    if depth < 10:
+        if isinstance(value, dict):
+            return {
+                key if isinstance(key, LOG_PRIMITIVE_TYPES) else repr(key): snapshot_log_value(item, depth + 1)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [snapshot_log_value(item, depth + 1) for item in value]
+    return repr(value)
+
+
+class QueuedLogWriter:
+    """
+    Last structlog processor: hands the event to a background thread that renders and writes
+    it, so JSON serialisation and stdout writes stay off the event loop.
+
+    The event is snapshotted with `snapshot_log_value` before it is queued, so the thread never
+    reads objects the caller may still be changing.
+
+    Events are written in batches of up to `batch_size` lines. When the queue is full new
+    events are dropped rather than blocking the caller, and the writer reports how many.
+    """
+
+    def __init__(self, renderer, max_queue_size: int = 10000, batch_size: int = 100, stream=None):
+        self.renderer = renderer
+        self.batch_size = batch_size
+        self.stream = stream or sys.stdout
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, logger, method_name, event_dict):
+        try:
+            self.queue.put_nowait((logger, method_name, snapshot_log_value(event_dict)))
+        except queue.Full:
+            self.dropped += 1
+        raise structlog.DropEvent
+
+    def close(self, timeout: float = 5.0):
+        """Writes the queued events and stops the writer thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            events = [self.queue.get()]
+            while len(events) < self.batch_size:
+                try:
+                    events.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for event in events:
+                if event is None:
+                    continue
+                try:
+                    lines.append(self.renderer(*event))
+                except Exception as e:
+                    lines.append(f"Failed to render log event {event[1]}: {e}")
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                lines.append(f"Dropped {dropped} log events, the log queue was full")
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            if None in events:
+                return
+
+
 def get_logger(*args, **kwargs) -> BoundLogger:
     """Create structlog logger for logging."""
     if loaded_config.env.lower() == "local":
@@ -35,7 +122,7 @@ def get_logger(*args, **kwargs) -> BoundLogger:
             SentryProcessor(level=logging.ERROR),
             structlog.processors.format_exc_info,
             add_call_stack,
-            renderer
+            QueuedLogWriter(renderer, max_queue_size=loaded_config.log_queue_size)
         ],
         cache_logger_on_first_use=True,
     )
@@ -43,7 +130,8 @@ def get_logger(*args, **kwargs) -> BoundLogger:
 
 
 def get_call_stack():
-    stack = inspect.stack()
+    # Source lines are not needed, reading them made every error log open the caller's files.
+    stack = inspect.stack(context=0)
     call_stack = []
     for frame_info in stack[1:5]:  # Skip the current frame
         call_stack.append({
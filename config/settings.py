@@ -1,3 +1,4 @@
+import asyncio
 import enum
 import os
 from typing import Optional, ClassVar
@@ -7,7 +8,9 @@ from clerk_integration.utils import ClerkAuthHelper
 from pydantic_settings import BaseSettings
 
 from config.config_parser import docker_args
-from utils.connection_manager import ConnectionManager
+from utils.connection_manager import ConnectionManager, ReplicaConnectionManager
+from utils.http_client_manager import HTTPClientManager
+from utils.redis_connection_manager import RedisConnectionManager
 from utils.sqlalchemy import async_db_url
 
 args = docker_args
@@ -35,15 +38,35 @@ class Settings(BaseSettings):
     postgres_fynix_wayne_read_write: str = args.postgres_fynix_wayne_read_write
     db_url: str = async_db_url(args.postgres_fynix_wayne_read_write)
     db_echo: bool = args.debug
+    db_pool_size: int = args.db_pool_size
+    db_max_overflow: int = args.db_max_overflow
+    db_pool_timeout: float = args.db_pool_timeout
+    db_pool_recycle: int = args.db_pool_recycle
+    db_pool_pre_ping: bool = args.db_pool_pre_ping
+    db_prepared_statement_cache_size: int = args.db_prepared_statement_cache_size
+    postgres_fynix_wayne_read_only: Optional[str] = args.postgres_fynix_wayne_read_only or None
+    replica_db_url: Optional[str] = (async_db_url(args.postgres_fynix_wayne_read_only)
+                                     if args.postgres_fynix_wayne_read_only else None)
+    db_replica_max_lag_seconds: float = args.db_replica_max_lag_seconds
+    db_replica_health_check_interval: float = args.db_replica_health_check_interval
     server_type: str = args.server_type
     realm: str = args.realm
     log_level: str = LogLevel.INFO.value
     connection_manager: Optional[ConnectionManager] = None
+    replica_connection_manager: Optional[ReplicaConnectionManager] = None
 
     BASE_DIR: ClassVar[str] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     sentry_sample_rate: float = 1.0
     sentry_environment: str = args.sentry_environment
     redis_payments_url: str = os.getenv("REDIS_FEX_HIRUZEN_READ_WRITE", args.redis_payments_url)
+    redis_max_connections: int = args.redis_max_connections
+    redis_pool_timeout: float = args.redis_pool_timeout
+    redis_health_check_interval: int = args.redis_health_check_interval
+    redis_socket_timeout: float = args.redis_socket_timeout
+    redis_socket_connect_timeout: float = args.redis_socket_connect_timeout
+    redis_connection_manager: Optional[RedisConnectionManager] = None
+    rule_usage_storage_mode: str = args.rule_usage_storage_mode
+    rule_usage_index_scan_fallback: bool = args.rule_usage_index_scan_fallback
     trial_expiration_time: int = args.pro_trial_expiration_time_seconds
     razorpay_api_base_url: str = args.razorpay_api_base_url
     razorpay_api_key: str = args.razorpay_api_key
@@ -52,13 +75,40 @@ class Settings(BaseSettings):
     paddle_api_base_url: str = args.paddle_api_base_url
     paddle_api_secret: str = args.paddle_api_secret
     paddle_client_token: str = args.paddle_client_token
+    psp_http_max_connections: int = args.psp_http_max_connections
+    psp_http_max_keepalive_connections: int = args.psp_http_max_keepalive_connections
+    psp_http_keepalive_expiry: float = args.psp_http_keepalive_expiry
+    psp_http_connect_timeout: float = args.psp_http_connect_timeout
+    psp_http_read_timeout: float = args.psp_http_read_timeout
+    psp_http2: bool = args.psp_http2
+    psp_circuit_failure_threshold: int = args.psp_circuit_failure_threshold
+    psp_circuit_recovery_timeout: float = args.psp_circuit_recovery_timeout
+    psp_retry_budget_ratio: float = args.psp_retry_budget_ratio
+    psp_retry_budget_min_per_second: float = args.psp_retry_budget_min_per_second
+    psp_response_cache_ttl: int = args.psp_response_cache_ttl
+    webhook_worker_concurrency: int = args.webhook_worker_concurrency
+    webhook_max_attempts: int = args.webhook_max_attempts
+    webhook_retry_base_delay: float = args.webhook_retry_base_delay
+    webhook_lease_timeout: int = args.webhook_lease_timeout
+    webhook_poll_interval: float = args.webhook_poll_interval
+    webhook_dedup_ttl: int = args.webhook_dedup_ttl
+    downgrade_batch_size: int = args.downgrade_batch_size
+    downgrade_sweep_interval: int = args.downgrade_sweep_interval
+    trial_expiry_poll_interval: float = args.trial_expiry_poll_interval
+    http_client_manager: Optional[HTTPClientManager] = None
 
     sentry_dsn: Optional[str] = args.sentry_dsn
+    log_queue_size: int = args.log_queue_size
+    log_success_sample_rate: float = args.log_success_sample_rate
+    log_payload_max_length: int = args.log_payload_max_length
 
     POD_NAMESPACE: str = args.K8S_POD_NAMESPACE
     NODE_NAME: str = args.K8S_NODE_NAME
     POD_NAME: str = args.K8S_POD_NAME
     aps_scheduler: Optional[AsyncIOScheduler] = None
+    plan_rules_invalidation_task: Optional[asyncio.Task] = None
+    replica_health_task: Optional[asyncio.Task] = None
+    webhook_workers_task: Optional[asyncio.Task] = None
 
     clerk_secret_key: str = args.clerk_secret_key
     clerk_auth_helper: ClerkAuthHelper = ClerkAuthHelper("Wayne", clerk_secret_key=clerk_secret_key)
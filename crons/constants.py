@@ -0,0 +1 @@
+TRIAL_EXPIRY_QUEUE_KEY = "trial_expiry_queue"
@@ -1,47 +1,93 @@
 from config.settings import loaded_config
+from crons.constants import TRIAL_EXPIRY_QUEUE_KEY
 from payments.dao import PaymentsDAO
 from payments.schemas import PlanSlugs
 from plans.dao import PlansDAO
 from rule_engine.services import RulesService
-from utils.connection_handler import ConnectionHandler
+from utils.connection_handler import connection_handler_scope
+from utils.delayed_queue import DelayedQueue
+from utils.redis_client import RedisClient
 from config.logging import get_call_stack, logger
 
 
 
 async def downgrade_users_to_basic():
-    """Fetch all users whose trial period has expired and downgrade them to the Basic Plan."""
-    connection_handler = ConnectionHandler(connection_manager=loaded_config.connection_manager)
-    payments_dao = PaymentsDAO(session=connection_handler.session)
-    plans_dao = PlansDAO(session=connection_handler.session)
-    rules_dao = RulesService(connection_handler)
-
-    try:
-        expired_trials = await payments_dao.get_expired_trials()
-        print(expired_trials)
-        if not expired_trials:
-            logger.info("No expired trials found.")
-            return
-
-        basic_plan = await plans_dao.get_plan_by_slug(PlanSlugs.BASIC.value)
-        if not basic_plan:
-            logger.error("Basic plan not found, cannot proceed with downgrade.")
-            return
-
-        for trial in expired_trials:
-            try:
-                logger.info("Downgrading user %s in org %s to Basic Plan.", trial.user_id, trial.org_id)
-                trial.plan_id = basic_plan.id
-                trial.status = "active"
-                await payments_dao.update_subscription(trial)
-                await payments_dao.mark_scheduled_downgrade_completed(trial.user_id, trial.org_id)
-                logger.info("Successfully downgraded user %s to Basic Plan.", str(trial.user_id))
-                await rules_dao.delete_plan_related_keys(user_id=trial.user_id, org_id=trial.org_id)
-            except Exception as e:
-                logger.error("Error while downgrading user %s: %s", trial.user_id, str(e))
-
-    except Exception as e:
-        await connection_handler.session.rollback()
-        logger.error("An error occurred while downgrading users: %s", str(e))
-        raise e
-    finally:
-        await connection_handler.session.close()
\ No newline at end of file
+    """
+    Downgrade every user whose trial period has expired to the Basic Plan.
+
+    Most trials are downgraded by `downgrade_due_trials` as soon as they expire; this sweep catches
+    the ones missing from the trial expiry queue (e.g. Redis was unavailable when they were queued).
+
+    Expired trials are processed in chunks of `downgrade_batch_size`: each chunk is downgraded
+    and its scheduled downgrades completed in one transaction, then the usage counters of the
+    downgraded users are deleted in one Redis pipeline.
+    """
+    async with connection_handler_scope() as connection_handler:
+        payments_dao = PaymentsDAO(session=connection_handler.session)
+        plans_dao = PlansDAO(session=connection_handler.session)
+        rules_service = RulesService(connection_handler)
+
+        try:
+            basic_plan = await plans_dao.get_plan_by_slug(PlanSlugs.BASIC.value)
+            if not basic_plan:
+                logger.error("Basic plan not found, cannot proceed with downgrade.")
+                return
+
+            total_downgraded = 0
+            while True:
+                claimed, downgraded = await payments_dao.downgrade_expired_trials(
+                    basic_plan.id, loaded_config.downgrade_batch_size
+                )
+                if downgraded:
+                    total_downgraded += len(downgraded)
+                    try:
+                        await rules_service.delete_plan_related_keys_batch(downgraded)
+                    except Exception as e:
+                        logger.error("Error while deleting usage of %d downgraded users: %s", len(downgraded), str(e))
+                if claimed < loaded_config.downgrade_batch_size:
+                    break
+
+            if total_downgraded:
+                logger.info("Downgraded %d expired trials to Basic Plan.", total_downgraded)
+            else:
+                logger.info("No expired trials found.")
+
+        except Exception as e:
+            logger.error("An error occurred while downgrading users: %s", str(e), call_stack=get_call_stack())
+            raise e
+
+
+async def downgrade_due_trials():
+    """
+    Downgrade the trials that are due in the trial expiry queue to the Basic Plan.
+
+    Runs every `trial_expiry_poll_interval` seconds and only touches the database when a trial is due.
+    Trials popped from the queue but not downgraded (e.g. the database was unavailable) are left to
+    the `downgrade_users_to_basic` sweep.
+    """
+    trial_expiry_queue = DelayedQueue(RedisClient(), TRIAL_EXPIRY_QUEUE_KEY)
+    downgrade_ids = await trial_expiry_queue.pop_due(loaded_config.downgrade_batch_size)
+    if not downgrade_ids:
+        return
+
+    async with connection_handler_scope() as connection_handler:
+        payments_dao = PaymentsDAO(session=connection_handler.session)
+        plans_dao = PlansDAO(session=connection_handler.session)
+        rules_service = RulesService(connection_handler)
+
+        try:
+            basic_plan = await plans_dao.get_plan_by_slug(PlanSlugs.BASIC.value)
+            if not basic_plan:
+                logger.error("Basic plan not found, cannot proceed with downgrade.")
+                return
+
+            _, downgraded = await payments_dao.downgrade_expired_trials(
+                basic_plan.id, len(downgrade_ids), downgrade_ids
+            )
+            if downgraded:
+                await rules_service.delete_plan_related_keys_batch(downgraded)
+            logger.info("Downgraded %d of %d due trials to Basic Plan.", len(downgraded), len(downgrade_ids))
+
+        except Exception as e:
+            logger.error("An error occurred while downgrading due trials: %s", str(e), call_stack=get_call_stack())
+            raise e
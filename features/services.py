@@ -19,11 +19,12 @@ from config.logging import logger
 class FeaturesService:
     def __init__(self, connection_handler):
         self.session: AsyncSession = connection_handler.session
+        self.read_session: AsyncSession = connection_handler.read_session
 
     @latency(metric=DB_QUERY_LATENCY)
     async def get_all_features(self):
         try:
-            result = await self.session.execute(select(Feature))
+            result = await self.read_session.execute(select(Feature))
             features = result.scalars().all()
             return features
         except Exception as e:
@@ -89,7 +90,7 @@ class FeaturesService:
     @latency(metric=DB_QUERY_LATENCY)
     async def get_features_for_plan(self, plan_id: str):
         try:
-            result = await self.session.execute(
+            result = await self.read_session.execute(
                 select(Feature).join(PlanFeature).filter(PlanFeature.plan_id == plan_id)
             )
             features = result.scalars().all()
@@ -163,7 +164,7 @@ class FeaturesService:
     async def get_features_by_service(self, service: BackendService):
         """Retrieve features filtered by backend service."""
         try:
-            result = await self.session.execute(
+            result = await self.read_session.execute(
                 select(Feature).filter(Feature.be_service == service.value)
             )
             features = result.scalars().all()
@@ -1,9 +1,102 @@
 import asyncio
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
 from enum import Enum
+from typing import Dict, Optional
 
 import httpx
+from redis.exceptions import RedisError
 
 from config.logging import logger
+from config.settings import loaded_config
+from prometheus.metrics import PSP_REQUEST_LATENCY, PSP_RETRIES_DENIED
+from utils.cache import ReadThroughCache
+from utils.circuit_breaker import CircuitBreaker, RetryBudget
+from utils.http_client_manager import HTTPClientManager
+from utils.redis_client import RedisClient
+
+# Path segments that are not plain resource names (`sub_Nx1...`, `txn_01h...`) are IDs.
+ENDPOINT_ID_SEGMENT = re.compile(r"/(?![a-z-]+(?:/|$))[^/]+")
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# A provider asking to back off for longer than this is treated as down rather than waited for.
+MAX_RETRY_AFTER_SECONDS = 30
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_retry_budget: Optional[RetryBudget] = None
+
+
+class PSPRequestError(ValueError):
+    """Raised when a provider answers with an error status."""
+
+    def __init__(self, status_code: int, response_text: str):
+        self.status_code = status_code
+        super().__init__(f"API call failed: {response_text}")
+
+
+def get_http_client_manager() -> HTTPClientManager:
+    """
+    Returns the process-wide HTTP client manager, creating it on first use
+    for entrypoints (scripts, tests) that never ran `init_connections`.
+    """
+    if not loaded_config.http_client_manager:
+        loaded_config.http_client_manager = HTTPClientManager(
+            max_connections=loaded_config.psp_http_max_connections,
+            max_keepalive_connections=loaded_config.psp_http_max_keepalive_connections,
+            keepalive_expiry=loaded_config.psp_http_keepalive_expiry,
+            connect_timeout=loaded_config.psp_http_connect_timeout,
+            read_timeout=loaded_config.psp_http_read_timeout,
+            http2=loaded_config.psp_http2,
+        )
+    return loaded_config.http_client_manager
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker of a provider."""
+    if name not in _circuit_breakers:
+        _circuit_breakers[name] = CircuitBreaker(
+            name=name,
+            failure_threshold=loaded_config.psp_circuit_failure_threshold,
+            recovery_timeout=loaded_config.psp_circuit_recovery_timeout,
+        )
+    return _circuit_breakers[name]
+
+
+def get_retry_budget() -> RetryBudget:
+    """Returns the retry budget shared by every provider call of the process."""
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget(
+            ratio=loaded_config.psp_retry_budget_ratio,
+            min_retries_per_second=loaded_config.psp_retry_budget_min_per_second,
+        )
+    return _retry_budget
+
+
+def is_retryable_status(method: str, status_code: int) -> bool:
+    """A 429 was not processed and is always safe to retry, a 5xx only for idempotent methods."""
+    return status_code == 429 or (status_code >= 500 and method.upper() in IDEMPOTENT_METHODS)
+
+
+def get_retry_after(response: httpx.Response) -> Optional[float]:
+    """Parses the Retry-After header, given either in seconds or as an HTTP date."""
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_endpoint_label(endpoint: str) -> str:
+    """Turns `/subscriptions/sub_123/cancel` into `/subscriptions/{id}/cancel` for metric labels."""
+    return ENDPOINT_ID_SEGMENT.sub("/{id}", endpoint)
 
 
 class AuthMethod(str, Enum):
@@ -16,8 +109,10 @@ class BaseAPIClient:
     Base class for API clients to handle common operations.
     """
 
-    def __init__(self, base_url: str, api_secret: str, auth_method: AuthMethod = AuthMethod.BASIC):
+    def __init__(self, base_url: str, api_secret: str, auth_method: AuthMethod = AuthMethod.BASIC,
+                 name: str = "psp"):
         self.base_url = base_url
+        self.name = name
         self.api_secret = api_secret
         self.headers = {
             "Content-Type": "application/json",
@@ -25,24 +120,56 @@ class BaseAPIClient:
         }
 
     async def _make_request(self, method: str, endpoint: str, json: dict = None, retries: int = 3,
-                            backoff_factor: float = 1.5):
+                            backoff_factor: float = 1.5, use_circuit_breaker: bool = True):
         """
         Makes an HTTP request with retry logic.
 
+        Connection errors and 429s are retried for every method, 5xx only for idempotent ones.
+        Waits honour Retry-After and otherwise use full-jitter exponential backoff, and every
+        retry draws from the process-wide retry budget. Calls fail fast while the provider's
+        circuit breaker is open.
+
         :param method: HTTP method (e.g., GET, POST).
         :param endpoint: API endpoint.
         :param json: JSON payload for the request.
         :param retries: Number of retry attempts.
         :param backoff_factor: Time in seconds to wait between retries.
+        :param use_circuit_breaker: Whether the call goes through the provider's circuit breaker.
+        :raises CircuitBreakerOpenError: If the provider's circuit breaker is open.
+        :raises PSPRequestError: If the provider answers with an error status.
         """
         url = f"{self.base_url}{endpoint}"
+        endpoint_label = get_endpoint_label(endpoint)
+        client = get_http_client_manager().get_client(self.base_url)
+        circuit_breaker = get_circuit_breaker(self.name) if use_circuit_breaker else None
+        retry_budget = get_retry_budget()
+        retry_budget.record_request()
         attempt = 0
 
-        while attempt < retries:
+        while True:
             attempt += 1
+            if circuit_breaker:
+                circuit_breaker.before_call()
+            start_time = time.perf_counter()
+            retry_after = None
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(method, url, headers=self.headers, json=json)
+                response = await client.request(method, url, headers=self.headers, json=json)
+            except httpx.RequestError as exc:
+                self._observe_latency(method, endpoint_label, "error", start_time)
+                if circuit_breaker:
+                    circuit_breaker.record_failure()
+                logger.warning(
+                    "Request error during API call: %s %s. Attempt %d/%d. Error: %s",
+                    method, url, attempt, retries, str(exc)
+                )
+                error = exc
+            else:
+                self._observe_latency(method, endpoint_label, response.status_code, start_time)
+                if circuit_breaker:
+                    if response.status_code >= 500:
+                        circuit_breaker.record_failure()
+                    else:
+                        circuit_breaker.record_success()
 
                 if response.status_code in (200, 201, 202):
                     if attempt > 1:
@@ -61,19 +188,63 @@ class BaseAPIClient:
                     "API call failed: %s %s [Status Code: %d] Response: %s",
                     method, url, response.status_code, response.text
                 )
-                raise ValueError(f"API call failed: {response.text}")
+                error = PSPRequestError(response.status_code, response.text)
+                if not is_retryable_status(method, response.status_code):
+                    raise error
+                retry_after = get_retry_after(response)
 
-            except httpx.RequestError as exc:
-                if attempt < retries:
-                    wait_time = backoff_factor * (2 ** (attempt - 1))
-                    logger.warning(
-                        "Request error during API call: %s %s. Attempt %d/%d. Retrying in %.2f seconds. Error: %s",
-                        method, url, attempt, retries, wait_time, str(exc)
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(
-                        "Exhausted all retries for API call: %s %s. Error: %s",
-                        method, url, str(exc)
-                    )
-                    raise exc
+            if attempt >= retries or (retry_after or 0) > MAX_RETRY_AFTER_SECONDS:
+                logger.error(
+                    "Exhausted all retries for API call: %s %s. Error: %s",
+                    method, url, str(error)
+                )
+                raise error
+            if not retry_budget.try_acquire():
+                PSP_RETRIES_DENIED.labels(psp=self.name, service_name="wayne").inc()
+                logger.error("Retry budget exhausted, not retrying API call: %s %s", method, url)
+                raise error
+
+            wait_time = retry_after if retry_after is not None else random.uniform(
+                0, backoff_factor * (2 ** (attempt - 1)))
+            logger.warning(
+                "Retrying API call %s %s in %.2f seconds (attempt %d/%d)",
+                method, url, wait_time, attempt + 1, retries
+            )
+            await asyncio.sleep(wait_time)
+
+    async def _get_cached(self, endpoint: str):
+        """
+        GETs an endpoint through the PSP response cache, a Redis entry per endpoint (and so per
+        object ID) kept for `psp_response_cache_ttl` seconds. A TTL of 0 disables the cache.
+
+        Callers changing the object, webhooks included, drop the entry with `_invalidate_cached`,
+        which also keeps a GET already in flight from caching what it read before the change.
+        """
+        if not loaded_config.psp_response_cache_ttl:
+            return await self._make_request("GET", endpoint)
+        try:
+            return await self._get_response_cache().get(
+                self._get_cache_key(endpoint), lambda: self._make_request("GET", endpoint)
+            )
+        except RedisError as e:
+            logger.warning("PSP response cache unavailable, calling %s directly: %s", endpoint, str(e))
+            return await self._make_request("GET", endpoint)
+
+    async def _invalidate_cached(self, *endpoints: str):
+        for endpoint in endpoints:
+            try:
+                await self._get_response_cache().invalidate(self._get_cache_key(endpoint))
+            except RedisError as e:
+                logger.error("Failed to invalidate cached PSP response %s: %s", endpoint, str(e))
+
+    @staticmethod
+    def _get_response_cache() -> ReadThroughCache:
+        return ReadThroughCache(RedisClient(), expiration=loaded_config.psp_response_cache_ttl, versioned=True)
+
+    def _get_cache_key(self, endpoint: str) -> str:
+        return f"psp_response:{self.name}:{endpoint}"
+
+    def _observe_latency(self, method: str, endpoint: str, status, start_time: float):
+        PSP_REQUEST_LATENCY.labels(
+            psp=self.name, method=method, endpoint=endpoint, status=str(status), service_name="wayne"
+        ).observe(time.perf_counter() - start_time)
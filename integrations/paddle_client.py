@@ -1,5 +1,9 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
 from config.settings import loaded_config
 from integrations.base_client import BaseAPIClient, AuthMethod
+from payments.models import ProviderName
 from plans.schemas import PlanSchema
 from utils.common import UserData
 
@@ -10,7 +14,8 @@ class PaddleClient(BaseAPIClient):
         super().__init__(
             base_url=loaded_config.paddle_api_base_url,
             api_secret=loaded_config.paddle_api_secret,
-            auth_method=AuthMethod.BEARER
+            auth_method=AuthMethod.BEARER,
+            name=ProviderName.PADDLE.value
         )
 
     async def create_transaction(self, plan_details, subscription_details, subscription_id, user_data: UserData):
@@ -62,10 +67,27 @@ class PaddleClient(BaseAPIClient):
         }
 
     async def get_transaction_invoice(self, transaction_id: str):
-        return await self._make_request("GET", f"/transactions/{transaction_id}/invoice")
+        return await self._get_cached(f"/transactions/{transaction_id}/invoice")
 
     async def get_subscription_details(self, subscription_id: str):
-        return await self._make_request("GET", f"/subscriptions/{subscription_id}")
+        return await self._get_cached(f"/subscriptions/{subscription_id}")
+
+    async def invalidate_subscription_details(self, subscription_id: str):
+        await self._invalidate_cached(f"/subscriptions/{subscription_id}")
+
+    @staticmethod
+    def parse_billing_period(billing_period: Optional[dict]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Converts a Paddle `billing_period` / `current_billing_period` object into
+        (current_start, current_end) epoch seconds.
+        """
+        if not billing_period:
+            return None, None
+        return tuple(
+            int(datetime.strptime(billing_period[field], "%Y-%m-%dT%H:%M:%S.%fZ").timestamp())
+            if billing_period.get(field) else None
+            for field in ("starts_at", "ends_at")
+        )
 
     async def end_subscription(self, subscription_id):
         effective_from = "immediately" if loaded_config.subscription_cancellation_at == "immediately" \
@@ -74,4 +96,6 @@ class PaddleClient(BaseAPIClient):
             "effective_from": effective_from
         }
 
-        return await self._make_request("POST", f"/subscriptions/{subscription_id}/cancel", payload)
+        response = await self._make_request("POST", f"/subscriptions/{subscription_id}/cancel", payload)
+        await self.invalidate_subscription_details(subscription_id)
+        return response
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta, timezone
 from config.settings import loaded_config
+from config.logging import logger
 from integrations.base_client import BaseAPIClient
+from payments.models import ProviderName
 from clerk_integration.utils import UserData
 from utils.date_helper import DateHelper
 
@@ -12,7 +14,8 @@ class RazorpayClient(BaseAPIClient):
     def __init__(self, api_secret: str = None):
         super().__init__(
             base_url=loaded_config.razorpay_api_base_url,
-            api_secret=api_secret or loaded_config.razorpay_api_secret
+            api_secret=api_secret or loaded_config.razorpay_api_secret,
+            name=ProviderName.RAZORPAY.value
         )
 
     async def create_subscription(self, plan_id: str, total_count: int = 100, quantity: int = 1, notify: bool = True):
@@ -32,7 +35,9 @@ class RazorpayClient(BaseAPIClient):
         Cancel a subscription.
         """
         body = {"cancel_at_cycle_end": cancel_at_end}
-        return await self._make_request("POST", f"/subscriptions/{subscription_id}/cancel", body)
+        response = await self._make_request("POST", f"/subscriptions/{subscription_id}/cancel", body)
+        await self.invalidate_subscription_details(subscription_id)
+        return response
 
     async def create_plan(self, plan_details):
         """
@@ -54,13 +59,18 @@ class RazorpayClient(BaseAPIClient):
         """
         Fetch invoice details.
         """
-        return await self._make_request("GET", f"/invoices/{invoice_id}")
+        return await self._get_cached(f"/invoices/{invoice_id}")
+
+    async def invalidate_invoice_details(self, invoice_id: str):
+        await self._invalidate_cached(f"/invoices/{invoice_id}")
 
     async def issue_invoice(self, invoice_id: str):
         """
         Issue an invoice.
         """
-        return await self._make_request("POST", f"/invoices/{invoice_id}/issue")
+        response = await self._make_request("POST", f"/invoices/{invoice_id}/issue")
+        await self.invalidate_invoice_details(invoice_id)
+        return response
 
     async def draft_invoice(self, customer_id, plan_name, plan_amount, plan_currency, plan_description):
         """
@@ -95,11 +105,25 @@ class RazorpayClient(BaseAPIClient):
     async def get_payment_downtimes(self):
         """
         Get downtimes of the payments gateways
-        """
-        return await self._make_request("GET", "/payments/downtimes")
+
+        The downtime endpoint bypasses the circuit breaker so it can keep being polled. Downtimes
+        are only reported: they concern a payment method, not the Razorpay API this client calls.
+        """
+        downtimes = await self._make_request("GET", "/payments/downtimes", use_circuit_breaker=False)
+        ongoing_downtimes = [
+            downtime for downtime in downtimes.get("items") or []
+            if downtime.get("status") == "started" and downtime.get("severity") == "high"
+        ]
+        if ongoing_downtimes:
+            logger.warning("Razorpay reports %d ongoing high severity downtimes: %s", len(ongoing_downtimes),
+                           ", ".join(str(downtime.get("method")) for downtime in ongoing_downtimes))
+        return downtimes
 
     async def get_subscription_details(self, subscription_id):
         """
-        Get downtimes of the payments gateways
+        Get subscription details
         """
-        return await self._make_request("GET", f"/subscriptions/{subscription_id}")
\ No newline at end of file
+        return await self._get_cached(f"/subscriptions/{subscription_id}")
+
+    async def invalidate_subscription_details(self, subscription_id: str):
+        await self._invalidate_cached(f"/subscriptions/{subscription_id}")
\ No newline at end of file
@@ -2,7 +2,7 @@ import time
 from typing import Optional
 
 import uuid6
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -14,6 +14,7 @@ from invoices.exceptions import (
 from invoices.models import Invoice
 from prometheus.metrics import DB_QUERY_LATENCY
 from utils.decorators import latency
+from utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
 
 
 class InvoicesDAO:
@@ -86,6 +87,21 @@ class InvoicesDAO:
             logger.error("Error fetching invoice by ID %s: %s", str(invoice_id), str(e))
             raise InvoiceError(detail=f"Database error while fetching invoice by ID {invoice_id}")
 
+    @latency(metric=DB_QUERY_LATENCY)
+    async def has_invoice_for_transaction(self, transaction_id: str) -> bool:
+        """
+        Whether an invoice was already recorded for a PSP transaction (a Razorpay payment or a
+        Paddle transaction), so webhook retries do not record it twice.
+        """
+        try:
+            result = await self.session.execute(
+                select(Invoice.id).filter(Invoice.transaction_id == transaction_id).limit(1)
+            )
+            return result.scalar() is not None
+        except Exception as e:
+            logger.error("Error fetching invoice for transaction %s: %s", str(transaction_id), str(e))
+            raise e
+
     @latency(metric=DB_QUERY_LATENCY)
     async def get_latest_invoice_by_subscription_id(self, subscription_id: str):
         """
@@ -129,33 +145,39 @@ class InvoicesDAO:
             raise e
 
     @latency(metric=DB_QUERY_LATENCY)
-    async def get_user_invoices_paginated(self, user_id: str, org_id: str, page: int = 1, page_size: int = 10) -> dict:
+    async def get_user_invoices_paginated(self, user_id: str, org_id: str, page: int = 1, page_size: int = 10,
+                                          cursor: Optional[str] = None) -> dict:
         """
-        Fetch invoices for a user with pagination.
+        Fetch invoices for a user, newest first.
+
+        Pages are read with a keyset on (invoice_date, id) through the `ix_invoices_user_org_date_id`
+        index: pass the `next_cursor` of a page as `cursor` to get the following one. `page` is only
+        used, as an offset, when no cursor is given.
 
         :param user_id: The user ID to fetch invoices for.
         :param org_id: The org ID to fetch invoices for.
-        :param page: The page number (1-based index).
+        :param page: The page number (1-based index), ignored when `cursor` is given.
         :param page_size: The number of invoices per page.
+        :param cursor: The `next_cursor` returned with the previous page.
         :return: A dictionary containing the invoices and pagination details.
         """
         try:
-            offset = (page - 1) * page_size
-            total_invoices_query = await self.session.execute(
-                select(func.count()).select_from(Invoice).filter(Invoice.user_id == user_id, Invoice.org_id == org_id)
-            )
-            total_invoices = total_invoices_query.scalar()
-
-            result = await self.session.execute(
+            query = (
                 select(Invoice)
                 .filter(Invoice.user_id == user_id, Invoice.org_id == org_id)
-                .offset(offset)
-                .limit(page_size)
-                .order_by(Invoice.invoice_date.desc())
+                .order_by(Invoice.invoice_date.desc(), Invoice.id.desc())
+                .limit(page_size + 1)
             )
+            if cursor:
+                invoice_date, invoice_id = decode_cursor(cursor)
+                query = query.filter(tuple_(Invoice.invoice_date, Invoice.id) < tuple_(invoice_date, invoice_id))
+            elif page > 1:
+                query = query.offset((page - 1) * page_size)
 
+            result = await self.session.execute(query)
             invoices = result.scalars().all()
-            total_pages = (total_invoices + page_size - 1) // page_size  # Ceiling division
+            has_more = len(invoices) > page_size
+            invoices = invoices[:page_size]
 
             logger.info("Fetched %d invoices for user ID: %s", len(invoices), str(user_id))
             invoices_list = []
@@ -177,16 +199,29 @@ class InvoicesDAO:
             return {
                 "invoices": invoices_list,
                 "pagination": {
-                    "current_page": page,
+                    "current_page": None if cursor else page,
                     "page_size": page_size,
-                    "total_invoices": total_invoices,
-                    "total_pages": total_pages,
+                    "has_more": has_more,
+                    "next_cursor": encode_cursor(invoices[-1].invoice_date, invoices[-1].id) if has_more else None,
                 },
             }
+        except InvalidCursorError as e:
+            raise InvoiceError(detail=str(e))
         except Exception as e:
             logger.error("Error fetching invoices for user ID %s with pagination: %s", str(user_id), str(e))
             raise InvoiceError(detail="Error fetching invoices with pagination.")
 
+    @latency(metric=DB_QUERY_LATENCY)
+    async def count_user_invoices(self, user_id: str, org_id: str) -> int:
+        try:
+            result = await self.session.execute(
+                select(func.count()).select_from(Invoice).filter(Invoice.user_id == user_id, Invoice.org_id == org_id)
+            )
+            return result.scalar()
+        except Exception as e:
+            logger.error("Error counting invoices for user ID %s: %s", str(user_id), str(e))
+            raise InvoiceError(detail="Error counting invoices.")
+
     @latency(metric=DB_QUERY_LATENCY)
     async def get_user_invoice(self, invoice_id: str, user_id: str, org_id: str):
         try:
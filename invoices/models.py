@@ -23,7 +23,7 @@ class Invoice(TimestampMixin, Base):
     meta_data = Column(JSONB, nullable=True, default=dict)
 
     __table_args__ = (
-        Index('ix_invoices_user_org', 'user_id', 'org_id'),
+        Index('ix_invoices_user_org_date_id', 'user_id', 'org_id', 'invoice_date', 'id'),
     )
 
     def to_dict(self):
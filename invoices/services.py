@@ -1,3 +1,5 @@
+from typing import Optional
+
 from integrations.paddle_client import PaddleClient
 from integrations.razorpay_client import RazorpayClient
 from invoices.dao import InvoicesDAO
@@ -5,14 +7,20 @@ from invoices.schemas import CreateInvoiceSchema
 from payments.dao import PaymentsDAO
 from payments.models import ProviderName
 from plans.dao import PlansDAO
+from utils.cache import ReadThroughCache
 from utils.connection_handler import ConnectionHandler
+from utils.redis_client import RedisClient
 from utils.sqlalchemy import get_current_time
 
+# Totals are only an indication for the UI, a minute of staleness saves a COUNT(*) per page.
+INVOICES_COUNT_CACHE_EXPIRATION = 60
+
 
 class InvoicesService:
     def __init__(self, connection_handler: ConnectionHandler):
         self.connection_handler = connection_handler
         self.invoices_dao = InvoicesDAO(session=self.connection_handler.session)
+        self.invoices_read_dao = InvoicesDAO(session=self.connection_handler.read_session)
         self.payments_dao = PaymentsDAO(session=self.connection_handler.session)
         self.plans_dao = PlansDAO(session=self.connection_handler.session)
         self.razorpay_client = RazorpayClient()
@@ -46,18 +54,29 @@ class InvoicesService:
         draft_invoice = await self.invoices_dao.create_invoice(**invoice_data)
         return draft_invoice
 
-    async def get_invoices(self, user_id: str, org_id: str, page, page_size):
+    async def get_invoices(self, user_id: str, org_id: str, page, page_size, cursor: Optional[str] = None,
+                           include_total: bool = False):
         """
         Get all invoices for a user
 
         :param user_id: user id in db.
         :param org_id: org id in db.
-        :param page: page number.
+        :param page: page number, ignored when a cursor is given.
         :param page_size: number of records in a page.
+        :param cursor: `next_cursor` of the previous page.
+        :param include_total: whether to add the (cached) invoice count and page count.
         :return: Invoices of the user.
         :raises InvoiceError: If invoice creation fails.
         """
-        return await self.invoices_dao.get_user_invoices_paginated(user_id, org_id, page, page_size)
+        invoices = await self.invoices_read_dao.get_user_invoices_paginated(user_id, org_id, page, page_size, cursor)
+        if include_total:
+            total_invoices = await ReadThroughCache(RedisClient(), expiration=INVOICES_COUNT_CACHE_EXPIRATION).get(
+                f"invoices_count:{user_id}:{org_id}",
+                lambda: self.invoices_read_dao.count_user_invoices(user_id, org_id)
+            )
+            invoices["pagination"]["total_invoices"] = total_invoices
+            invoices["pagination"]["total_pages"] = (total_invoices + page_size - 1) // page_size
+        return invoices
 
     async def get_invoice(self, invoice_id: str, user_id: str, org_id: str):
         """
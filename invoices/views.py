@@ -1,3 +1,5 @@
+from typing import Optional
+
 from clerk_integration.utils import UserData
 from fastapi import Depends, Query
 
@@ -14,6 +16,8 @@ from utils.serializers import ResponseData
 async def get_invoices(
         page: int = Query(1, ge=1, description="Page number (must be 1 or greater)"),
         page_size: int = Query(10, ge=1, description="Number of records per page (must be 1 or greater)"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page, takes precedence over page"),
+        include_total: bool = Query(False, description="Include the total number of invoices and pages"),
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
         user_data: UserData = Depends(get_user_data_from_request)
 ):
@@ -22,7 +26,8 @@ async def get_invoices(
     """
     response_data = ResponseData.model_construct(success=True)
     invoices_service = InvoicesService(connection_handler=connection_handler)
-    invoice_details = await invoices_service.get_invoices(user_data.userId, user_data.orgId, page, page_size)
+    invoice_details = await invoices_service.get_invoices(user_data.userId, user_data.orgId, page, page_size,
+                                                          cursor, include_total)
     response_data.data = invoice_details
     return response_data
 
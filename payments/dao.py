@@ -1,19 +1,26 @@
 import time
+from typing import List, Optional, Tuple
 
 import uuid6
+from redis.exceptions import RedisError
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import class_mapper, aliased
+from sqlalchemy.orm import class_mapper
 
 from config.logging import logger
 from config.settings import loaded_config
+from crons.constants import TRIAL_EXPIRY_QUEUE_KEY
 from payments.exceptions import SubscriptionNotFoundError
 from payments.models import BillingCycle, PSPName, Subscriptions, Customer, ScheduledDowngrade
 from payments.schemas import CreateSubscription, PlanSlugs
 from plans.dao import PlansDAO
+from plans.models import Plan
 from prometheus.metrics import DB_QUERY_LATENCY
 from utils.common import UserData
 from utils.decorators import latency
+from utils.delayed_queue import DelayedQueue
+from utils.redis_client import RedisClient
 
 
 class PaymentsDAO:
@@ -191,6 +198,27 @@ class PaymentsDAO:
             logger.error("Database error while fetching user and org id: %s", str(e))
             raise e
 
+    @latency(metric=DB_QUERY_LATENCY)
+    async def get_active_subscription_with_plan(self, user_id: str, org_id: str):
+        """
+        Fetch the active subscription of a user and organization along with its plan in one query.
+
+        :param user_id: The user ID to query.
+        :param org_id: The organization ID to query.
+        :return: (subscription, plan) row, or None if there is no active subscription.
+        """
+        try:
+            result = await self.session.execute(
+                select(Subscriptions, Plan)
+                .join(Plan, Subscriptions.plan_id == Plan.id)
+                .filter(Subscriptions.user_id == user_id, Subscriptions.org_id == org_id,
+                        Subscriptions.is_active == True)
+            )
+            return result.first()
+        except Exception as e:
+            logger.error("Database error while fetching subscription with plan: %s", str(e))
+            raise e
+
     @latency(metric=DB_QUERY_LATENCY)
     async def delete_subscription_by_id(self, subscription_id: str):
         """
@@ -298,7 +326,12 @@ class PaymentsDAO:
 
     @latency(metric=DB_QUERY_LATENCY)
     async def schedule_downgrade_to_basic(self, user_id: int, org_id: int, trial_end_date: int):
-        """Schedules a downgrade to the Basic Plan after the trial period ends."""
+        """
+        Schedules a downgrade to the Basic Plan after the trial period ends.
+
+        The downgrade is also queued in the trial expiry queue, so it is applied as soon as it is due
+        instead of on the next sweep of the scheduled downgrades.
+        """
         try:
             downgrade_entry = ScheduledDowngrade(
                 id=uuid6.uuid6(),
@@ -313,65 +346,68 @@ class PaymentsDAO:
             logger.error("Database error while scheduling the entry for downgrade: %s", str(e))
             raise e
 
-    @latency(metric=DB_QUERY_LATENCY)
-    async def mark_scheduled_downgrade_completed(self, user_id: int, org_id: int):
-        """
-        Marks the scheduled downgrade as completed after execution.
-        :param user_id: The user ID.
-        :param org_id: The organization ID.
-        """
         try:
-            query = select(ScheduledDowngrade).where(
-                ScheduledDowngrade.user_id == user_id,
-                ScheduledDowngrade.org_id == org_id,
-                ScheduledDowngrade.status == "pending"
-            )
-
-            result = await self.session.execute(query)
-            scheduled_downgrade = result.scalar_one_or_none()
-
-            if scheduled_downgrade:
-                scheduled_downgrade.status = "completed"
-                await self.session.commit()
-                logger.info(f"Marked downgrade for user {user_id} in org {org_id} as completed.")
-            else:
-                logger.warning(f"No pending downgrade found for user {user_id} in org {org_id}.")
-        except Exception as e:
-            logger.error(f"Failed to Mark downgrade for user {user_id} in org {org_id} as completed: %s", str(e))
-            raise e
+            trial_expiry_queue = DelayedQueue(RedisClient(), TRIAL_EXPIRY_QUEUE_KEY)
+            await trial_expiry_queue.schedule({str(downgrade_entry.id): trial_end_date})
+        except RedisError as e:
+            logger.warning("Failed to queue the downgrade of user %s, left to the sweep: %s", user_id, str(e))
 
     @latency(metric=DB_QUERY_LATENCY)
-    async def get_expired_trials(self):
+    async def downgrade_expired_trials(self, plan_id, limit: int,
+                                       downgrade_ids: Optional[List] = None) -> Tuple[int, List[Tuple[str, str]]]:
         """
-        Fetch all trial subscriptions that have expired and are pending downgrade.
+        Moves a chunk of expired trials to the given plan and marks their scheduled downgrades completed.
+
+        The chunk is claimed with FOR UPDATE SKIP LOCKED and downgraded in one UPDATE ... FROM
+        statement, all in a single transaction. Downgrades without an active trial left to move
+        (e.g. the user already upgraded) are completed as well, so they are not claimed again.
+
+        :param plan_id: The ID of the plan to move the trials to.
+        :param limit: The maximum number of scheduled downgrades to claim.
+        :param downgrade_ids: Only claim among these scheduled downgrades, if given.
+        :return: The number of downgrades claimed, and the (user_id, org_id) of the downgraded subscriptions.
         """
         try:
-            now = int(time.time())
-
-            sub_alias = aliased(Subscriptions)
-            downgrade_alias = aliased(ScheduledDowngrade)
-
-            query = (
-                select(sub_alias)
-                .select_from(sub_alias)
-                .join(
-                    downgrade_alias,
-                    (sub_alias.user_id == downgrade_alias.user_id) &
-                    (sub_alias.org_id == downgrade_alias.org_id)
-                )
+            due_downgrades = (
+                select(ScheduledDowngrade.id)
                 .where(
-                    sub_alias.is_trial == True,
-                    sub_alias.is_active == True,
-                    downgrade_alias.scheduled_at <= now,
-                    downgrade_alias.status == "pending"
+                    ScheduledDowngrade.status == "pending",
+                    ScheduledDowngrade.scheduled_at <= int(time.time())
                 )
+                .limit(limit)
+                .with_for_update(skip_locked=True)
             )
+            if downgrade_ids is not None:
+                due_downgrades = due_downgrades.where(ScheduledDowngrade.id.in_(downgrade_ids))
+            result = await self.session.execute(
+                update(ScheduledDowngrade)
+                .where(ScheduledDowngrade.id.in_(due_downgrades.scalar_subquery()))
+                .values(status="completed")
+                .returning(ScheduledDowngrade.id)
+            )
+            downgrade_ids = result.scalars().all()
+            if not downgrade_ids:
+                await self.session.commit()
+                return 0, []
 
-            result = await self.session.execute(query)
-            expired_trials = result.scalars().all()
-
-            return expired_trials
+            result = await self.session.execute(
+                update(Subscriptions)
+                .where(
+                    ScheduledDowngrade.id.in_(downgrade_ids),
+                    Subscriptions.user_id == ScheduledDowngrade.user_id,
+                    Subscriptions.org_id.is_not_distinct_from(ScheduledDowngrade.org_id),
+                    Subscriptions.is_trial == True,
+                    Subscriptions.is_active == True
+                )
+                .values(plan_id=plan_id, status="active")
+                .returning(Subscriptions.user_id, Subscriptions.org_id)
+                .execution_options(synchronize_session=False)
+            )
+            downgraded = [(row.user_id, row.org_id) for row in result.all()]
+            await self.session.commit()
+            return len(downgrade_ids), downgraded
 
         except Exception as e:
-            logger.error(f"Failed to fetch expiring trial-based subscriptions: {str(e)}")
+            await self.session.rollback()
+            logger.error(f"Failed to downgrade expired trials: {str(e)}")
             raise e
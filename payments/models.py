@@ -1,8 +1,9 @@
 import enum
 
 from sqlalchemy import (
-    Column, String, Boolean, ForeignKey, UUID, Enum, Integer, Index, BigInteger, JSON
+    Column, String, Boolean, ForeignKey, UUID, Enum, Integer, Index, BigInteger, JSON, text
 )
+
 from utils.sqlalchemy import Base, TimestampMixin
 
 
@@ -47,6 +48,9 @@ class Subscriptions(TimestampMixin, Base):
     psp_name = Column(Enum(PSPName), nullable=False)
     psp_subscription_id = Column(String(255), nullable=True, index=True)
     status = Column(String, nullable=False, index=True)
+    # Current PSP billing period (epoch seconds), kept up to date by the PSP webhooks.
+    current_start = Column(Integer, nullable=True)
+    current_end = Column(Integer, nullable=True)
 
     __table_args__ = (
         Index('ix_subscriptions_user_org', 'user_id', 'org_id'),
@@ -107,4 +111,6 @@ class ScheduledDowngrade(TimestampMixin, Base):
 
     __table_args__ = (
         Index('ix_scheduleddowngrade_user_org', 'user_id', 'org_id'),
+        Index('ix_scheduled_downgrades_pending_scheduled_at', 'scheduled_at',
+              postgresql_where=text("status = 'pending'")),
     )
\ No newline at end of file
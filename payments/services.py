@@ -1,7 +1,6 @@
 import time
-from datetime import datetime
 
-from fastapi import status
+from fastapi import BackgroundTasks, status
 
 from config.logging import logger
 from config.settings import loaded_config
@@ -209,14 +208,20 @@ class PaymentsService:
             raise SubscriptionNotFoundError()
         return subscription
 
-    async def get_subscriptions_by_user_org(self, user_id, org_id, first_name, last_name):
+    async def get_subscriptions_by_user_org(self, user_id, org_id, first_name, last_name,
+                                            background_task: BackgroundTasks):
         """
         Retrieve subscriptions for a specific user and organization.
+
+        The billing period is served from the subscription row, which the PSP webhooks keep up to
+        date, so the view never waits on the PSP; an active subscription whose stored period is
+        missing or has ended is refreshed from its PSP in the background, after the response is sent.
         :param user_id: User ID.
         :param org_id: Organization ID.
+        :param background_task: FastAPI's BackgroundTasks instance to handle asynchronous tasks.
         """
-        subscription = await self.payments_dao.get_subscriptions_by_user_and_org_id(user_id, org_id)
-        if not subscription:
+        subscription_with_plan = await self.payments_dao.get_active_subscription_with_plan(user_id, org_id)
+        if not subscription_with_plan:
             plan_details = await self.plans_dao.get_plan_by_id(loaded_config.fallback_plan_id)
             return {
                 "amount": plan_details.amount,
@@ -224,36 +229,17 @@ class PaymentsService:
                 "plan_name": plan_details.name,
                 "plan_description": plan_details.description
             }
-
-        plan_details = await self.plans_dao.get_plan_by_id(subscription.plan_id)
-        if not plan_details:
-            raise PaymentError(
-                message="Plan details not found for the subscription",
-                status_code=status.HTTP_404_NOT_FOUND
-            )
+        subscription, plan_details = subscription_with_plan
 
         if plan_details.slug != PlanSlugs.BASIC.value:
-            if subscription.psp_name == PSPName.PADDLE:
-                paddle_subscription = await self.paddle_client.get_subscription_details(
-                    subscription_id=subscription.psp_subscription_id)
-
-                current_start = current_end = None
-                if current_billing_period := paddle_subscription["data"]["current_billing_period"]:
-                    current_start = datetime.strptime(current_billing_period["starts_at"],
-                                                      "%Y-%m-%dT%H:%M:%S.%fZ").timestamp() if current_billing_period.get(
-                        "starts_at") else None
-                    current_end = datetime.strptime(current_billing_period["ends_at"],
-                                                    "%Y-%m-%dT%H:%M:%S.%fZ").timestamp() if current_billing_period.get(
-                        "ends_at") else None
-                subscription_details = {
-                    "current_start": current_start,
-                    "current_end": current_end,
-                    "cancel_at_cycle_end": subscription.cancel_at_cycle_end
-                }
-            else:
-                subscription_details = await self.razorpay_client.get_subscription_details(
-                    subscription.psp_subscription_id)
-                subscription_details["cancel_at_cycle_end"] = subscription.cancel_at_cycle_end
+            subscription_details = {
+                "status": subscription.status,
+                "current_start": subscription.current_start,
+                "current_end": subscription.current_end,
+                "cancel_at_cycle_end": subscription.cancel_at_cycle_end
+            }
+            if self._is_billing_period_stale(subscription):
+                background_task.add_task(self.refresh_billing_period, subscription)
         else:
             subscription_details = subscription.to_dict()
 
@@ -269,6 +255,36 @@ class PaymentsService:
 
         return subscription_with_plan_details
 
+    @staticmethod
+    def _is_billing_period_stale(subscription) -> bool:
+        """Whether an active subscription's stored billing period is missing or has already ended."""
+        if subscription.status != "active":
+            return False
+        return not subscription.current_end or subscription.current_end <= time.time()
+
+    async def refresh_billing_period(self, subscription):
+        """
+        Fetch the current billing period of a subscription from its PSP and store it on the subscription.
+
+        Runs as a background task, so failures are logged rather than raised.
+
+        :param subscription: Subscription to refresh.
+        """
+        try:
+            if subscription.psp_name == PSPName.PADDLE:
+                paddle_subscription = await self.paddle_client.get_subscription_details(
+                    subscription_id=subscription.psp_subscription_id)
+                subscription.current_start, subscription.current_end = PaddleClient.parse_billing_period(
+                    paddle_subscription["data"]["current_billing_period"])
+            else:
+                razorpay_subscription = await self.razorpay_client.get_subscription_details(
+                    subscription.psp_subscription_id)
+                subscription.current_start = razorpay_subscription.get("current_start")
+                subscription.current_end = razorpay_subscription.get("current_end")
+            await self.payments_dao.update_subscription(subscription)
+        except Exception as e:
+            logger.error("Failed to refresh billing period of subscription %s: %s", subscription.id, str(e))
+
     async def unsubscribe(self, user_id: int, org_id: int):
         """
         Unsubscribe plan from payment service provider
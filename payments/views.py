@@ -1,4 +1,4 @@
-from fastapi import Depends, status, Request
+from fastapi import BackgroundTasks, Depends, status, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
@@ -90,6 +90,7 @@ async def cancel_subscription(
 @handle_exceptions("Failed to fetch subscriptions for current user.", exception_classes=[PaymentError, PlanError])
 async def get_subscriptions(
         request: Request,
+        background_task: BackgroundTasks,
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
         user_data: UserData = Depends(get_user_data_from_request)
 ):
@@ -98,7 +99,7 @@ async def get_subscriptions(
     """
     payments_service = PaymentsService(connection_handler=connection_handler)
     subscription_details = await payments_service.get_subscriptions_by_user_org(
-        user_data.userId, user_data.orgId, user_data.firstName, user_data.lastName
+        user_data.userId, user_data.orgId, user_data.firstName, user_data.lastName, background_task
     )
     response_data = ResponseData.construct(success=True, data=subscription_details)
     return response_data
@@ -16,13 +16,14 @@ class PlansService:
     def __init__(self, connection_handler: ConnectionHandler = None):
         self.connection_handler = connection_handler
         self.plans_dao = PlansDAO(session=connection_handler.session)
+        self.plans_read_dao = PlansDAO(session=connection_handler.read_session)
         self.plan_coupons_dao = PlanCouponsDAO(session=connection_handler.session)
         self.razorpay_client = RazorpayClient()
         self.paddle_client = PaddleClient()
 
     async def get_all_plans(self):
-        """Retrieve all plans using DAO."""
-        return await self.plans_dao.get_all_plans()
+        """Retrieve all plans using DAO, from the read replica when available."""
+        return await self.plans_read_dao.get_all_plans()
 
     async def get_plan_by_id(self, plan_id: str):
         """Retrieve a specific plan by ID using DAO."""
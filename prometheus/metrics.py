@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_client import CollectorRegistry
 
 REGISTRY = CollectorRegistry()
@@ -35,5 +35,87 @@ DEADLOCK_COUNTER = Counter(
     registry=REGISTRY
 )
 
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'wayne_db_pool_checkout_wait_seconds',
+    'Time spent waiting for a connection from the database pool',
+    ['pool', 'service_name'],
+    registry=REGISTRY,
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
+
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    'wayne_db_pool_connections_in_use',
+    'Number of database pool connections currently checked out',
+    ['pool', 'service_name'],
+    registry=REGISTRY
+)
+
+DB_OPEN_SESSIONS = Gauge(
+    'wayne_db_open_sessions',
+    'Number of database sessions created by connection handlers and not closed yet',
+    ['pool', 'service_name'],
+    registry=REGISTRY
+)
+
+DB_REPLICA_LAG = Gauge(
+    'wayne_db_replica_lag_seconds',
+    'Replay lag of the read replica',
+    ['service_name'],
+    registry=REGISTRY
+)
+
+# Cache metrics
+RULES_CACHE_WARMUP_KEYS = Gauge(
+    'wayne_rules_cache_warmup_keys',
+    'Number of plan rule keys written to Redis by the last warm-up',
+    ['service_name'],
+    registry=REGISTRY
+)
+
+RULES_CACHE_WARMUP_DURATION = Gauge(
+    'wayne_rules_cache_warmup_duration_seconds',
+    'Duration of the last plan rules warm-up',
+    ['service_name'],
+    registry=REGISTRY
+)
+
+# Payment service provider metrics
+PSP_REQUEST_LATENCY = Histogram(
+    'wayne_psp_request_duration_seconds',
+    'Latency of payment service provider API calls',
+    ['psp', 'method', 'endpoint', 'status', 'service_name'],
+    registry=REGISTRY,
+    buckets=buckets
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    'wayne_circuit_breaker_state',
+    'State of a circuit breaker: 0 closed, 1 half-open, 2 open',
+    ['name', 'service_name'],
+    registry=REGISTRY
+)
+
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    'wayne_circuit_breaker_rejections_total',
+    'Calls failed fast because their circuit breaker was open',
+    ['name', 'service_name'],
+    registry=REGISTRY
+)
+
+PSP_RETRIES_DENIED = Counter(
+    'wayne_psp_retries_denied_total',
+    'PSP call retries skipped because the retry budget was exhausted',
+    ['psp', 'service_name'],
+    registry=REGISTRY
+)
+
+# Webhook metrics
+WEBHOOK_EVENTS_PROCESSED = Counter(
+    'wayne_webhook_events_total',
+    'Webhook event attempts by outcome: processed, pending (retried) or dead',
+    ['psp', 'event_type', 'status', 'service_name'],
+    registry=REGISTRY
+)
+
 # Kafka metrics
 
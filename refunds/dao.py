@@ -1,13 +1,16 @@
+from typing import Optional
+
 import uuid6
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, update
+from sqlalchemy import text, tuple_, update
 
 from refunds.models import Refund, RequestRefund
 from payments.models import Subscriptions
 from refunds.schemas import RefundSchema, RequestRefundSchema, UpdateRefundRequestSchema
 from config.logging import logger
 from utils.decorators import latency
+from utils.pagination import encode_cursor, decode_cursor
 from prometheus.metrics import DB_QUERY_LATENCY
 
 
@@ -88,34 +91,65 @@ class RefundsDAO:
             raise e
 
     @latency(metric=DB_QUERY_LATENCY)
-    async def get_all_refund_requests(self, page: int, page_size: int):
+    async def get_all_refund_requests(self, page: int, page_size: int, cursor: Optional[str] = None,
+                                      include_total: bool = False):
         """
-        Get all refund requests with pagination using session.execute.
+        Get all refund requests, newest first, with keyset pagination on (created_at, id).
+
+        Pass the `next_cursor` of a page as `cursor` to get the following one, `page` is only used
+        as an offset when no cursor is given. With `include_total` the planner's row estimate of
+        the table is returned instead of an exact COUNT(*).
         """
         try:
-            offset = (page - 1) * page_size
+            query = (
+                select(RequestRefund)
+                .order_by(RequestRefund.created_at.desc(), RequestRefund.id.desc())
+                .limit(page_size + 1)
+            )
+            if cursor:
+                created_at, request_id = decode_cursor(cursor)
+                query = query.filter(
+                    tuple_(RequestRefund.created_at, RequestRefund.id) < tuple_(created_at, request_id)
+                )
+            elif page > 1:
+                query = query.offset((page - 1) * page_size)
 
-            query = select(RequestRefund).offset(offset).limit(page_size)
             result = await self.session.execute(query)
             refund_requests = result.scalars().all()
+            has_more = len(refund_requests) > page_size
+            refund_requests = refund_requests[:page_size]
 
-            count_query = select(func.count(RequestRefund.id))
-            count_result = await self.session.execute(count_query)
-            total_count = count_result.scalar()
+            pagination = {
+                "current_page": None if cursor else page,
+                "page_size": page_size,
+                "has_more": has_more,
+                "next_cursor": encode_cursor(refund_requests[-1].created_at, refund_requests[-1].id)
+                if has_more else None,
+            }
+            if include_total:
+                total_count = await self.get_estimated_refund_requests_count()
+                pagination["total_count"] = total_count
+                pagination["total_pages"] = (total_count + page_size - 1) // page_size
 
             return {
                 "refund_requests": refund_requests,
-                "pagination": {
-                    "current_page": page,
-                    "page_size": page_size,
-                    "total_count": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size,
-                },
+                "pagination": pagination,
             }
         except Exception as e:
             logger.error(f"Unexpected error while retrieving refund requests: {e}")
             raise e
 
+    @latency(metric=DB_QUERY_LATENCY)
+    async def get_estimated_refund_requests_count(self) -> int:
+        """
+        Row count of refund_requests as estimated by the last ANALYZE, -1 meaning never analyzed.
+        """
+        result = await self.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": RequestRefund.__tablename__}
+        )
+        return max(result.scalar() or 0, 0)
+
     @latency(metric=DB_QUERY_LATENCY)
     async def update_refund_request(self, request_data: UpdateRefundRequestSchema):
         """
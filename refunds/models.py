@@ -47,4 +47,5 @@ class RequestRefund(TimestampMixin, Base):
 
     __table_args__ = (
         Index('ix_request_refund_subscription_id', subscription_id),
+        Index('ix_refund_requests_created_at_id', 'created_at', 'id'),
     )
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from payments.dao import PaymentsDAO
 from refunds.schemas import RefundSchema, RequestRefundSchema, UpdateRefundRequestSchema
 from refunds.dao import RefundsDAO
@@ -44,11 +46,12 @@ class RefundsService:
         refund_request_id = await self.refunds_dao.create_refund_request(refund_request_details)
         logger.info(f"Refund request created successfully with ID: {refund_request_id}")
 
-    async def get_all_refund_requests(self, page: int, page_size: int):
+    async def get_all_refund_requests(self, page: int, page_size: int, cursor: Optional[str] = None,
+                                      include_total: bool = False):
         """
         Get all refund requests with pagination.
         """
-        return await self.refunds_dao.get_all_refund_requests(page, page_size)
+        return await self.refunds_dao.get_all_refund_requests(page, page_size, cursor, include_total)
 
     async def update_refund_request(self, request_data: UpdateRefundRequestSchema):
         """
@@ -1,8 +1,13 @@
-from fastapi import Depends, Query, Path
+from typing import Optional
+
+from fastapi import Depends, Query, Path, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from refunds.schemas import RefundSchema, RequestRefundSchema, UpdateRefundRequestSchema
 from refunds.services import RefundsService
 from utils.common import UserData, get_user_data_from_request
 from utils.connection_handler import get_connection_handler_for_app, ConnectionHandler
+from utils.pagination import InvalidCursorError
 from utils.serializers import ResponseData
 
 
@@ -89,6 +94,8 @@ async def get_all_refund_requests(
     connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
     page: int = Query(1, ge=1, description="Page number (must be 1 or greater)"),
     page_size: int = Query(10, ge=1, description="Number of records per page (must be 1 or greater)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, takes precedence over page"),
+    include_total: bool = Query(False, description="Include the estimated total number of refund requests"),
 ):
     """
     Get all refund requests with pagination.
@@ -96,9 +103,14 @@ async def get_all_refund_requests(
     response_data = ResponseData.construct(success=True)
     try:
         refunds_service = RefundsService(connection_handler=connection_handler)
-        refunds = await refunds_service.get_all_refund_requests(page, page_size)
+        refunds = await refunds_service.get_all_refund_requests(page, page_size, cursor, include_total)
         response_data.data = refunds
         return response_data
+    except InvalidCursorError as e:
+        response_data.success = False
+        response_data.message = "Failed to fetch refunds"
+        response_data.errors = [str(e)]
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder(response_data))
     except Exception as e:
         response_data.success = False
         response_data.message = "Failed to fetch refunds"
@@ -0,0 +1,58 @@
+import asyncio
+
+from config.logging import logger
+from rule_engine.constants import (
+    PLAN_RULES_INVALIDATION_CHANNEL,
+    PLAN_RULES_LOCAL_CACHE_MAXSIZE,
+    PLAN_RULES_LOCAL_CACHE_TTL
+)
+from utils.cache import TTLCache
+from utils.redis_client import RedisClient
+
+# Decoded rule lists keyed by their `plan_rules:{service_slug}:{plan_id}` Redis key.
+plan_rules_local_cache = TTLCache(maxsize=PLAN_RULES_LOCAL_CACHE_MAXSIZE, ttl=PLAN_RULES_LOCAL_CACHE_TTL)
+# Compiled predicates of the rule lists above, under the same keys.
+compiled_plan_rules_local_cache = TTLCache(maxsize=PLAN_RULES_LOCAL_CACHE_MAXSIZE, ttl=PLAN_RULES_LOCAL_CACHE_TTL)
+# Static rule details (limit, reset period, name) used by the usage statistics, keyed by plan ID.
+plan_rule_details_local_cache = TTLCache(maxsize=PLAN_RULES_LOCAL_CACHE_MAXSIZE, ttl=PLAN_RULES_LOCAL_CACHE_TTL)
+
+
+def invalidate_plan_rules(redis_plan_rules_key: str):
+    """
+    Drops every local entry derived from the given `plan_rules:{service_slug}:{plan_id}` key.
+    """
+    plan_rules_local_cache.delete(redis_plan_rules_key)
+    compiled_plan_rules_local_cache.delete(redis_plan_rules_key)
+    plan_rule_details_local_cache.delete(redis_plan_rules_key.rsplit(":", 1)[-1])
+
+
+def clear_plan_rules():
+    plan_rules_local_cache.clear()
+    compiled_plan_rules_local_cache.clear()
+    plan_rule_details_local_cache.clear()
+
+
+async def listen_for_plan_rules_invalidation():
+    """
+    Evicts local plan rule entries as `RulesService.update_plan_rules_in_redis` publishes
+    the keys it rewrote.
+
+    Invalidations published while the subscription is down are lost, so the whole local
+    cache is dropped every time the subscription is (re)established.
+    """
+    redis_client = RedisClient()
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(PLAN_RULES_INVALIDATION_CHANNEL)
+                clear_plan_rules()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message:
+                        invalidate_plan_rules(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Plan rules invalidation listener failed, resubscribing: %s", str(e))
+            clear_plan_rules()
+            await asyncio.sleep(1)
@@ -0,0 +1,8 @@
+PLAN_RULES_KEY = "plan_rules:{service_slug}:{plan_id}"
+PLAN_RULES_CACHE_LOCK_TIMEOUT = 5
+PLAN_RULES_INVALIDATION_CHANNEL = "plan_rules:invalidate"
+PLAN_RULES_LOCAL_CACHE_MAXSIZE = 10000
+PLAN_RULES_LOCAL_CACHE_TTL = 60
+PLAN_RULES_WARMUP_CHUNK_SIZE = 1000
+PLAN_RULES_WARMUP_BATCH_SIZE = 500
+QUOTA_BATCH_MAX_RECORDS = 5000
@@ -3,7 +3,6 @@ from fastapi import status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 
 from config.logging import logger
 from rule_engine.exceptions import RuleError
@@ -145,23 +144,7 @@ class RulesDAO:
                 )
             )
 
-            rules_with_conditions = []
-
-            for rule in result.scalars().all():
-                rules_with_conditions.append(
-                    {
-                        "id": str(rule.id),
-                        "name": rule.name,
-                        "description": rule.description,
-                        "scope": rule.scope.value,
-                        "enabled": rule.enabled,
-                        "meta_data": rule.meta_data,
-                        "rule_slug": rule.rule_slug,
-                        "rule_class_name": rule.rule_class_name,
-                        "service_slug": rule.service_slug.value,
-                        "conditions": rule.condition_data or {},
-                    }
-                )
+            rules_with_conditions = [rule.to_dict_with_conditions() for rule in result.scalars().all()]
 
             logger.info("Retrieved %d rules with conditions for plan ID: %s", len(rules_with_conditions), str(plan_id))
             return rules_with_conditions
@@ -205,16 +188,28 @@ class RulesDAO:
                 detail=str(e),
             )
 
-    async def get_all_rules(self):
+    async def stream_all_plan_rules(self, chunk_size: int = 1000):
+        """
+        Stream every (plan_id, rule) pair in chunks, ordered by plan and service so that
+        all rules of a plan for a service arrive contiguously.
+
+        :param chunk_size: Number of rows fetched from the server-side cursor per chunk.
+        """
         try:
-            query = select(PlanRule).options(joinedload(PlanRule.rule))
-            result = await self.session.execute(query)
-            return result.unique().scalars().all()
+            query = (
+                select(PlanRule.plan_id, Rule)
+                .join(Rule, PlanRule.rule_id == Rule.id)
+                .order_by(PlanRule.plan_id, Rule.service_slug)
+                .execution_options(yield_per=chunk_size)
+            )
+            result = await self.session.stream(query)
+            async for partition in result.partitions():
+                yield partition
         except Exception as e:
             await self.session.rollback()
-            logger.error("Error occurred while getting all rules")
+            logger.error("Error occurred while streaming all plan rules: %s", str(e))
             raise RuleError(
-                message="Failed to get all rules.",
+                message="Failed to stream all plan rules.",
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,173 @@
+import operator
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.logging import logger
+from rule_engine.exceptions import UnknownMetricError
+from rule_engine.models import OperatorEnum
+from rule_engine.utils import get_period_end_calculator
+
+OPERATORS: Dict[OperatorEnum, Callable[[Any, Any], bool]] = {
+    OperatorEnum.EQUAL: operator.eq,
+    OperatorEnum.NOT_EQUAL: operator.ne,
+    OperatorEnum.GREATER_THAN: operator.gt,
+    OperatorEnum.LESS_THAN: operator.lt,
+    OperatorEnum.GREATER_THAN_OR_EQUAL: operator.ge,
+    OperatorEnum.LESS_THAN_OR_EQUAL: operator.le,
+}
+
+
+class CompiledCondition:
+    """
+    A `{"key": ..., "operator": ..., "value": ...}` entry of a rule's `condition_data["conditions"]`
+    with its operator resolved and its threshold parsed.
+    """
+    __slots__ = ("key", "compare", "threshold")
+
+    def __init__(self, key: str, compare: Callable[[Any, Any], bool], threshold):
+        self.key = key
+        self.compare = compare
+        self.threshold = threshold
+
+    def evaluate(self, metrics: Dict[str, Any]) -> bool:
+        """A metric missing from the snapshot, or not comparable with the threshold, fails the condition."""
+        value = metrics.get(self.key)
+        if value is None:
+            return False
+        try:
+            return self.compare(value, self.threshold)
+        except (TypeError, ValueError) as e:
+            logger.warning("Metric %s=%r cannot be compared with %r: %s", self.key, value, self.threshold, str(e))
+            return False
+
+
+class CompiledRule:
+    """
+    Predicate form of an enabled rule: its `request_limit`, the calculator for the end of its
+    `reset_period` window and its operator conditions.
+    """
+    __slots__ = ("id", "name", "rule_slug", "request_limit", "period_end_calculator", "conditions")
+
+    def __init__(self, id: str, name: Optional[str], rule_slug: Optional[str], request_limit: Optional[int],
+                 period_end_calculator: Optional[Callable[[datetime], datetime]],
+                 conditions: Tuple[CompiledCondition, ...]):
+        self.id = id
+        self.name = name
+        self.rule_slug = rule_slug
+        self.request_limit = request_limit
+        self.period_end_calculator = period_end_calculator
+        self.conditions = conditions
+
+    def get_period_end(self, now: datetime) -> Optional[int]:
+        """
+        Epoch seconds at which the current `reset_period` window ends. Windows are aligned to UTC
+        calendar boundaries so every counter of a period resets at the same time.
+
+        :return: The window end, or None when the rule's usage never resets.
+        """
+        if not self.period_end_calculator:
+            return None
+        return int(self.period_end_calculator(now).timestamp())
+
+    def evaluate(self, usage: int, metrics: Dict[str, Any], units: int = 1) -> bool:
+        if self.request_limit is not None and usage + units > self.request_limit:
+            return False
+        for condition in self.conditions:
+            if not condition.evaluate(metrics):
+                return False
+        return True
+
+
+class CompiledPlanRules:
+    """
+    The compiled enabled rules of a plan for a service, built once per cache load.
+    """
+    __slots__ = ("rules", "limited_rules")
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = rules
+        self.limited_rules = [rule for rule in rules if rule.request_limit is not None]
+
+    def get_rule_limits(self, metric: Optional[str] = None,
+                        now: datetime = None) -> Tuple[List[CompiledRule], List[Tuple]]:
+        """
+        Returns the rules with a `request_limit`, optionally only the one whose slug is `metric`,
+        along with their (rule_id, request_limit, period_end) tuples.
+
+        :raises UnknownMetricError: If `metric` is not the slug of any of the rules, so usage of
+            an unknown metric is rejected instead of being allowed unchecked.
+        """
+        if metric and not any(rule.rule_slug == metric for rule in self.rules):
+            raise UnknownMetricError(metric)
+        now = now or datetime.now(timezone.utc)
+        limited_rules = [rule for rule in self.limited_rules if not metric or rule.rule_slug == metric]
+        return limited_rules, [(rule.id, rule.request_limit, rule.get_period_end(now)) for rule in limited_rules]
+
+    def evaluate(self, usage: Dict[str, int], metrics: Dict[str, Any],
+                 units: int = 1) -> Tuple[bool, List[Tuple[CompiledRule, bool]]]:
+        """
+        Evaluates an entity's usage snapshot against every rule.
+
+        :param usage: Current usage counters keyed by rule ID, missing rules count as unused.
+        :param metrics: Values the rules' operator conditions are checked against.
+        :param units: Units the caller is about to consume.
+        :return: Whether every rule allows the units, and each rule's verdict.
+        """
+        verdicts = [(rule, rule.evaluate(usage.get(rule.id, 0), metrics, units)) for rule in self.rules]
+        return all(allowed for _, allowed in verdicts), verdicts
+
+
+def _parse_threshold(value):
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+
+def compile_rule(rule: Dict) -> Optional[CompiledRule]:
+    """
+    Compiles a rule as returned by `Rule.to_dict_with_conditions`.
+
+    Malformed operator conditions are logged and left out rather than failing the whole plan,
+    a rule with a malformed `request_limit` or `reset_period` is logged and skipped.
+
+    :return: The compiled rule, or None if the rule is skipped.
+    """
+    condition_data = rule.get("conditions") or {}
+    try:
+        request_limit = condition_data.get("request_limit")
+        request_limit = int(request_limit) if request_limit is not None else None
+        period_end_calculator = get_period_end_calculator(condition_data.get("reset_period"))
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.error("Skipping rule %s with an invalid limit or reset period: %s", rule.get("id"), str(e))
+        return None
+
+    conditions = []
+    for condition in condition_data.get("conditions") or []:
+        try:
+            conditions.append(CompiledCondition(
+                condition["key"],
+                OPERATORS[OperatorEnum(condition["operator"])],
+                _parse_threshold(condition["value"])
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("Skipping invalid condition %s of rule %s: %s", condition, rule.get("id"), str(e))
+
+    return CompiledRule(
+        id=rule["id"],
+        name=rule.get("name"),
+        rule_slug=rule.get("rule_slug"),
+        request_limit=request_limit,
+        period_end_calculator=period_end_calculator,
+        conditions=tuple(conditions)
+    )
+
+
+def compile_plan_rules(plan_rules: List[Dict]) -> CompiledPlanRules:
+    compiled_rules = (compile_rule(rule) for rule in plan_rules if rule.get("enabled"))
+    return CompiledPlanRules([rule for rule in compiled_rules if rule is not None])
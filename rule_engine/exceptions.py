@@ -15,4 +15,16 @@ class RuleError(Exception):
         self.message = message
         self.detail = detail or message
         self.status_code = status_code
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+class UnknownMetricError(RuleError):
+    """
+    Raised when usage is reported for a metric that matches none of the plan's rules.
+    """
+    def __init__(self, metric: str):
+        super().__init__(
+            message=f"Unknown metric '{metric}'.",
+            detail="The metric does not match the slug of any rule of the plan for this service.",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
@@ -18,13 +18,16 @@ from sqlalchemy.orm import relationship
 class ScopeEnum(enum.Enum):
     ORGANISATION = "organisation"
     USER = "user"
-#
-# class OperatorEnum(enum.Enum):
-#     EQUAL = "="
-#     GREATER_THAN = ">"
-#     LESS_THAN = "<"
-#     GREATER_THAN_OR_EQUAL = ">="
-#     LESS_THAN_OR_EQUAL = "<="
+
+
+class OperatorEnum(enum.Enum):
+    EQUAL = "="
+    NOT_EQUAL = "!="
+    GREATER_THAN = ">"
+    LESS_THAN = "<"
+    GREATER_THAN_OR_EQUAL = ">="
+    LESS_THAN_OR_EQUAL = "<="
+
 
 class Rule(TimestampMixin, Base):
     __tablename__ = 'rules'
@@ -42,6 +45,20 @@ class Rule(TimestampMixin, Base):
 
     plan_rules = relationship("PlanRule", back_populates="rule")
 
+    def to_dict_with_conditions(self):
+        return {
+            "id": str(self.id),
+            "name": self.name,
+            "description": self.description,
+            "scope": self.scope.value,
+            "enabled": self.enabled,
+            "meta_data": self.meta_data,
+            "rule_slug": self.rule_slug,
+            "rule_class_name": self.rule_class_name,
+            "service_slug": self.service_slug.value,
+            "conditions": self.condition_data or {},
+        }
+
     def __repr__(self):
         return f"<Rule(id={self.id}, name={self.name}, scope={self.scope})>"
 
@@ -5,7 +5,10 @@ from rule_engine.views import (
     add_rule_to_plan,
     create_rule,
     remove_rule_from_plan,
-    get_rules_with_conditions
+    get_rules_with_conditions,
+    consume_quota,
+    consume_quota_batch,
+    evaluate_rules
 )
 from utils.common import get_user_data_from_request
 
@@ -51,3 +54,27 @@ router.add_api_route(
     description="Get rules with conditions based on service and plan",
     methods=["GET"]
 )
+
+router.add_api_route(
+    "/{service_slug}/quota/consume",
+    endpoint=consume_quota,
+    tags=["Plan Rules"],
+    description="Atomically check and consume quota against the plan's rules for a service",
+    methods=["POST"]
+)
+
+router.add_api_route(
+    "/quota/batch-consume",
+    endpoint=consume_quota_batch,
+    tags=["Plan Rules"],
+    description="Apply a batch of usage records against the plans' rules in a single pass",
+    methods=["POST"]
+)
+
+router.add_api_route(
+    "/{service_slug}/evaluate",
+    endpoint=evaluate_rules,
+    tags=["Plan Rules"],
+    description="Evaluate an entity's usage and metrics against the plan's rules without consuming quota",
+    methods=["POST"]
+)
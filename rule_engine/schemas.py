@@ -1,9 +1,11 @@
 from slugify import slugify
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, Field, validator, ConfigDict, field_validator
 
+from rule_engine.constants import QUOTA_BATCH_MAX_RECORDS
+
 
 class ScopeEnum(str, Enum):
     ORGANISATION = "organisation"
@@ -54,4 +56,39 @@ class RuleDetailsSchema(BaseModel):
     service_slug: str
     condition_data: ConditionDataSchema
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QuotaConsumptionSchema(BaseModel):
+    """
+    Usage reported by a caller against the rules of a plan.
+    """
+    plan_id: UUID = Field(..., description="The plan whose rules are enforced")
+    user_id: str = Field(..., description="The user consuming the quota")
+    org_id: Optional[str] = Field(None, description="The organisation consuming the quota, if usage is shared")
+    units: int = Field(1, ge=1, description="The number of units to consume")
+
+
+class QuotaUsageRecordSchema(QuotaConsumptionSchema):
+    """
+    One usage record of a batch, optionally restricted to the rule whose slug matches `metric`.
+    """
+    service_slug: BackendService = Field(..., description="The backend service reporting the usage")
+    metric: Optional[str] = Field(None, description="Slug of the rule to consume, all of the plan's rules if omitted")
+
+
+class BatchQuotaConsumptionSchema(BaseModel):
+    records: List[QuotaUsageRecordSchema] = Field(..., max_length=QUOTA_BATCH_MAX_RECORDS,
+                                                  description="Usage records, applied in order")
+
+
+class RuleEvaluationSchema(BaseModel):
+    """
+    An entity's usage snapshot to evaluate against the rules of a plan without consuming quota.
+    """
+    plan_id: UUID = Field(..., description="The plan whose rules are evaluated")
+    user_id: str = Field(..., description="The user being evaluated")
+    org_id: Optional[str] = Field(None, description="The organisation being evaluated, if usage is shared")
+    units: int = Field(1, ge=0, description="The number of units the entity is about to consume")
+    metrics: Dict[str, Any] = Field(default_factory=dict,
+                                    description="Values checked by the rules' operator conditions")
@@ -1,10 +1,30 @@
 import json
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 
 from fastapi import BackgroundTasks
 
+from config.logging import logger
+from prometheus.metrics import RULES_CACHE_WARMUP_KEYS, RULES_CACHE_WARMUP_DURATION
+from rule_engine.cache import plan_rules_local_cache, compiled_plan_rules_local_cache, invalidate_plan_rules
+from rule_engine.constants import (
+    PLAN_RULES_KEY,
+    PLAN_RULES_CACHE_LOCK_TIMEOUT,
+    PLAN_RULES_INVALIDATION_CHANNEL,
+    PLAN_RULES_WARMUP_BATCH_SIZE,
+    PLAN_RULES_WARMUP_CHUNK_SIZE
+)
 from rule_engine.dao import RulesDAO
-from rule_engine.schemas import RuleSchema
+from rule_engine.evaluator import CompiledPlanRules, compile_plan_rules
+from rule_engine.exceptions import UnknownMetricError
+from rule_engine.schemas import (
+    RuleSchema,
+    QuotaConsumptionSchema,
+    BatchQuotaConsumptionSchema,
+    RuleEvaluationSchema
+)
+from rule_engine.usage_storage import get_rule_usage_storage
+from utils.cache import ReadThroughCache
 from utils.connection_handler import ConnectionHandler
 from utils.redis_client import RedisClient
 
@@ -13,6 +33,7 @@ class RulesService:
     def __init__(self, connection_handler: ConnectionHandler):
         self.connection_handler = connection_handler
         self.rules_dao = RulesDAO(session=connection_handler.session)
+        self.rules_read_dao = RulesDAO(session=connection_handler.read_session)
         self.redis_client = RedisClient()
 
     async def get_rules_by_plan(self, plan_id: str):
@@ -22,7 +43,7 @@ class RulesService:
         :param plan_id: The ID of the plan.
         :return: A list of Rule objects associated with the given plan.
         """
-        rules = await self.rules_dao.get_rules_by_plan_id(plan_id)
+        rules = await self.rules_read_dao.get_rules_by_plan_id(plan_id)
         return rules
 
     async def add_rule_to_plan(self, plan_id, rule_id, background_task: BackgroundTasks):
@@ -72,58 +93,222 @@ class RulesService:
         rule_details = await self.rules_dao.get_rule_by_id(rule_id)
         rules_data_with_conditions = await self.rules_dao.get_plan_rules_with_conditions(plan_id,
                                                                                          rule_details.service_slug)
-        redis_rule_key = f"plan_rules:{rule_details.service_slug.value}:{plan_id}"
+        redis_rule_key = PLAN_RULES_KEY.format(service_slug=rule_details.service_slug.value, plan_id=plan_id)
         await self.redis_client.add_key(redis_rule_key, json.dumps(rules_data_with_conditions))
+        invalidate_plan_rules(redis_rule_key)
+        await self.redis_client.publish(PLAN_RULES_INVALIDATION_CHANNEL, redis_rule_key)
 
     async def get_rules_with_conditions(self, plan_id, service_slug):
         """
-        Updates the Redis cache for the rules associated with a given plan.
+        Fetches the rules of a plan for a service.
+
+        Decoded rules are served from the in-process `plan_rules_local_cache` first, then
+        from the Redis read-through cache, where a hit is a single GET and concurrent
+        misses for the same plan share one database query.
 
         :param plan_id: The ID of the plan.
         :param service_slug: slug of service.
         """
+        # Enum members format as `BackendService.CEREBRUM` from Python 3.11, use the slug itself.
+        service_slug = getattr(service_slug, "value", service_slug)
+        redis_plan_rules_key = PLAN_RULES_KEY.format(service_slug=service_slug, plan_id=plan_id)
+        rules_data_with_conditions = plan_rules_local_cache.get(redis_plan_rules_key)
+        if rules_data_with_conditions is not None:
+            return rules_data_with_conditions
 
-        redis_plan_rules_key = f"plan_rules:{service_slug}:{plan_id}"
-        if await self.redis_client.exists_key(redis_plan_rules_key):
-            rule_value = await self.redis_client.get_key(redis_plan_rules_key)
-            return json.loads(rule_value)
-        rules_data_with_conditions = await self.rules_dao.get_plan_rules_with_conditions(plan_id, service_slug.upper())
-        await self.redis_client.add_key(redis_plan_rules_key, json.dumps(rules_data_with_conditions))
+        local_cache_generation = plan_rules_local_cache.generation
+        plan_rules_cache = ReadThroughCache(self.redis_client, lock_timeout=PLAN_RULES_CACHE_LOCK_TIMEOUT)
+        rules_data_with_conditions = await plan_rules_cache.get(
+            redis_plan_rules_key,
+            lambda: self.rules_dao.get_plan_rules_with_conditions(plan_id, service_slug.upper())
+        )
+        plan_rules_local_cache.set(redis_plan_rules_key, rules_data_with_conditions, generation=local_cache_generation)
         return rules_data_with_conditions
 
+    async def get_compiled_rules(self, plan_id, service_slug) -> CompiledPlanRules:
+        """
+        Fetches the rules of a plan for a service compiled into predicates.
+
+        Rules are compiled once when they are loaded and kept in `compiled_plan_rules_local_cache`
+        until the plan's rules change.
+
+        :param plan_id: The ID of the plan.
+        :param service_slug: slug of service.
+        """
+        service_slug = getattr(service_slug, "value", service_slug)
+        redis_plan_rules_key = PLAN_RULES_KEY.format(service_slug=service_slug, plan_id=plan_id)
+        compiled_plan_rules = compiled_plan_rules_local_cache.get(redis_plan_rules_key)
+        if compiled_plan_rules is not None:
+            return compiled_plan_rules
+
+        local_cache_generation = compiled_plan_rules_local_cache.generation
+        compiled_plan_rules = compile_plan_rules(await self.get_rules_with_conditions(plan_id, service_slug))
+        compiled_plan_rules_local_cache.set(redis_plan_rules_key, compiled_plan_rules,
+                                            generation=local_cache_generation)
+        return compiled_plan_rules
+
     async def initialize_all_rules_in_redis(self):
-        plan_rules = await self.rules_dao.get_all_rules()
-        plan_rules_with_conditions = {}
-        for plan_rule in plan_rules:
-            if str(plan_rule.plan_id) not in plan_rules_with_conditions:
-                plan_rules_with_conditions[str(plan_rule.plan_id)] = {}
+        """
+        Warms the Redis cache with the rules of every plan.
+
+        Rows are streamed from the database in chunks, grouped into one payload per
+        (plan, service) as they arrive, and written with one MSET per batch of keys.
+        The number of keys written and the elapsed time are exported as metrics.
+        """
+        start_time = time.perf_counter()
+        keys_written = 0
+        pending_keys = {}
+        current_key, current_rules = None, []
 
-            if plan_rule.rule.service_slug.value not in plan_rules_with_conditions[str(plan_rule.plan_id)]:
-                plan_rules_with_conditions[str(plan_rule.plan_id)][plan_rule.rule.service_slug.value] = []
+        async for plan_rules in self.rules_dao.stream_all_plan_rules(chunk_size=PLAN_RULES_WARMUP_CHUNK_SIZE):
+            for plan_id, rule in plan_rules:
+                redis_plan_rules_key = PLAN_RULES_KEY.format(service_slug=rule.service_slug.value, plan_id=plan_id)
+                if redis_plan_rules_key != current_key:
+                    if current_key:
+                        pending_keys[current_key] = json.dumps(current_rules)
+                    current_key, current_rules = redis_plan_rules_key, []
+                current_rules.append(rule.to_dict_with_conditions())
 
-            plan_rules_with_conditions[str(plan_rule.plan_id)][plan_rule.rule.service_slug.value].append(
-                {
-                    "id": str(plan_rule.rule.id),
-                    "name": plan_rule.rule.name,
-                    "description": plan_rule.rule.description,
-                    "scope": plan_rule.rule.scope.value,
-                    "enabled": plan_rule.rule.enabled,
-                    "meta_data": plan_rule.rule.meta_data,
-                    "rule_slug": plan_rule.rule.rule_slug,
-                    "rule_class_name": plan_rule.rule.rule_class_name,
-                    "service_slug": plan_rule.rule.service_slug.value,
-                    "conditions": plan_rule.rule.condition_data or {},
-                }
-            )
+            if len(pending_keys) >= PLAN_RULES_WARMUP_BATCH_SIZE:
+                await self.redis_client.add_keys(pending_keys)
+                keys_written += len(pending_keys)
+                pending_keys = {}
 
-        for plan_id in plan_rules_with_conditions:
-            for service_slug in plan_rules_with_conditions[plan_id]:
-                redis_plan_rules_key = f"plan_rules:{service_slug}:{plan_id}"
-                await self.redis_client.add_key(redis_plan_rules_key,
-                                                json.dumps(plan_rules_with_conditions[plan_id][service_slug]))
+        if current_key:
+            pending_keys[current_key] = json.dumps(current_rules)
+        if pending_keys:
+            await self.redis_client.add_keys(pending_keys)
+            keys_written += len(pending_keys)
+
+        elapsed_time = time.perf_counter() - start_time
+        RULES_CACHE_WARMUP_KEYS.labels(service_name="wayne").set(keys_written)
+        RULES_CACHE_WARMUP_DURATION.labels(service_name="wayne").set(elapsed_time)
+        logger.info("Warmed %d plan rule keys in Redis in %.2f seconds", keys_written, elapsed_time)
 
     async def delete_plan_related_keys(self, user_id: str, org_id: Optional[str] = None):
-        pattern = f"org:{org_id}:rule:*" if org_id else f"user:{user_id}:rule:*"
-        rules_keys = await self.redis_client.get_keys(pattern)
-        for key in rules_keys:
-            await self.redis_client.delete_key(key)
+        """
+        Deletes the rule usage counters of an entity with the configured usage storage.
+
+        :param user_id: The ID of the user.
+        :param org_id: The ID of the organisation, if the usage is tracked per organisation.
+        """
+        await get_rule_usage_storage(self.redis_client).delete_usage(user_id, org_id)
+
+    async def delete_plan_related_keys_batch(self, entities: List[Tuple]):
+        """
+        Deletes the rule usage counters of several entities at once.
+
+        :param entities: (user_id, org_id) tuples, `org_id` being None for per-user usage.
+        """
+        await get_rule_usage_storage(self.redis_client).delete_usage_batch(entities)
+
+    async def consume_quota(self, service_slug, quota_consumption: QuotaConsumptionSchema):
+        """
+        Checks and consumes quota against every enabled rule with a `request_limit` in the
+        plan's rules for a service.
+
+        The check and the increments run as one Lua script, so concurrent callers cannot
+        both pass a limit with a single unit left, and a denied call consumes nothing.
+        Counters reset at the end of the rule's `reset_period`, aligned to UTC boundaries.
+
+        :param service_slug: slug of service.
+        :param quota_consumption: The plan, the consuming entity and the units consumed.
+        :return: Whether the call is allowed and the remaining quota of every enforced rule.
+        """
+        compiled_plan_rules = await self.get_compiled_rules(str(quota_consumption.plan_id), service_slug)
+        limited_rules, rule_limits = compiled_plan_rules.get_rule_limits()
+        if not rule_limits:
+            return {"allowed": True, "rules": []}
+
+        allowed, rules_usage = await get_rule_usage_storage(self.redis_client).consume_usage(
+            rule_limits, quota_consumption.user_id, quota_consumption.org_id, quota_consumption.units
+        )
+        return self._build_quota_result(limited_rules, rule_limits, allowed, rules_usage, quota_consumption.units)
+
+    async def consume_quota_batch(self, batch_quota_consumption: BatchQuotaConsumptionSchema):
+        """
+        Applies a batch of usage records with a single Redis pipeline.
+
+        The rules of every distinct (plan, service) pair are fetched once, then each record
+        runs the same atomic check-and-increment as `consume_quota`, in the order received.
+        A record whose metric matches none of the plan's rules is denied with an error and
+        consumes nothing; the other records are processed as usual.
+
+        :param batch_quota_consumption: The usage records.
+        :return: The `consume_quota` result of every record, in the same order.
+        """
+        records = batch_quota_consumption.records
+        plan_services_rules = {}
+        for record in records:
+            plan_service = (str(record.plan_id), record.service_slug)
+            if plan_service not in plan_services_rules:
+                plan_services_rules[plan_service] = await self.get_compiled_rules(*plan_service)
+
+        results, consumptions, consumed_records = [None] * len(records), [], []
+        for index, record in enumerate(records):
+            compiled_plan_rules = plan_services_rules[(str(record.plan_id), record.service_slug)]
+            try:
+                limited_rules, rule_limits = compiled_plan_rules.get_rule_limits(record.metric)
+            except UnknownMetricError as e:
+                results[index] = {"allowed": False, "rules": [], "error": e.message}
+                continue
+            if not rule_limits:
+                results[index] = {"allowed": True, "rules": []}
+                continue
+            consumptions.append((rule_limits, record.user_id, record.org_id, record.units))
+            consumed_records.append((index, limited_rules, rule_limits, record.units))
+
+        consumed_usage = await get_rule_usage_storage(self.redis_client).consume_usage_batch(consumptions)
+        for (index, limited_rules, rule_limits, units), (allowed, rules_usage) in zip(consumed_records,
+                                                                                    consumed_usage):
+            results[index] = self._build_quota_result(limited_rules, rule_limits, allowed, rules_usage, units)
+        return results
+
+    async def evaluate_rules(self, service_slug, rule_evaluation: RuleEvaluationSchema):
+        """
+        Evaluates an entity's current usage and the given metrics against the compiled rules
+        of a plan for a service, without consuming anything.
+
+        :param service_slug: slug of service.
+        :param rule_evaluation: The plan, the entity, the units about to be consumed and the metrics.
+        :return: Whether every rule allows the units and each rule's verdict.
+        """
+        compiled_plan_rules = await self.get_compiled_rules(str(rule_evaluation.plan_id), service_slug)
+        rule_ids = [rule.id for rule in compiled_plan_rules.limited_rules]
+        rules_usage = await get_rule_usage_storage(self.redis_client).get_usage(
+            rule_ids, rule_evaluation.user_id, rule_evaluation.org_id
+        )
+        usage = {rule_id: int(value) for rule_id, value in zip(rule_ids, rules_usage) if value}
+
+        allowed, verdicts = compiled_plan_rules.evaluate(usage, rule_evaluation.metrics, rule_evaluation.units)
+        return {
+            "allowed": allowed,
+            "rules": [
+                {
+                    "id": rule.id,
+                    "name": rule.name,
+                    "request_limit": rule.request_limit,
+                    "current_value": usage.get(rule.id, 0),
+                    "allowed": rule_allowed
+                }
+                for rule, rule_allowed in verdicts
+            ]
+        }
+
+    @staticmethod
+    def _build_quota_result(limited_rules, rule_limits, allowed: bool, rules_usage, units: int):
+        return {
+            "allowed": allowed,
+            "rules": [
+                {
+                    "id": rule.id,
+                    "name": rule.name,
+                    "request_limit": request_limit,
+                    "current_value": current_value,
+                    "remaining": max(request_limit - current_value, 0),
+                    "allowed": current_value + (0 if allowed else units) <= request_limit,
+                    "reset_at": period_end
+                }
+                for rule, (_, request_limit, period_end), current_value in zip(limited_rules, rule_limits, rules_usage)
+            ]
+        }
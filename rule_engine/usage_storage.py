@@ -0,0 +1,228 @@
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import List, Optional, Tuple
+
+from config.settings import loaded_config
+from rule_engine.utils import get_usage_entity_key, get_rule_usage_key, get_rule_usage_index_key
+from utils.redis_client import RedisClient
+
+
+# KEYS[1] = usage index set, KEYS[2..] = usage counters
+# ARGV[1] = units, then a (limit, period end) pair per counter; a period end of 0 never expires.
+# Every counter is checked before any is incremented, so a denied call consumes nothing.
+CONSUME_KEY_USAGE_SCRIPT = """
+local units = tonumber(ARGV[1])
+local used = {}
+local allowed = 1
+for i = 2, #KEYS do
+    local current = tonumber(redis.call('GET', KEYS[i]) or '0')
+    used[i - 1] = current
+    if current + units > tonumber(ARGV[2 * i - 2]) then
+        allowed = 0
+    end
+end
+if allowed == 1 then
+    for i = 2, #KEYS do
+        local value = redis.call('INCRBY', KEYS[i], units)
+        used[i - 1] = value
+        local period_end = tonumber(ARGV[2 * i - 1])
+        if period_end > 0 and redis.call('TTL', KEYS[i]) == -1 then
+            redis.call('EXPIREAT', KEYS[i], period_end)
+        end
+        -- Indexed on every write, so counters created before the index existed get registered too.
+        redis.call('SADD', KEYS[1], KEYS[i])
+    end
+end
+table.insert(used, 1, allowed)
+return used
+"""
+
+# KEYS[1] = usage hash
+# ARGV[1] = units, then a (field, limit, period end) triple per counter. Hash fields cannot
+# expire individually, so each counter keeps the end of its window in `{field}:reset_at` and
+# starts again from zero once that no longer matches the current window.
+CONSUME_HASH_USAGE_SCRIPT = """
+local units = tonumber(ARGV[1])
+local used = {}
+local stale = {}
+local allowed = 1
+for c = 1, (#ARGV - 1) / 3 do
+    local field = ARGV[3 * c - 1]
+    local current = 0
+    if (redis.call('HGET', KEYS[1], field .. ':reset_at') or '0') == ARGV[3 * c + 1] then
+        current = tonumber(redis.call('HGET', KEYS[1], field) or '0')
+    else
+        stale[c] = true
+    end
+    used[c] = current
+    if current + units > tonumber(ARGV[3 * c]) then
+        allowed = 0
+    end
+end
+if allowed == 1 then
+    for c = 1, #used do
+        local field = ARGV[3 * c - 1]
+        if stale[c] then
+            redis.call('HSET', KEYS[1], field, units, field .. ':reset_at', ARGV[3 * c + 1])
+            used[c] = units
+        else
+            used[c] = redis.call('HINCRBY', KEYS[1], field, units)
+        end
+    end
+end
+table.insert(used, 1, allowed)
+return used
+"""
+
+
+class RuleUsageStorageMode(str, Enum):
+    KEYS = "keys"
+    HASH = "hash"
+
+
+class RuleUsageStorage(ABC):
+    """Abstract strategy for storing per-entity rule usage counters in Redis."""
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @abstractmethod
+    async def get_usage(self, rule_ids: List, user_id, org_id=None) -> List[Optional[str]]:
+        """Return the usage counters of the given rules, None for rules without usage."""
+        pass
+
+    @abstractmethod
+    async def delete_usage(self, user_id, org_id=None):
+        """Delete every usage counter of the entity."""
+        pass
+
+    @abstractmethod
+    async def delete_usage_batch(self, entities: List[Tuple]):
+        """Delete every usage counter of several (user_id, org_id) entities in one pipeline."""
+        pass
+
+    @abstractmethod
+    def get_consume_script(self, rule_limits: List[Tuple], user_id, org_id=None,
+                           units: int = 1) -> Tuple[str, List, List]:
+        """
+        Builds the Lua invocation that atomically checks `units` against every rule limit
+        and, only if all of them allow it, increments every counter.
+
+        :param rule_limits: (rule_id, request_limit, period_end) tuples, `period_end` being
+            the epoch second the rule's window ends at or None if usage never resets.
+        :return: The script, its keys and its arguments.
+        """
+        pass
+
+    async def consume_usage(self, rule_limits: List[Tuple], user_id, org_id=None,
+                            units: int = 1) -> Tuple[bool, List[int]]:
+        """
+        Consumes `units` against the rule limits of an entity in one script call.
+
+        :return: Whether the units were consumed, and each rule's usage afterwards.
+        """
+        allowed, *used = await self.redis_client.run_script(
+            *self.get_consume_script(rule_limits, user_id, org_id, units)
+        )
+        return bool(allowed), used
+
+    async def consume_usage_batch(self, consumptions: List[Tuple]) -> List[Tuple[bool, List[int]]]:
+        """
+        Applies several consumptions in a single pipeline, in order.
+
+        :param consumptions: (rule_limits, user_id, org_id, units) tuples as taken by `consume_usage`.
+        :return: The `consume_usage` result of every consumption.
+        """
+        replies = await self.redis_client.run_scripts(
+            [self.get_consume_script(*consumption) for consumption in consumptions]
+        )
+        return [(bool(allowed), used) for allowed, *used in replies]
+
+
+class KeyRuleUsageStorage(RuleUsageStorage):
+    """
+    One `{entity}:rule:{rule_id}` string key per counter, registered in the entity's
+    `{entity}:rule_keys` index set.
+
+    Deletions only use the index. Counters created before the index existed are indexed once with
+    `startup.py --backfill-rule-usage-index`; `rule_usage_index_scan_fallback` (off by default)
+    makes deletions SCAN the entity's counters as well, for writers that do not index them yet.
+    """
+
+    async def get_usage(self, rule_ids: List, user_id, org_id=None) -> List[Optional[str]]:
+        return await self.redis_client.get_values(
+            [get_rule_usage_key(rule_id, user_id, org_id) for rule_id in rule_ids]
+        )
+
+    async def delete_usage(self, user_id, org_id=None):
+        await self.redis_client.delete_indexed_keys(get_rule_usage_index_key(user_id, org_id))
+        if loaded_config.rule_usage_index_scan_fallback:
+            await self.redis_client.delete_keys_matching(f"{get_usage_entity_key(user_id, org_id)}:rule:*")
+
+    async def delete_usage_batch(self, entities: List[Tuple]):
+        await self.redis_client.delete_indexed_keys_batch(
+            [get_rule_usage_index_key(user_id, org_id) for user_id, org_id in entities]
+        )
+        if loaded_config.rule_usage_index_scan_fallback:
+            for user_id, org_id in entities:
+                await self.redis_client.delete_keys_matching(f"{get_usage_entity_key(user_id, org_id)}:rule:*")
+
+    def get_consume_script(self, rule_limits: List[Tuple], user_id, org_id=None,
+                           units: int = 1) -> Tuple[str, List, List]:
+        keys = [get_rule_usage_index_key(user_id, org_id)]
+        args = [units]
+        for rule_id, request_limit, period_end in rule_limits:
+            keys.append(get_rule_usage_key(rule_id, user_id, org_id))
+            args.extend([request_limit, period_end or 0])
+        return CONSUME_KEY_USAGE_SCRIPT, keys, args
+
+
+class HashRuleUsageStorage(RuleUsageStorage):
+    """
+    One `{entity}:rule_usage` hash per entity with a field per rule ID, so reading,
+    incrementing and deleting an entity's counters are all single commands.
+    """
+
+    async def get_usage(self, rule_ids: List, user_id, org_id=None) -> List[Optional[str]]:
+        fields = [str(rule_id) for rule_id in rule_ids]
+        values = await self.redis_client.get_hash_values(
+            get_rule_usage_hash_key(user_id, org_id), fields + [f"{field}:reset_at" for field in fields]
+        )
+        now = time.time()
+        # Counters whose window has ended are reset lazily on the next consumption.
+        return [
+            None if reset_at and reset_at != "0" and int(reset_at) <= now else value
+            for value, reset_at in zip(values[:len(fields)], values[len(fields):])
+        ]
+
+    async def delete_usage(self, user_id, org_id=None):
+        await self.redis_client.delete_key(get_rule_usage_hash_key(user_id, org_id))
+
+    async def delete_usage_batch(self, entities: List[Tuple]):
+        await self.redis_client.delete_keys(
+            [get_rule_usage_hash_key(user_id, org_id) for user_id, org_id in entities]
+        )
+
+    def get_consume_script(self, rule_limits: List[Tuple], user_id, org_id=None,
+                           units: int = 1) -> Tuple[str, List, List]:
+        args = [units]
+        for rule_id, request_limit, period_end in rule_limits:
+            args.extend([str(rule_id), request_limit, period_end or 0])
+        return CONSUME_HASH_USAGE_SCRIPT, [get_rule_usage_hash_key(user_id, org_id)], args
+
+
+def get_rule_usage_hash_key(user_id, org_id=None) -> str:
+    return f"{get_usage_entity_key(user_id, org_id)}:rule_usage"
+
+
+def get_rule_usage_storage(redis_client: RedisClient, mode: str = None) -> RuleUsageStorage:
+    """
+    Returns the usage storage strategy configured through `rule_usage_storage_mode`.
+
+    Counters are not migrated between modes, so switching modes starts every entity from zero.
+    """
+    mode = mode or loaded_config.rule_usage_storage_mode
+    if mode == RuleUsageStorageMode.HASH.value:
+        return HashRuleUsageStorage(redis_client)
+    return KeyRuleUsageStorage(redis_client)
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from config.logging import logger
+from utils.redis_client import RedisClient
+
+
+def get_usage_entity_key(user_id, org_id=None) -> str:
+    """
+    Prefix shared by every usage key of an entity: the organisation when there is one, the user otherwise.
+    """
+    return f"org:{org_id}" if org_id else f"user:{user_id}"
+
+
+def get_rule_usage_key(rule_id, user_id, org_id=None) -> str:
+    return f"{get_usage_entity_key(user_id, org_id)}:rule:{rule_id}"
+
+
+def get_rule_usage_index_key(user_id, org_id=None) -> str:
+    """
+    Redis set holding the names of all rule usage keys of an entity.
+
+    Anything that creates a `get_rule_usage_key` counter must also add it to this set,
+    otherwise `RulesService.delete_plan_related_keys` will not delete it (unless the SCAN
+    fallback `rule_usage_index_scan_fallback` is enabled).
+    """
+    return f"{get_usage_entity_key(user_id, org_id)}:rule_keys"
+
+
+def _hour_end(now: datetime) -> datetime:
+    return now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+
+def _day_end(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def _week_end(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=7 - now.weekday())
+
+
+def _month_end(now: datetime) -> datetime:
+    if now.month == 12:
+        return datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(now.year, now.month + 1, 1, tzinfo=timezone.utc)
+
+
+def _year_end(now: datetime) -> datetime:
+    return datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
+
+
+PERIOD_END_CALCULATORS: Dict[str, Callable[[datetime], datetime]] = {
+    "hour": _hour_end, "hourly": _hour_end,
+    "day": _day_end, "daily": _day_end,
+    "week": _week_end, "weekly": _week_end,
+    "month": _month_end, "monthly": _month_end,
+    "year": _year_end, "yearly": _year_end,
+}
+
+
+def get_period_end_calculator(reset_period: Optional[str]) -> Optional[Callable[[datetime], datetime]]:
+    """
+    Resolves a `reset_period` to the function computing the end of its window from a UTC datetime.
+
+    :return: The calculator, or None when the period is missing or unknown and usage never resets.
+    """
+    if not reset_period:
+        return None
+    period_end_calculator = PERIOD_END_CALCULATORS.get(reset_period.strip().lower())
+    if not period_end_calculator:
+        logger.warning("Unknown reset period %s, usage will not be reset", reset_period)
+    return period_end_calculator
+
+
+async def backfill_rule_usage_index(redis_client: RedisClient = None, batch_size: int = 1000) -> int:
+    """
+    One-off SCAN over existing `user:*:rule:*` / `org:*:rule:*` counters that registers each of
+    them in its entity's usage index set.
+
+    :param redis_client: Client to use, a pooled one is created if omitted.
+    :param batch_size: Number of keys requested per SCAN call and written per pipeline.
+    :return: The number of keys indexed.
+    """
+    redis_client = redis_client or RedisClient()
+    indexed_keys = 0
+    for pattern in ("user:*:rule:*", "org:*:rule:*"):
+        pending_members = {}
+        pending_count = 0
+        async for key in redis_client.iter_keys(pattern, count=batch_size):
+            entity_key = key.split(":rule:", 1)[0]
+            pending_members.setdefault(f"{entity_key}:rule_keys", []).append(key)
+            pending_count += 1
+            if pending_count >= batch_size:
+                await redis_client.add_to_sets(pending_members)
+                indexed_keys += pending_count
+                pending_members, pending_count = {}, 0
+        if pending_members:
+            await redis_client.add_to_sets(pending_members)
+            indexed_keys += pending_count
+    logger.info("Backfilled %d rule usage keys into their entity index sets", indexed_keys)
+    return indexed_keys
@@ -5,7 +5,13 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
 from rule_engine.exceptions import RuleError
-from rule_engine.schemas import RuleSchema, BackendService
+from rule_engine.schemas import (
+    RuleSchema,
+    BackendService,
+    QuotaConsumptionSchema,
+    BatchQuotaConsumptionSchema,
+    RuleEvaluationSchema
+)
 from rule_engine.services import RulesService
 from utils.connection_handler import get_connection_handler_for_app, ConnectionHandler
 from utils.serializers import ResponseData
@@ -140,3 +146,77 @@ async def get_rules_with_conditions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=jsonable_encoder(response_data)
         )
+
+
+async def consume_quota(
+        service_slug: BackendService,
+        quota_consumption: QuotaConsumptionSchema,
+        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    response_data = ResponseData.construct(success=True)
+    try:
+        rules_service = RulesService(connection_handler=connection_handler)
+        data = await rules_service.consume_quota(service_slug, quota_consumption)
+        response_data.data = data
+        return response_data
+
+    except RuleError as e:
+        return handle_rule_exception(response_data, e)
+
+    except Exception as e:
+        response_data.success = False
+        response_data.message = f"Failed to consume quota for {service_slug} on plan {quota_consumption.plan_id}"
+        response_data.errors = [str(e)]
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content=jsonable_encoder(response_data)
+        )
+
+
+async def consume_quota_batch(
+        batch_quota_consumption: BatchQuotaConsumptionSchema,
+        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    response_data = ResponseData.construct(success=True)
+    try:
+        rules_service = RulesService(connection_handler=connection_handler)
+        data = await rules_service.consume_quota_batch(batch_quota_consumption)
+        response_data.data = data
+        return response_data
+
+    except RuleError as e:
+        return handle_rule_exception(response_data, e)
+
+    except Exception as e:
+        response_data.success = False
+        response_data.message = f"Failed to consume quota for {len(batch_quota_consumption.records)} records"
+        response_data.errors = [str(e)]
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content=jsonable_encoder(response_data)
+        )
+
+
+async def evaluate_rules(
+        service_slug: BackendService,
+        rule_evaluation: RuleEvaluationSchema,
+        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app),
+):
+    response_data = ResponseData.construct(success=True)
+    try:
+        rules_service = RulesService(connection_handler=connection_handler)
+        data = await rules_service.evaluate_rules(service_slug, rule_evaluation)
+        response_data.data = data
+        return response_data
+
+    except RuleError as e:
+        return handle_rule_exception(response_data, e)
+
+    except Exception as e:
+        response_data.success = False
+        response_data.message = f"Failed to evaluate rules for {service_slug} on plan {rule_evaluation.plan_id}"
+        response_data.errors = [str(e)]
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content=jsonable_encoder(response_data)
+        )
@@ -7,6 +7,7 @@ It handles database migrations using Alembic and seeds initial model configurati
 Usage:
     python startup.py --migrate  # Run database migrations
     python startup.py --all      # Run both migrations and seeding
+    python startup.py --backfill-rule-usage-index  # Index existing rule usage keys in Redis
     python startup.py            # Show help message
 
 The script uses the same database connection handling as the main application,
@@ -34,6 +35,19 @@ async def run_alembic_upgrade():
     print("Alembic migrations completed successfully")
 
 
+async def run_rule_usage_index_backfill():
+    """
+    Register every existing rule usage counter in its entity's usage index set.
+
+    Needed once before `RulesService.delete_plan_related_keys` stops scanning the keyspace,
+    so counters written earlier are still cleaned up on plan changes.
+    """
+    from rule_engine.utils import backfill_rule_usage_index
+
+    print("Backfilling rule usage index...")
+    indexed_keys = await backfill_rule_usage_index()
+    print(f"Rule usage index backfill completed, {indexed_keys} keys indexed")
+
 
 async def main():
     """
@@ -46,15 +60,18 @@ async def main():
     Command line arguments:
         --migrate: Run database migrations
         --all: Run both migrations and seeding
+        --backfill-rule-usage-index: Index existing rule usage keys in Redis
     """
     parser = argparse.ArgumentParser(description="Database setup and initialization script")
     parser.add_argument("--migrate", action="store_true", help="Run database migrations")
     parser.add_argument("--all", action="store_true", help="Run both migrations and seeding")
+    parser.add_argument("--backfill-rule-usage-index", action="store_true",
+                        help="Index existing rule usage keys in Redis")
 
     args = parser.parse_args()
 
     # If no arguments provided, show help
-    if not (args.migrate or args.all):
+    if not (args.migrate or args.all or args.backfill_rule_usage_index):
         parser.print_help()
         return
 
@@ -62,6 +79,8 @@ async def main():
     if args.migrate or args.all:
         await run_alembic_upgrade()
 
+    if args.backfill_rule_usage_index:
+        await run_rule_usage_index_backfill()
 
     print("Requested startup tasks completed successfully")
 
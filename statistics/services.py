@@ -4,8 +4,11 @@ from clerk_integration.utils import UserData
 
 from config.logging import logger
 from config.settings import loaded_config
+from rule_engine.cache import plan_rule_details_local_cache
 from rule_engine.dao import RulesDAO
 from rule_engine.schemas import RuleDetailsSchema
+from rule_engine.usage_storage import get_rule_usage_storage
+from utils.cache import single_flight
 from utils.connection_handler import ConnectionHandler
 from utils.redis_client import RedisClient
 
@@ -14,12 +17,50 @@ class StatisticsService:
 
     def __init__(self, connection_handler: ConnectionHandler):
         self.redis_client = RedisClient()
-        self.rules_dao = RulesDAO(connection_handler.session)
+        self.rules_dao = RulesDAO(connection_handler.read_session)
+
+    async def get_plan_rule_details(self, plan_id: str) -> List[Dict]:
+        """
+        Get the static details (name, limit, reset period) of every rule of a plan.
+
+        The details are computed once per plan and kept in `plan_rule_details_local_cache`
+        until the plan's rules change.
+        """
+        plan_rule_details = plan_rule_details_local_cache.get(plan_id)
+        if plan_rule_details is not None:
+            return plan_rule_details
+
+        local_cache_generation = plan_rule_details_local_cache.generation
+        plan_rule_details = await single_flight.do(
+            f"plan_rule_details:{plan_id}", lambda: self._load_plan_rule_details(plan_id)
+        )
+        plan_rule_details_local_cache.set(plan_id, plan_rule_details, generation=local_cache_generation)
+        return plan_rule_details
+
+    async def _load_plan_rule_details(self, plan_id: str) -> List[Dict]:
+        plan_rule_details = []
+        for rule in await self.rules_dao.get_rules_by_plan_id(plan_id):
+            try:
+                rule_details = RuleDetailsSchema.model_validate(rule).model_dump()
+                condition_data = rule_details.get("condition_data") or {}
+                plan_rule_details.append({
+                    "id": rule.id,
+                    "name": rule_details.get("name"),
+                    "description": rule_details.get("description"),
+                    "enabled": rule_details.get("enabled"),
+                    "request_limit": condition_data.get("request_limit"),
+                    "reset_period": condition_data.get("reset_period")
+                })
+            except Exception as rule_err:
+                plan_rule_details.append({"id": rule.id, "error": str(rule_err)})
+        return plan_rule_details
 
     async def get_service_usage_stats(self, user_data: UserData) -> List[Dict]:
         """
         Get service usage statistics with concise rule details as a flat list with usage percentage.
 
+        All usage counters of the plan are read with a single Redis command.
+
         Returns:
             List of rule statistics objects with flat structure and calculated usage percentage.
         """
@@ -27,46 +68,45 @@ class StatisticsService:
         try:
             plan_id = user_data.publicMetadata.get("subscription", {}).get(
                 "active_plan_id", "") or loaded_config.fallback_plan_id
-            plan_rules = await self.rules_dao.get_rules_by_plan_id(plan_id)
+            plan_rule_details = await self.get_plan_rule_details(plan_id)
 
-            for rule in plan_rules:
-                redis_rule_key = f"org:{user_data.orgId}:rule:{rule.id}" if user_data.orgId \
-                    else f"user:{user_data.userId}:rule:{rule.id}"
-                current_rule_usage = await self.redis_client.get_key(redis_rule_key) or 0
-                try:
-                    # Convert to Pydantic model and then to dict
-                    rule_details = RuleDetailsSchema.model_validate(rule).model_dump()
+            rules_usage = await get_rule_usage_storage(self.redis_client).get_usage(
+                [rule["id"] for rule in plan_rule_details], user_data.userId, user_data.orgId
+            )
 
-                    # Extract request_limit from condition_data
-                    request_limit = None
-                    reset_period = None
-                    if rule_details.get("condition_data") and isinstance(rule_details["condition_data"], dict):
-                        request_limit = rule_details["condition_data"].get("request_limit")
-                        reset_period = rule_details["condition_data"].get("reset_period")
+            for rule, current_rule_usage in zip(plan_rule_details, rules_usage):
+                current_rule_usage = current_rule_usage or 0
+                if "error" in rule:
+                    stats_list.append({
+                        "id": rule["id"],
+                        "current_value": current_rule_usage,
+                        "error": rule["error"]
+                    })
+                    continue
 
+                try:
                     # Calculate percentage if possible
+                    request_limit = rule["request_limit"]
                     usage_percentage = 0
                     if request_limit and current_rule_usage and current_rule_usage.isdigit():
                         current_value = int(current_rule_usage)
                         usage_percentage = round((current_value / request_limit) * 100, 2)
 
                     # Create flat structure
-                    stat_obj = {
-                        "id": rule.id,
-                        "name": rule_details.get("name"),
-                        "description": rule_details.get("description"),
-                        "enabled": rule_details.get("enabled"),
+                    stats_list.append({
+                        "id": rule["id"],
+                        "name": rule["name"],
+                        "description": rule["description"],
+                        "enabled": rule["enabled"],
                         "current_value": int(current_rule_usage),
                         "request_limit": request_limit,
                         "usage_percentage": usage_percentage,
-                        "reset_period": reset_period
-                    }
-
-                    stats_list.append(stat_obj)
+                        "reset_period": rule["reset_period"]
+                    })
 
                 except Exception as rule_err:
                     stats_list.append({
-                        "id": rule.id,
+                        "id": rule["id"],
                         "current_value": current_rule_usage,
                         "error": str(rule_err)
                     })
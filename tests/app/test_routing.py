@@ -0,0 +1,21 @@
+from unittest.mock import patch
+
+from app import routing
+
+
+def test_successful_requests_are_sampled():
+    with patch.object(routing.loaded_config, "log_success_sample_rate", 0.1), \
+            patch.object(routing, "logger") as logger, \
+            patch.object(routing.random, "random", side_effect=[0.05, 0.5]):
+        routing.log_api_requests_to_gcp({"path": "/plans"}, {"status_code": 200}, 0.01)
+        routing.log_api_requests_to_gcp({"path": "/plans"}, {"status_code": 200}, 0.01)
+
+    logger.info.assert_called_once()
+
+
+def test_failed_requests_are_always_logged():
+    with patch.object(routing.loaded_config, "log_success_sample_rate", 0), \
+            patch.object(routing, "logger") as logger:
+        routing.log_api_requests_to_gcp({"path": "/plans"}, {"status_code": 500}, 0.01)
+
+    logger.error.assert_called_once()
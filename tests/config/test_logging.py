@@ -0,0 +1,67 @@
+import io
+import threading
+
+import pytest
+import structlog
+
+from config.logging import QueuedLogWriter
+
+
+def render(_, __, event_dict):
+    return str(event_dict["event"])
+
+
+def test_events_are_flushed_on_close():
+    stream = io.StringIO()
+    writer = QueuedLogWriter(render, max_queue_size=10, stream=stream)
+
+    for i in range(3):
+        with pytest.raises(structlog.DropEvent):
+            writer(None, "info", {"event": f"event {i}"})
+    writer.close()
+
+    assert stream.getvalue() == "event 0\nevent 1\nevent 2\n"
+    assert not writer.thread.is_alive()
+
+
+def test_events_are_dropped_and_reported_when_the_queue_is_full():
+    stream = io.StringIO()
+    rendering = threading.Event()
+    release = threading.Event()
+
+    def blocking_render(logger, method_name, event_dict):
+        rendering.set()
+        release.wait()
+        return render(logger, method_name, event_dict)
+
+    writer = QueuedLogWriter(blocking_render, max_queue_size=1, stream=stream)
+    with pytest.raises(structlog.DropEvent):
+        writer(None, "info", {"event": "rendering"})
+    rendering.wait(5)
+    for event in ("queued", "dropped"):
+        with pytest.raises(structlog.DropEvent):
+            writer(None, "info", {"event": event})
+
+    assert writer.dropped == 1
+    release.set()
+    writer.close()
+    assert "dropped" not in stream.getvalue().splitlines()
+    assert "Dropped 1 log events, the log queue was full" in stream.getvalue()
+
+
+def test_event_values_are_snapshotted_before_queueing():
+    class Row:
+        def __repr__(self):
+            return "<Row 1>"
+
+    rows = [Row()]
+    event_dict = {"event": "rows", "rows": rows, "response": {"data": rows}}
+    queued = []
+    writer = QueuedLogWriter(lambda *event: queued.append(event[2]) or "", max_queue_size=10, stream=io.StringIO())
+
+    with pytest.raises(structlog.DropEvent):
+        writer(None, "info", event_dict)
+    rows.append(Row())
+    writer.close()
+
+    assert queued == [{"event": "rows", "rows": ["<Row 1>"], "response": {"data": ["<Row 1>"]}}]
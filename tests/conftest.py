@@ -1,11 +1,14 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from rule_engine.cache import clear_plan_rules
 from rule_engine.services import RulesService
+from statistics.services import StatisticsService
 from utils.connection_handler import ConnectionHandler
 from payments.services import PaymentsService
 from integrations.razorpay_client import RazorpayClient
 from utils.redis_client import RedisClient
+from webhooks.services import WebhookService
 
 
 @pytest.fixture
@@ -34,6 +37,23 @@ def payments_service(mock_connection_handler, mock_razorpay_client, mock_redis_c
 
 @pytest.fixture
 def rules_service(mock_connection_handler, mock_redis_client):
+    clear_plan_rules()
     service = RulesService(connection_handler=mock_connection_handler)
     service.redis_client = mock_redis_client
-    return service
\ No newline at end of file
+    return service
+
+
+@pytest.fixture
+def webhook_service(mock_connection_handler, mock_razorpay_client, mock_redis_client):
+    service = WebhookService(connection_handler=mock_connection_handler)
+    service.razorpay_client = mock_razorpay_client
+    service.redis_client = mock_redis_client
+    return service
+
+
+@pytest.fixture
+def statistics_service(mock_connection_handler, mock_redis_client):
+    clear_plan_rules()
+    service = StatisticsService(connection_handler=mock_connection_handler)
+    service.redis_client = mock_redis_client
+    return service
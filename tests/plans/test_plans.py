@@ -9,12 +9,12 @@ from plans.services import PlansService
 @pytest.mark.asyncio
 async def test_get_all_plans(mock_connection_handler):
     plans_service = PlansService(mock_connection_handler)
-    plans_service.plans_dao.get_all_plans = AsyncMock(return_value=["plan1", "plan2"])
+    plans_service.plans_read_dao.get_all_plans = AsyncMock(return_value=["plan1", "plan2"])
 
     plans = await plans_service.get_all_plans()
 
     assert plans == ["plan1", "plan2"]
-    plans_service.plans_dao.get_all_plans.assert_called_once()
+    plans_service.plans_read_dao.get_all_plans.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,18 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from refunds.views import get_all_refund_requests
+from utils.pagination import InvalidCursorError
+
+
+@pytest.mark.asyncio
+async def test_get_all_refund_requests_rejects_invalid_cursor(mock_connection_handler):
+    with patch("refunds.views.RefundsService") as refunds_service:
+        refunds_service.return_value.get_all_refund_requests = AsyncMock(
+            side_effect=InvalidCursorError("Invalid pagination cursor: abc"))
+        response = await get_all_refund_requests(mock_connection_handler, 1, 10, "abc", False)
+
+    assert response.status_code == 400
+    assert json.loads(response.body)["errors"] == ["Invalid pagination cursor: abc"]
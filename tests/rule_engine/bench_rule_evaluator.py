@@ -0,0 +1,52 @@
+"""
+Microbenchmark of `CompiledPlanRules.evaluate`.
+
+Usage:
+    python -m tests.rule_engine.bench_rule_evaluator [--rules 20] [--number 100000]
+"""
+import argparse
+import timeit
+
+from rule_engine.evaluator import compile_plan_rules
+
+
+def build_plan_rules(rules_count: int):
+    return [
+        {
+            "id": f"rule_{index}",
+            "name": f"Rule {index}",
+            "rule_slug": f"rule-{index}",
+            "enabled": True,
+            "conditions": {
+                "request_limit": 1000,
+                "reset_period": "monthly",
+                "conditions": [{"key": "users_count", "operator": "<=", "value": "50"}],
+            },
+        }
+        for index in range(rules_count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=20, help="Number of rules in the plan")
+    parser.add_argument("--number", type=int, default=100000, help="Evaluations per measurement")
+    args = parser.parse_args()
+
+    plan_rules = build_plan_rules(args.rules)
+    usage = {f"rule_{index}": index for index in range(args.rules)}
+    metrics = {"users_count": 10}
+
+    compile_time = min(timeit.repeat(lambda: compile_plan_rules(plan_rules), number=1000, repeat=5)) / 1000
+    compiled_plan_rules = compile_plan_rules(plan_rules)
+    evaluate_time = min(timeit.repeat(
+        lambda: compiled_plan_rules.evaluate(usage, metrics), number=args.number, repeat=5
+    )) / args.number
+
+    print(f"compile:  {compile_time * 1e6:8.2f} us per plan of {args.rules} rules")
+    print(f"evaluate: {evaluate_time * 1e6:8.2f} us per evaluation, "
+          f"{evaluate_time * 1e9 / args.rules:6.1f} ns per rule")
+
+
+if __name__ == "__main__":
+    main()
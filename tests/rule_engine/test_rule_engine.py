@@ -1,6 +1,12 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from config.settings import loaded_config
+from rule_engine.schemas import QuotaConsumptionSchema, BatchQuotaConsumptionSchema
+
+
 @pytest.mark.asyncio
 async def test_add_rule_to_plan(rules_service, mock_redis_client):
     # Mock the methods
@@ -53,4 +59,201 @@ async def test_update_plan_rules_in_redis(rules_service, mock_redis_client):
 
     mock_redis_client.add_key.assert_called_once_with(
         "plan_rules:service_slug:plan_123", '{"rules": []}'
-    )
\ No newline at end of file
+    )
+
+@pytest.mark.asyncio
+async def test_get_rules_with_conditions_cache_hit(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value='[{"id": "rule_123"}]')
+    rules_service.rules_dao.get_plan_rules_with_conditions = AsyncMock()
+
+    rules = await rules_service.get_rules_with_conditions("plan_123", "service_slug")
+
+    assert rules == [{"id": "rule_123"}]
+    mock_redis_client.get_key.assert_called_once_with("plan_rules:service_slug:plan_123")
+    rules_service.rules_dao.get_plan_rules_with_conditions.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_rules_with_conditions_concurrent_misses_query_once(rules_service, mock_redis_client):
+    async def slow_query(*args):
+        await asyncio.sleep(0.01)
+        return [{"id": "rule_123"}]
+
+    mock_redis_client.get_key = AsyncMock(return_value=None)
+    mock_redis_client.add_key = AsyncMock()
+    mock_redis_client.lock = MagicMock(return_value=MagicMock(acquire=AsyncMock(return_value=True),
+                                                              release=AsyncMock()))
+    rules_service.rules_dao.get_plan_rules_with_conditions = AsyncMock(side_effect=slow_query)
+
+    results = await asyncio.gather(
+        *[rules_service.get_rules_with_conditions("plan_123", "service_slug") for _ in range(10)]
+    )
+
+    assert all(rules == [{"id": "rule_123"}] for rules in results)
+    rules_service.rules_dao.get_plan_rules_with_conditions.assert_called_once_with("plan_123", "SERVICE_SLUG")
+    mock_redis_client.add_key.assert_called_once_with(
+        "plan_rules:service_slug:plan_123", '[{"id": "rule_123"}]', expiration=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_rules_with_conditions_served_from_local_cache(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value='[{"id": "rule_123"}]')
+
+    await rules_service.get_rules_with_conditions("plan_123", "service_slug")
+    rules = await rules_service.get_rules_with_conditions("plan_123", "service_slug")
+
+    assert rules == [{"id": "rule_123"}]
+    mock_redis_client.get_key.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_plan_rules_in_redis_invalidates_local_cache(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value='[{"id": "rule_123"}]')
+    rules_service.rules_dao.get_rule_by_id = AsyncMock(return_value=MagicMock(service_slug=MagicMock(value="service_slug")))
+    rules_service.rules_dao.get_plan_rules_with_conditions = AsyncMock(return_value=[])
+
+    await rules_service.get_rules_with_conditions("plan_123", "service_slug")
+    await rules_service.update_plan_rules_in_redis("plan_123", "rule_123")
+    await rules_service.get_rules_with_conditions("plan_123", "service_slug")
+
+    mock_redis_client.publish.assert_called_once_with("plan_rules:invalidate", "plan_rules:service_slug:plan_123")
+    assert mock_redis_client.get_key.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_initialize_all_rules_in_redis_groups_rules_per_plan_and_service(rules_service, mock_redis_client):
+    def make_rule(rule_id, service_slug):
+        rule = MagicMock(service_slug=MagicMock(value=service_slug))
+        rule.to_dict_with_conditions.return_value = {"id": rule_id}
+        return rule
+
+    async def stream_all_plan_rules(chunk_size):
+        yield [("plan_1", make_rule("rule_1", "cerebrum")), ("plan_1", make_rule("rule_2", "cerebrum"))]
+        yield [("plan_1", make_rule("rule_3", "review-pilot")), ("plan_2", make_rule("rule_4", "cerebrum"))]
+
+    rules_service.rules_dao.stream_all_plan_rules = stream_all_plan_rules
+
+    await rules_service.initialize_all_rules_in_redis()
+
+    mock_redis_client.add_keys.assert_called_once_with({
+        "plan_rules:cerebrum:plan_1": '[{"id": "rule_1"}, {"id": "rule_2"}]',
+        "plan_rules:review-pilot:plan_1": '[{"id": "rule_3"}]',
+        "plan_rules:cerebrum:plan_2": '[{"id": "rule_4"}]',
+    })
+
+
+@pytest.mark.asyncio
+async def test_delete_plan_related_keys_uses_usage_index(rules_service, mock_redis_client):
+    await rules_service.delete_plan_related_keys("user_123", "org_123")
+    await rules_service.delete_plan_related_keys("user_123")
+
+    assert [call.args for call in mock_redis_client.delete_indexed_keys.call_args_list] == [
+        ("org:org_123:rule_keys",), ("user:user_123:rule_keys",)
+    ]
+    mock_redis_client.get_keys.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_delete_plan_related_keys_scans_unindexed_keys(rules_service, mock_redis_client, monkeypatch):
+    monkeypatch.setattr(loaded_config, "rule_usage_index_scan_fallback", True)
+
+    await rules_service.delete_plan_related_keys("user_123", "org_123")
+
+    mock_redis_client.delete_indexed_keys.assert_called_once_with("org:org_123:rule_keys")
+    mock_redis_client.delete_keys_matching.assert_called_once_with("org:org_123:rule:*")
+
+
+@pytest.mark.asyncio
+async def test_delete_plan_related_keys_without_scan_fallback(rules_service, mock_redis_client, monkeypatch):
+    monkeypatch.setattr(loaded_config, "rule_usage_index_scan_fallback", False)
+
+    await rules_service.delete_plan_related_keys("user_123", "org_123")
+
+    mock_redis_client.delete_indexed_keys.assert_called_once_with("org:org_123:rule_keys")
+    mock_redis_client.delete_keys_matching.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_delete_plan_related_keys_hash_storage(rules_service, mock_redis_client, monkeypatch):
+    monkeypatch.setattr(loaded_config, "rule_usage_storage_mode", "hash")
+
+    await rules_service.delete_plan_related_keys("user_123", "org_123")
+
+    mock_redis_client.delete_key.assert_called_once_with("org:org_123:rule_usage")
+    mock_redis_client.delete_indexed_keys.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_consume_quota_runs_one_script_for_enforced_rules(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value=(
+        '[{"id": "rule_1", "name": "Requests", "enabled": true, "conditions": {"request_limit": 3}},'
+        ' {"id": "rule_2", "enabled": false, "conditions": {"request_limit": 5}},'
+        ' {"id": "rule_3", "enabled": true, "conditions": {}},'
+        ' {"id": "rule_4", "name": "Tokens", "enabled": true, "conditions": {"request_limit": 100}}]'
+    ))
+    mock_redis_client.run_script = AsyncMock(return_value=[0, 3, 40])
+    quota_consumption = QuotaConsumptionSchema(
+        plan_id="1f016e25-8b84-6348-b561-9ee0da82673d", user_id="user_123", org_id="org_123"
+    )
+
+    quota = await rules_service.consume_quota("service_slug", quota_consumption)
+
+    assert quota == {
+        "allowed": False,
+        "rules": [
+            {"id": "rule_1", "name": "Requests", "request_limit": 3, "current_value": 3, "remaining": 0,
+             "allowed": False, "reset_at": None},
+            {"id": "rule_4", "name": "Tokens", "request_limit": 100, "current_value": 40, "remaining": 60,
+             "allowed": True, "reset_at": None},
+        ]
+    }
+    mock_redis_client.run_script.assert_called_once()
+    _, keys, args = mock_redis_client.run_script.call_args.args
+    assert keys == ["org:org_123:rule_keys", "org:org_123:rule:rule_1", "org:org_123:rule:rule_4"]
+    assert args == [1, 3, 0, 100, 0]
+
+
+@pytest.mark.asyncio
+async def test_consume_quota_batch_pipelines_records_in_order(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value=(
+        '[{"id": "rule_1", "rule_slug": "chat", "enabled": true, "conditions": {"request_limit": 1}},'
+        ' {"id": "rule_2", "rule_slug": "tokens", "enabled": true, "conditions": {"request_limit": 100}},'
+        ' {"id": "rule_3", "rule_slug": "seats", "enabled": true, "conditions": {}}]'
+    ))
+    mock_redis_client.run_scripts = AsyncMock(return_value=[[1, 1], [0, 1]])
+    plan_id = "1f016e25-8b84-6348-b561-9ee0da82673d"
+    batch_quota_consumption = BatchQuotaConsumptionSchema(records=[
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "chat"},
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "seats"},
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "chat"},
+    ])
+
+    results = await rules_service.consume_quota_batch(batch_quota_consumption)
+
+    assert [result["allowed"] for result in results] == [True, True, False]
+    assert results[1]["rules"] == []
+    mock_redis_client.get_key.assert_called_once_with(f"plan_rules:cerebrum:{plan_id}")
+    calls = mock_redis_client.run_scripts.call_args.args[0]
+    assert [keys for _, keys, _ in calls] == [["user:user_123:rule_keys", "user:user_123:rule:rule_1"]] * 2
+
+
+@pytest.mark.asyncio
+async def test_consume_quota_batch_denies_unknown_metrics_per_record(rules_service, mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(return_value=(
+        '[{"id": "rule_1", "rule_slug": "chat", "enabled": true, "conditions": {"request_limit": 5}}]'
+    ))
+    mock_redis_client.run_scripts = AsyncMock(return_value=[[1, 1], [1, 2]])
+    plan_id = "1f016e25-8b84-6348-b561-9ee0da82673d"
+    batch_quota_consumption = BatchQuotaConsumptionSchema(records=[
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "chat"},
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "unknown"},
+        {"plan_id": plan_id, "user_id": "user_123", "service_slug": "cerebrum", "metric": "chat"},
+    ])
+
+    results = await rules_service.consume_quota_batch(batch_quota_consumption)
+
+    assert [result["allowed"] for result in results] == [True, False, True]
+    assert results[1] == {"allowed": False, "rules": [], "error": "Unknown metric 'unknown'."}
+    assert [rule["current_value"] for rule in results[2]["rules"]] == [2]
+    assert len(mock_redis_client.run_scripts.call_args.args[0]) == 2
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock
+
+from rule_engine.evaluator import compile_plan_rules
+from rule_engine.schemas import RuleEvaluationSchema
+
+PLAN_RULES = [
+    {"id": "rule_1", "name": "Requests", "rule_slug": "requests", "enabled": True,
+     "conditions": {"request_limit": "10", "reset_period": "daily"}},
+    {"id": "rule_2", "name": "Seats", "rule_slug": "seats", "enabled": True,
+     "conditions": {"conditions": [{"key": "users_count", "operator": "<=", "value": "5"},
+                                   {"key": "users_count", "operator": "~", "value": 1}]}},
+    {"id": "rule_3", "name": "Disabled", "rule_slug": "disabled", "enabled": False,
+     "conditions": {"request_limit": 0}},
+]
+
+
+def test_compile_plan_rules_parses_limits_periods_and_conditions():
+    compiled_plan_rules = compile_plan_rules(PLAN_RULES)
+
+    assert [rule.id for rule in compiled_plan_rules.rules] == ["rule_1", "rule_2"]
+    assert [rule.id for rule in compiled_plan_rules.limited_rules] == ["rule_1"]
+    # The condition with an unknown operator is dropped, the threshold is parsed once.
+    assert [(condition.key, condition.threshold) for condition in compiled_plan_rules.rules[1].conditions] == [
+        ("users_count", 5)
+    ]
+    _, rule_limits = compiled_plan_rules.get_rule_limits(now=datetime(2025, 3, 14, 15, tzinfo=timezone.utc))
+    assert rule_limits == [("rule_1", 10, int(datetime(2025, 3, 15, tzinfo=timezone.utc).timestamp()))]
+
+
+def test_compiled_plan_rules_evaluate():
+    compiled_plan_rules = compile_plan_rules(PLAN_RULES)
+
+    allowed, verdicts = compiled_plan_rules.evaluate({"rule_1": 9}, {"users_count": 5})
+    assert allowed and all(rule_allowed for _, rule_allowed in verdicts)
+
+    allowed, verdicts = compiled_plan_rules.evaluate({"rule_1": 9}, {"users_count": 5}, units=2)
+    assert not allowed
+    assert [(rule.id, rule_allowed) for rule, rule_allowed in verdicts] == [("rule_1", False), ("rule_2", True)]
+
+    allowed, _ = compiled_plan_rules.evaluate({}, {})
+    assert not allowed
+
+
+def test_compiled_condition_fails_on_a_metric_of_an_incompatible_type():
+    compiled_plan_rules = compile_plan_rules(PLAN_RULES)
+
+    allowed, verdicts = compiled_plan_rules.evaluate({"rule_1": 0}, {"users_count": "five"})
+    assert not allowed
+    assert [(rule.id, rule_allowed) for rule, rule_allowed in verdicts] == [("rule_1", True), ("rule_2", False)]
+
+
+def test_compile_plan_rules_skips_rules_with_an_invalid_limit():
+    compiled_plan_rules = compile_plan_rules(PLAN_RULES + [
+        {"id": "rule_4", "name": "Broken", "rule_slug": "broken", "enabled": True,
+         "conditions": {"request_limit": "ten"}},
+    ])
+
+    assert [rule.id for rule in compiled_plan_rules.rules] == ["rule_1", "rule_2"]
+
+
+@pytest.mark.asyncio
+async def test_evaluate_rules_compiles_once_per_plan(rules_service, mock_redis_client):
+    rules_service.get_rules_with_conditions = AsyncMock(return_value=PLAN_RULES)
+    mock_redis_client.get_values = AsyncMock(return_value=["3"])
+    rule_evaluation = RuleEvaluationSchema(
+        plan_id="1f016e25-8b84-6348-b561-9ee0da82673d", user_id="user_123", metrics={"users_count": 6}
+    )
+
+    await rules_service.evaluate_rules("cerebrum", rule_evaluation)
+    result = await rules_service.evaluate_rules("cerebrum", rule_evaluation)
+
+    assert result == {
+        "allowed": False,
+        "rules": [
+            {"id": "rule_1", "name": "Requests", "request_limit": 10, "current_value": 3, "allowed": True},
+            {"id": "rule_2", "name": "Seats", "request_limit": None, "current_value": 0, "allowed": False},
+        ]
+    }
+    rules_service.get_rules_with_conditions.assert_called_once()
+    mock_redis_client.get_values.assert_called_with(["user:user_123:rule:rule_1"])
@@ -0,0 +1,54 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from rule_engine.cache import invalidate_plan_rules
+
+PLAN_ID = "1f016e25-8b84-6348-b561-9ee0da82673d"
+REQUESTS_RULE_ID = UUID("6f1d2c3b-0000-4000-8000-000000000001")
+SEATS_RULE_ID = UUID("6f1d2c3b-0000-4000-8000-000000000002")
+
+
+def plan_rules():
+    return [
+        SimpleNamespace(id=REQUESTS_RULE_ID, name="Requests", description="API requests", enabled=True,
+                        service_slug="cerebrum", condition_data={"request_limit": 10, "reset_period": "daily"}),
+        SimpleNamespace(id=SEATS_RULE_ID, name="Seats", description="Seats", enabled=True,
+                        service_slug="cerebrum", condition_data={}),
+    ]
+
+
+def user_data():
+    return MagicMock(userId="user_123", orgId="org_123",
+                     publicMetadata={"subscription": {"active_plan_id": PLAN_ID}})
+
+
+@pytest.mark.asyncio
+async def test_get_service_usage_stats_reads_usage_with_one_mget(statistics_service, mock_redis_client):
+    statistics_service.rules_dao.get_rules_by_plan_id = AsyncMock(return_value=plan_rules())
+    mock_redis_client.get_values = AsyncMock(return_value=["4", None])
+
+    stats = await statistics_service.get_service_usage_stats(user_data())
+
+    mock_redis_client.get_values.assert_called_once_with(
+        [f"org:org_123:rule:{REQUESTS_RULE_ID}", f"org:org_123:rule:{SEATS_RULE_ID}"]
+    )
+    assert [(stat["id"], stat["current_value"], stat["usage_percentage"]) for stat in stats] == [
+        (REQUESTS_RULE_ID, 4, 40.0),
+        (SEATS_RULE_ID, 0, 0),
+    ]
+    assert stats[0]["reset_period"] == "daily"
+
+
+@pytest.mark.asyncio
+async def test_plan_rule_details_are_cached_until_the_plan_rules_change(statistics_service):
+    statistics_service.rules_dao.get_rules_by_plan_id = AsyncMock(return_value=plan_rules())
+
+    await statistics_service.get_plan_rule_details(PLAN_ID)
+    await statistics_service.get_plan_rule_details(PLAN_ID)
+    assert statistics_service.rules_dao.get_rules_by_plan_id.await_count == 1
+
+    invalidate_plan_rules(f"plan_rules:cerebrum:{PLAN_ID}")
+    await statistics_service.get_plan_rule_details(PLAN_ID)
+    assert statistics_service.rules_dao.get_rules_by_plan_id.await_count == 2
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from payments.dao import PaymentsDAO
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def compile_statement(statement) -> str:
+    return " ".join(str(statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )).split())
+
+
+def claimed(downgrade_ids):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = downgrade_ids
+    return result
+
+
+def downgraded(rows):
+    result = MagicMock()
+    result.all.return_value = [MagicMock(user_id=user_id, org_id=org_id) for user_id, org_id in rows]
+    return result
+
+
+@pytest.mark.asyncio
+async def test_downgrade_expired_trials_claims_and_downgrades_in_one_transaction(session):
+    session.execute.side_effect = [claimed([1, 2]), downgraded([("user_1", None)])]
+
+    result = await PaymentsDAO(session).downgrade_expired_trials("basic_plan", limit=100)
+
+    # The second downgrade had no active trial left, it is completed without moving anything.
+    assert result == (2, [("user_1", None)])
+    claim_sql = compile_statement(session.execute.await_args_list[0].args[0])
+    assert claim_sql.startswith("UPDATE scheduled_downgrades SET status='completed'")
+    assert "scheduled_downgrades.status = 'pending'" in claim_sql
+    assert "LIMIT 100 FOR UPDATE SKIP LOCKED" in claim_sql
+    downgrade_sql = compile_statement(session.execute.await_args_list[1].args[0])
+    assert downgrade_sql.startswith("UPDATE subscriptions SET plan_id='basic_plan', status='active'")
+    assert " FROM scheduled_downgrades WHERE " in downgrade_sql
+    assert "scheduled_downgrades.id IN (1, 2)" in downgrade_sql
+    assert "subscriptions.org_id IS NOT DISTINCT FROM scheduled_downgrades.org_id" in downgrade_sql
+    assert "subscriptions.is_trial = true AND subscriptions.is_active = true" in downgrade_sql
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_downgrade_expired_trials_only_claims_the_given_downgrades(session):
+    session.execute.side_effect = [claimed([])]
+
+    assert await PaymentsDAO(session).downgrade_expired_trials("basic_plan", limit=10, downgrade_ids=[7]) == (0, [])
+
+    claim_sql = compile_statement(session.execute.await_args.args[0])
+    assert "scheduled_downgrades.id IN (7)" in claim_sql
+    assert session.execute.await_count == 1
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_downgrade_expired_trials_rolls_back_on_error(session):
+    session.execute.side_effect = [claimed([1]), RuntimeError("connection lost")]
+
+    with pytest.raises(RuntimeError):
+        await PaymentsDAO(session).downgrade_expired_trials("basic_plan", limit=10)
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock
 from payments.services import PaymentsService
 from payments.schemas import CreateSubscription
 from payments.exceptions import SubscriptionConflictError, PaymentError, SubscriptionNotFoundError
+from payments.models import PSPName
 from utils.common import UserData
 
 
@@ -109,23 +110,86 @@ async def test_get_subscription_by_id_not_found(payments_service):
 
 @pytest.mark.asyncio
 async def test_get_subscriptions_by_user_org(payments_service, mock_user_data):
-    mock_subscription = MagicMock(plan_id="plan_123")
-    payments_service.payments_dao.get_subscriptions_by_user_and_org_id = AsyncMock(return_value=mock_subscription)
+    mock_subscription = MagicMock(plan_id="plan_123", amount="10000", billing_cycle="monthly",
+                                  psp_name=PSPName.RAZORPAY, status="active",
+                                  current_start=1700000000, current_end=4102444800)
 
     # Explicitly set the 'name' and 'description' attributes
     mock_plan = MagicMock()
     mock_plan.name = "Plan A"
     mock_plan.description = "Description A"
 
-    payments_service.plans_dao.get_plan_by_id = AsyncMock(return_value=mock_plan)
+    payments_service.payments_dao.get_active_subscription_with_plan = AsyncMock(
+        return_value=(mock_subscription, mock_plan))
+    background_task = MagicMock()
 
     subscription_details = await payments_service.get_subscriptions_by_user_org(
         mock_user_data.userId,
-        mock_user_data.orgId
+        mock_user_data.orgId,
+        mock_user_data.firstName,
+        mock_user_data.lastName,
+        background_task
     )
 
-    # Assert the correct name is returned
+    # Assert the correct name is returned and the stored billing period is used
     assert subscription_details["plan_name"] == "Plan A"
+    assert subscription_details["current_end"] == 4102444800
+    assert subscription_details["cancel_at_cycle_end"] == mock_subscription.cancel_at_cycle_end
+    payments_service.razorpay_client.get_subscription_details.assert_not_called()
+    background_task.add_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_subscriptions_by_user_org_refreshes_stale_paddle_period(payments_service, mock_user_data):
+    mock_subscription = MagicMock(plan_id="plan_123", amount="10000", billing_cycle="monthly",
+                                  psp_name=PSPName.PADDLE, status="active",
+                                  current_start=1600000000, current_end=1600086400)
+    payments_service.payments_dao.get_active_subscription_with_plan = AsyncMock(
+        return_value=(mock_subscription, MagicMock()))
+    payments_service.paddle_client = MagicMock()
+    payments_service.paddle_client.get_subscription_details = AsyncMock()
+    background_task = MagicMock()
+
+    subscription_details = await payments_service.get_subscriptions_by_user_org(
+        mock_user_data.userId, mock_user_data.orgId, mock_user_data.firstName, mock_user_data.lastName,
+        background_task
+    )
+
+    # The stored period is returned as is and refreshed from Paddle after the response
+    assert subscription_details["current_end"] == 1600086400
+    payments_service.paddle_client.get_subscription_details.assert_not_called()
+    background_task.add_task.assert_called_once_with(payments_service.refresh_billing_period, mock_subscription)
+
+
+@pytest.mark.asyncio
+async def test_refresh_billing_period_of_a_razorpay_subscription(payments_service):
+    mock_subscription = MagicMock(psp_name=PSPName.RAZORPAY, psp_subscription_id="sub_123",
+                                  current_start=1600000000, current_end=1600086400)
+    payments_service.razorpay_client.get_subscription_details = AsyncMock(
+        return_value={"id": "sub_123", "current_start": 1700000000, "current_end": 1702592000})
+    payments_service.payments_dao.update_subscription = AsyncMock()
+
+    await payments_service.refresh_billing_period(mock_subscription)
+
+    assert (mock_subscription.current_start, mock_subscription.current_end) == (1700000000, 1702592000)
+    payments_service.payments_dao.update_subscription.assert_awaited_once_with(mock_subscription)
+
+
+@pytest.mark.asyncio
+async def test_get_subscriptions_by_user_org_does_not_refresh_inactive_period(payments_service, mock_user_data):
+    mock_subscription = MagicMock(plan_id="plan_123", amount="10000", billing_cycle="monthly",
+                                  psp_name=PSPName.PADDLE, status="halted",
+                                  current_start=None, current_end=None)
+    payments_service.payments_dao.get_active_subscription_with_plan = AsyncMock(
+        return_value=(mock_subscription, MagicMock()))
+    background_task = MagicMock()
+
+    await payments_service.get_subscriptions_by_user_org(
+        mock_user_data.userId, mock_user_data.orgId, mock_user_data.firstName, mock_user_data.lastName,
+        background_task
+    )
+
+    background_task.add_task.assert_not_called()
 
 
 @pytest.mark.asyncio
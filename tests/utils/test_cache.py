@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+
+from utils.cache import INVALIDATE_SCRIPT, SET_IF_VERSION_UNCHANGED_SCRIPT, ReadThroughCache
+
+
+@pytest.mark.asyncio
+async def test_versioned_load_writes_back_only_for_the_version_read_before_loading(mock_redis_client):
+    mock_redis_client.get_key = AsyncMock(side_effect=[None, "3"])
+    mock_redis_client.run_script = AsyncMock(return_value=1)
+    cache = ReadThroughCache(mock_redis_client, expiration=30, versioned=True)
+
+    value = await cache.get("psp_response:razorpay:/subscriptions/sub_123", AsyncMock(return_value={"id": "sub_123"}))
+
+    assert value == {"id": "sub_123"}
+    mock_redis_client.add_key.assert_not_called()
+    mock_redis_client.run_script.assert_awaited_once_with(
+        SET_IF_VERSION_UNCHANGED_SCRIPT,
+        ["psp_response:razorpay:/subscriptions/sub_123", "psp_response:razorpay:/subscriptions/sub_123:version"],
+        ["3", json.dumps({"id": "sub_123"}), 30]
+    )
+
+
+@pytest.mark.asyncio
+async def test_invalidate_bumps_the_version(mock_redis_client):
+    mock_redis_client.run_script = AsyncMock(return_value=1)
+
+    await ReadThroughCache(mock_redis_client, versioned=True).invalidate("key")
+
+    mock_redis_client.run_script.assert_awaited_once_with(INVALIDATE_SCRIPT, ["key", "key:version"], [86400])
+
+
+@pytest.mark.asyncio
+async def test_callers_after_an_invalidation_do_not_join_a_load_in_flight(mock_redis_client):
+    # The first caller reads version 1, the invalidation bumps it to 2 before the second caller arrives.
+    mock_redis_client.get_key = AsyncMock(side_effect=[None, "1", None, "2"])
+    mock_redis_client.run_script = AsyncMock(return_value=1)
+    cache = ReadThroughCache(mock_redis_client, expiration=30, versioned=True)
+    release_first_load = asyncio.Event()
+
+    async def stale_load():
+        await release_first_load.wait()
+        return {"status": "created"}
+
+    first = asyncio.create_task(cache.get("key", stale_load))
+    await asyncio.sleep(0)
+    second = await cache.get("key", AsyncMock(return_value={"status": "active"}))
+    release_first_load.set()
+
+    assert second == {"status": "active"}
+    assert await first == {"status": "created"}
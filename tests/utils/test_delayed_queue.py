@@ -0,0 +1,24 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from utils.delayed_queue import POP_DUE_SCRIPT, DelayedQueue
+
+
+@pytest.mark.asyncio
+async def test_pop_due_pops_due_jobs_atomically(mock_redis_client):
+    mock_redis_client.run_script = AsyncMock(return_value=["downgrade_1", "downgrade_2"])
+
+    jobs = await DelayedQueue(mock_redis_client, "trial_expiry_queue").pop_due(50, now=1700000000)
+
+    assert jobs == ["downgrade_1", "downgrade_2"]
+    mock_redis_client.run_script.assert_awaited_once_with(POP_DUE_SCRIPT, ["trial_expiry_queue"], [1700000000, 50])
+
+
+@pytest.mark.asyncio
+async def test_pop_due_defaults_to_the_current_time(mock_redis_client, monkeypatch):
+    mock_redis_client.run_script = AsyncMock(return_value=[])
+    monkeypatch.setattr("utils.delayed_queue.time.time", lambda: 1700000123.5)
+
+    assert await DelayedQueue(mock_redis_client, "trial_expiry_queue").pop_due(10) == []
+
+    mock_redis_client.run_script.assert_awaited_once_with(POP_DUE_SCRIPT, ["trial_expiry_queue"], [1700000123.5, 10])
@@ -0,0 +1,10 @@
+from utils.redis_client import RedisClient
+
+
+def test_clients_for_the_same_url_share_a_connection_pool():
+    first = RedisClient(payment_url="redis://127.0.0.1:6379/5")
+    second = RedisClient(payment_url="redis://127.0.0.1:6379/5")
+    other = RedisClient(payment_url="redis://127.0.0.1:6379/6")
+
+    assert first.client is second.client
+    assert other.client is not first.client
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from config.settings import loaded_config
+from payments.models import PSPName
+from webhooks.exceptions import DuplicateWebhookEventError
+from webhooks.idempotency import store_webhook_event
+
+
+@pytest.fixture
+def redis_client():
+    with patch("webhooks.idempotency.RedisClient") as redis_client_class:
+        redis_client_class.return_value.exists_key = AsyncMock(return_value=False)
+        redis_client_class.return_value.add_key = AsyncMock()
+        yield redis_client_class.return_value
+
+
+@pytest.fixture
+def add_webhook_event():
+    with patch("webhooks.idempotency.WebhookDAO") as webhook_dao_class, \
+            patch("webhooks.idempotency.get_webhook_partition_key", return_value="sub_123"):
+        webhook_dao_class.return_value.add_webhook_event = AsyncMock()
+        yield webhook_dao_class.return_value.add_webhook_event
+
+
+@pytest.mark.asyncio
+async def test_new_event_is_stored_then_recorded(mock_connection_handler, redis_client, add_webhook_event):
+    assert await store_webhook_event(mock_connection_handler, PSPName.RAZORPAY, "invoice.paid", "evt_1", {})
+
+    add_webhook_event.assert_awaited_once_with(PSPName.RAZORPAY, "invoice.paid", {}, "sub_123", "evt_1")
+    redis_client.add_key.assert_awaited_once_with("webhook_event:Razorpay:evt_1", "1",
+                                                  loaded_config.webhook_dedup_ttl)
+
+
+@pytest.mark.asyncio
+async def test_event_recorded_in_redis_skips_the_database(mock_connection_handler, redis_client, add_webhook_event):
+    redis_client.exists_key.return_value = True
+
+    assert not await store_webhook_event(mock_connection_handler, PSPName.RAZORPAY, "invoice.paid", "evt_1", {})
+
+    add_webhook_event.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_event_already_in_the_inbox_is_a_duplicate(mock_connection_handler, redis_client, add_webhook_event):
+    add_webhook_event.side_effect = DuplicateWebhookEventError("evt_1")
+
+    assert not await store_webhook_event(mock_connection_handler, PSPName.RAZORPAY, "invoice.paid", "evt_1", {})
+
+    redis_client.add_key.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [RuntimeError("database unavailable"), asyncio.CancelledError()])
+async def test_event_not_stored_is_not_recorded(mock_connection_handler, redis_client, add_webhook_event, error):
+    add_webhook_event.side_effect = error
+
+    with pytest.raises(type(error)):
+        await store_webhook_event(mock_connection_handler, PSPName.RAZORPAY, "invoice.paid", "evt_1", {})
+
+    redis_client.add_key.assert_not_awaited()
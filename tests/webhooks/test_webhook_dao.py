@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from webhooks.constants import WebhookEventStatus
+from webhooks.dao import WebhookDAO
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def compile_statement(statement) -> str:
+    return " ".join(str(statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )).split())
+
+
+@pytest.mark.asyncio
+async def test_claim_webhook_events_claims_partition_heads(session):
+    claimed_events = [MagicMock()]
+    session.execute.return_value.scalars.return_value.all.return_value = claimed_events
+    now = int(time.time())
+
+    assert await WebhookDAO(session).claim_webhook_events(limit=5, lease_timeout=300) == claimed_events
+
+    sql = compile_statement(session.execute.await_args.args[0])
+    # The head of a partition is its oldest unfinished event, due or not, so a retrying event holds
+    # back its partition.
+    heads = sql[sql.index("SELECT DISTINCT ON"):sql.index("AS anon_1")]
+    assert "webhook_events.status IN ('pending', 'processing')" in heads
+    assert "next_attempt_at <=" not in heads
+    assert "ORDER BY coalesce(webhook_events.partition_key, CAST(webhook_events.id AS VARCHAR)), " \
+           "webhook_events.created_at, webhook_events.id" in heads
+    assert "anon_1.next_attempt_at <=" in sql
+    assert "LIMIT 5" in sql
+    # Claiming starts a lease; a processing event whose lease expired is due again.
+    assert sql.startswith("UPDATE webhook_events SET status='processing', "
+                          "attempts=(webhook_events.attempts + 1), next_attempt_at=")
+    lease_end = int(sql.split("next_attempt_at=", 1)[1].split(",", 1)[0])
+    assert now + 300 <= lease_end <= int(time.time()) + 300
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_webhook_events_rolls_back_on_error(session):
+    session.execute.side_effect = RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        await WebhookDAO(session).claim_webhook_events(limit=5, lease_timeout=300)
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_complete_webhook_event_schedules_the_next_attempt(session):
+    await WebhookDAO(session).complete_webhook_event("event_1", WebhookEventStatus.PENDING, 1700000000, "timeout")
+
+    sql = compile_statement(session.execute.await_args.args[0])
+    assert sql.startswith("UPDATE webhook_events SET status='pending', next_attempt_at=1700000000, "
+                          "last_error='timeout'")
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_complete_webhook_event_dead_letter_keeps_next_attempt_at(session):
+    await WebhookDAO(session).complete_webhook_event("event_1", WebhookEventStatus.DEAD, None, "timeout")
+
+    sql = compile_statement(session.execute.await_args.args[0])
+    assert "status='dead'" in sql
+    assert "next_attempt_at" not in sql
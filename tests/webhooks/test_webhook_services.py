@@ -0,0 +1,181 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, create_autospec
+
+from invoices.dao import InvoicesDAO
+from invoices.exceptions import InvoiceNotFoundError
+from payments.dao import PaymentsDAO
+from webhooks.dao import WebhookDAO
+
+
+@pytest.fixture
+def invoices():
+    return {}
+
+
+@pytest.fixture
+def razorpay_webhook_service(webhook_service, mock_razorpay_client, invoices):
+    subscription = MagicMock(id="sub_uuid", user_id="user_1", org_id="org_1", psp_subscription_id="sub_123")
+    mock_razorpay_client.get_invoice_details = AsyncMock(return_value={
+        "id": "inv_123", "subscription_id": "sub_123", "amount": 50000, "currency": "INR",
+        "status": "paid", "short_url": "https://rzp.io/i/inv_123",
+        "billing_start": 1700000000, "billing_end": 1702592000
+    })
+    mock_razorpay_client.get_subscription_details = AsyncMock(return_value={
+        "id": "sub_123", "current_start": 1700000000, "current_end": 1702592000
+    })
+
+    # Autospec keeps the real signatures, so a call that does not match them fails the test.
+    webhook_service.payments_dao = create_autospec(PaymentsDAO, instance=True)
+    webhook_service.payments_dao.get_subscription_by_razorpay_id.return_value = subscription
+    webhook_service.webhook_dao = create_autospec(WebhookDAO, instance=True)
+    webhook_service.invoices_dao = create_autospec(InvoicesDAO, instance=True)
+
+    async def create_invoice(subscription_id, invoice_id, amount, currency, status, next_due, user_id, org_id,
+                             short_url, transaction_id, psp_name):
+        invoices[invoice_id] = MagicMock(status=status, next_due_date=next_due, transaction_id=transaction_id)
+
+    async def update_invoice_status(invoice_id, status, next_due_date):
+        if invoice_id not in invoices:
+            raise InvoiceNotFoundError(invoice_id)
+        invoices[invoice_id].status = status
+        invoices[invoice_id].next_due_date = next_due_date
+
+    async def has_invoice_for_transaction(transaction_id):
+        return any(invoice.transaction_id == transaction_id for invoice in invoices.values())
+
+    async def record_payment_details(user_id, org_id, subscription_id, created_at, amount, currency, payment_id,
+                                     payment_status, psp_name=None):
+        payments.add(payment_id)
+
+    async def has_payment(payment_id):
+        return payment_id in payments
+
+    payments = set()
+    webhook_service.invoices_dao.create_invoice.side_effect = create_invoice
+    webhook_service.invoices_dao.update_invoice_status.side_effect = update_invoice_status
+    webhook_service.invoices_dao.has_invoice_for_transaction.side_effect = has_invoice_for_transaction
+    webhook_service.webhook_dao.record_payment_details.side_effect = record_payment_details
+    webhook_service.webhook_dao.has_payment.side_effect = has_payment
+    return webhook_service
+
+
+def payment_captured_payload():
+    return {
+        "event": "payment.captured",
+        "created_at": 1700000100,
+        "payload": {"payment": {"entity": {
+            "id": "pay_123", "invoice_id": "inv_123", "amount": 50000, "currency": "INR", "status": "captured"
+        }}}
+    }
+
+
+def invoice_paid_payload():
+    return {
+        "event": "invoice.paid",
+        "payload": {"invoice": {"entity": {
+            "id": "inv_123", "subscription_id": "sub_123", "status": "paid", "amount": 50000, "currency": "INR",
+            "short_url": "https://rzp.io/i/inv_123", "payment_id": "pay_123",
+            "billing_start": 1700000000, "billing_end": 1702592000
+        }}}
+    }
+
+
+@pytest.mark.asyncio
+async def test_payment_captured_then_invoice_paid(razorpay_webhook_service, invoices):
+    await razorpay_webhook_service.handle_payment_event(payment_captured_payload())
+
+    assert invoices["inv_123"].transaction_id == "pay_123"
+    razorpay_webhook_service.webhook_dao.record_payment_details.assert_awaited_once()
+
+    await razorpay_webhook_service.handle_invoice_paid(invoice_paid_payload())
+
+    assert invoices["inv_123"].status == "paid"
+    assert invoices["inv_123"].next_due_date == 1702592000
+    subscription = razorpay_webhook_service.payments_dao.get_subscription_by_razorpay_id.return_value
+    assert subscription.status == "active"
+    assert subscription.is_active is True
+    assert subscription.current_end == 1702592000
+
+
+@pytest.mark.asyncio
+async def test_webhooks_take_the_billing_period_from_the_invoice(razorpay_webhook_service, mock_razorpay_client):
+    await razorpay_webhook_service.handle_payment_event(payment_captured_payload())
+    await razorpay_webhook_service.handle_invoice_paid(invoice_paid_payload())
+
+    # The invoice is read through the cache and the subscription is not fetched from Razorpay at all.
+    mock_razorpay_client.get_invoice_details.assert_awaited_once_with("inv_123")
+    mock_razorpay_client.get_subscription_details.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invoice_paid_before_payment_captured(razorpay_webhook_service, invoices):
+    await razorpay_webhook_service.handle_invoice_paid(invoice_paid_payload())
+
+    assert invoices["inv_123"].status == "paid"
+    assert invoices["inv_123"].next_due_date == 1702592000
+
+    await razorpay_webhook_service.handle_payment_event(payment_captured_payload())
+
+    # payment.captured finds the invoice recorded by invoice.paid and only records the payment.
+    razorpay_webhook_service.invoices_dao.create_invoice.assert_awaited_once()
+    razorpay_webhook_service.webhook_dao.record_payment_details.assert_awaited_once()
+    assert invoices["inv_123"].transaction_id == "pay_123"
+    subscription = razorpay_webhook_service.payments_dao.get_subscription_by_razorpay_id.return_value
+    assert subscription.is_active is True
+
+
+@pytest.mark.asyncio
+async def test_retried_payment_captured_records_the_payment_once(razorpay_webhook_service):
+    razorpay_webhook_service.webhook_dao.record_payment_details.side_effect = [RuntimeError("connection lost"), None]
+
+    with pytest.raises(RuntimeError):
+        await razorpay_webhook_service.handle_payment_event(payment_captured_payload())
+    await razorpay_webhook_service.handle_payment_event(payment_captured_payload())
+
+    razorpay_webhook_service.invoices_dao.create_invoice.assert_awaited_once()
+    assert razorpay_webhook_service.webhook_dao.record_payment_details.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retried_invoice_expired_cancels_the_subscription_once(razorpay_webhook_service, mock_razorpay_client,
+                                                                       invoices):
+    subscription = razorpay_webhook_service.payments_dao.get_subscription_by_razorpay_id.return_value
+    subscription.end_date = None
+    mock_razorpay_client.end_subscription = AsyncMock(return_value={"status": "cancelled"})
+    invoice_expired = {
+        "event": "invoice.expired",
+        "payload": {"invoice": {"entity": {"id": "inv_123", "subscription_id": "sub_123"}}}
+    }
+
+    invoices["inv_123"] = MagicMock(status="issued")
+    update_invoice_status = razorpay_webhook_service.invoices_dao.update_invoice_status.side_effect
+    failures = [RuntimeError("connection lost")]
+
+    async def fail_once(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return await update_invoice_status(*args, **kwargs)
+
+    razorpay_webhook_service.invoices_dao.update_invoice_status.side_effect = fail_once
+
+    with pytest.raises(RuntimeError):
+        await razorpay_webhook_service.handle_invoice_expired(invoice_expired)
+    await razorpay_webhook_service.handle_invoice_expired(invoice_expired)
+
+    mock_razorpay_client.end_subscription.assert_awaited_once_with("sub_123")
+    assert subscription.status == "cancelled"
+    assert invoices["inv_123"].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_invoice_expired_without_a_recorded_invoice(razorpay_webhook_service, mock_razorpay_client):
+    subscription = razorpay_webhook_service.payments_dao.get_subscription_by_razorpay_id.return_value
+    subscription.end_date = None
+    mock_razorpay_client.end_subscription = AsyncMock(return_value={"status": "cancelled"})
+
+    await razorpay_webhook_service.handle_invoice_expired({
+        "event": "invoice.expired",
+        "payload": {"invoice": {"entity": {"id": "inv_404", "subscription_id": "sub_123"}}}
+    })
+
+    assert subscription.status == "cancelled"
@@ -0,0 +1,26 @@
+from payments.models import PSPName
+from webhooks.utils import get_webhook_partition_key
+
+
+def test_razorpay_events_of_a_subscription_share_a_partition():
+    subscription_activated = {"payload": {"subscription": {"entity": {"id": "sub_123"}}}}
+    invoice_paid = {"payload": {"invoice": {"entity": {"id": "inv_123", "subscription_id": "sub_123"}}}}
+
+    assert get_webhook_partition_key(PSPName.RAZORPAY, subscription_activated) == "sub_123"
+    assert get_webhook_partition_key(PSPName.RAZORPAY, invoice_paid) == "sub_123"
+
+
+def test_razorpay_payment_is_keyed_from_the_payload():
+    payment_captured = {"payload": {"payment": {"entity": {"id": "pay_123", "invoice_id": "inv_123"}}}}
+    order_payment = {"payload": {"payment": {"entity": {"id": "pay_456"}}}}
+
+    assert get_webhook_partition_key(PSPName.RAZORPAY, payment_captured) == "inv_123"
+    assert get_webhook_partition_key(PSPName.RAZORPAY, order_payment) == "pay_456"
+
+
+def test_paddle_events_are_keyed_on_the_subscription():
+    transaction_completed = {"event_type": "transaction.completed", "data": {"id": "txn_1", "subscription_id": "sub_1"}}
+    subscription_canceled = {"event_type": "subscription.canceled", "data": {"id": "sub_1"}}
+
+    assert get_webhook_partition_key(PSPName.PADDLE, transaction_completed) == "sub_1"
+    assert get_webhook_partition_key(PSPName.PADDLE, subscription_canceled) == "sub_1"
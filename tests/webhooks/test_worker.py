@@ -0,0 +1,81 @@
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.settings import loaded_config
+from integrations.base_client import PSPRequestError
+from payments.models import PSPName
+from webhooks.constants import WebhookEventStatus
+from webhooks.worker import process_webhook_event
+
+
+def make_webhook_event(attempts=1):
+    return MagicMock(id="event_1", psp_name=PSPName.RAZORPAY, event_type="invoice.paid", payload={},
+                     attempts=attempts)
+
+
+@pytest.fixture
+def handler():
+    return AsyncMock()
+
+
+@pytest.fixture
+def complete_webhook_event(mock_connection_handler, handler):
+    @asynccontextmanager
+    async def connection_handler_scope():
+        yield mock_connection_handler
+
+    with patch("webhooks.worker.connection_handler_scope", connection_handler_scope), \
+            patch("webhooks.worker.get_webhook_handler", return_value=handler), \
+            patch("webhooks.worker.WebhookDAO") as webhook_dao_class:
+        webhook_dao_class.return_value.complete_webhook_event = AsyncMock()
+        yield webhook_dao_class.return_value.complete_webhook_event
+
+
+@pytest.mark.asyncio
+async def test_processed_event(complete_webhook_event):
+    await process_webhook_event(make_webhook_event())
+
+    complete_webhook_event.assert_awaited_once_with("event_1", WebhookEventStatus.PROCESSED, None, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    httpx.ConnectError("connection refused"), PSPRequestError(503, "unavailable"), PSPRequestError(429, "slow down")
+])
+async def test_transient_failure_is_retried_with_backoff(complete_webhook_event, handler, monkeypatch, error):
+    monkeypatch.setattr(loaded_config, "webhook_retry_base_delay", 10)
+    handler.side_effect = error
+
+    await process_webhook_event(make_webhook_event(attempts=3))
+
+    webhook_event_id, status, next_attempt_at, last_error = complete_webhook_event.await_args.args
+    assert status == WebhookEventStatus.PENDING
+    # Third attempt: 10 * 2 ** 2 seconds, jittered down to half of it at most.
+    assert time.time() + 20 - 1 <= next_attempt_at <= time.time() + 40
+    assert last_error == str(error)
+
+
+@pytest.mark.asyncio
+async def test_event_moves_to_dead_letters_after_the_last_attempt(complete_webhook_event, handler, monkeypatch):
+    monkeypatch.setattr(loaded_config, "webhook_max_attempts", 3)
+    handler.side_effect = httpx.ConnectError("connection refused")
+
+    await process_webhook_event(make_webhook_event(attempts=2))
+    assert complete_webhook_event.await_args.args[1] == WebhookEventStatus.PENDING
+
+    await process_webhook_event(make_webhook_event(attempts=3))
+    assert complete_webhook_event.await_args.args[1:] == (WebhookEventStatus.DEAD, None, "connection refused")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [PSPRequestError(400, "bad request"), KeyError("current_end")])
+async def test_permanent_failure_is_not_retried(complete_webhook_event, handler, error):
+    handler.side_effect = error
+
+    await process_webhook_event(make_webhook_event(attempts=1))
+
+    assert complete_webhook_event.await_args.args[1:3] == (WebhookEventStatus.DEAD, None)
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from redis.exceptions import LockError
+
+from config.logging import logger
+from utils.redis_client import RedisClient
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into a single execution.
+
+    The first caller runs `func`; every caller that arrives while it is in flight
+    awaits the same result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]):
+        future = self._in_flight.get(key)
+        if future:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved so an unobserved failure is not reported twice.
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+single_flight = SingleFlight()
+
+# Versions outlive any load by far, so a version never expires while a load holding it is in flight.
+CACHE_VERSION_EXPIRATION = 24 * 60 * 60
+
+# Writes a loaded value back only if the entry was not invalidated since the load started.
+SET_IF_VERSION_UNCHANGED_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+INVALIDATE_SCRIPT = """
+redis.call('DEL', KEYS[1])
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class TTLCache:
+    """
+    Size-bounded, TTL-evicting in-process cache.
+
+    Entries are evicted least-recently-used first once `maxsize` is reached and are
+    treated as missing after `ttl` seconds. Every invalidation bumps `generation`, so a
+    reader that started before an invalidation can avoid writing back a stale value.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value, generation: Optional[int] = None):
+        """
+        Stores `value` under `key`.
+
+        :param generation: The `generation` read before the value was loaded; the write is
+            skipped if an invalidation happened in between.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ReadThroughCache:
+    """
+    JSON read-through cache on top of Redis.
+
+    A hit costs a single GET. Misses are deduplicated in-process through `single_flight`
+    and, when `lock_timeout` is set, across processes through a short-lived Redis lock so
+    only one worker runs the loader while the others wait for the value to appear.
+
+    With `versioned`, entries are dropped through `invalidate`, which bumps a version kept
+    next to the entry: a load that started before the invalidation neither writes its value
+    back nor is joined by callers arriving after it.
+    """
+
+    def __init__(self, redis_client: RedisClient, expiration: Optional[int] = None,
+                 lock_timeout: Optional[float] = None, lock_poll_interval: float = 0.05,
+                 versioned: bool = False):
+        self.redis_client = redis_client
+        self.expiration = expiration
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self.versioned = versioned
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        """
+        Returns the cached value for `key`, calling `loader` and caching its result on a miss.
+
+        :param key: Redis key holding the JSON encoded value.
+        :param loader: Coroutine factory producing the value from the source of truth.
+        """
+        cached_value = await self.redis_client.get_key(key)
+        if cached_value is not None:
+            return json.loads(cached_value)
+        if not self.versioned:
+            return await single_flight.do(key, lambda: self._load(key, loader))
+
+        version = await self.redis_client.get_key(self._get_version_key(key)) or ""
+        return await single_flight.do(f"{key}@{version}", lambda: self._load(key, loader, version))
+
+    async def invalidate(self, key: str):
+        """
+        Drops the cached value for `key`; loads already in flight will not write theirs back.
+
+        :param key: Redis key holding the JSON encoded value.
+        """
+        await self.redis_client.run_script(
+            INVALIDATE_SCRIPT, [key, self._get_version_key(key)], [CACHE_VERSION_EXPIRATION]
+        )
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], version: Optional[str] = None):
+        if not self.lock_timeout:
+            return await self._populate(key, loader, version)
+
+        lock = self.redis_client.lock(f"lock:{key}", timeout=self.lock_timeout)
+        if await lock.acquire(blocking=False):
+            try:
+                cached_value = await self.redis_client.get_key(key)
+                if cached_value is not None:
+                    return json.loads(cached_value)
+                return await self._populate(key, loader, version)
+            finally:
+                try:
+                    await lock.release()
+                except LockError:
+                    logger.warning("Cache lock for %s expired before the value was loaded", key)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            cached_value = await self.redis_client.get_key(key)
+            if cached_value is not None:
+                return json.loads(cached_value)
+
+        logger.warning("Timed out waiting for %s to be cached by another worker, loading it directly", key)
+        return await self._populate(key, loader, version)
+
+    async def _populate(self, key: str, loader: Callable[[], Awaitable[Any]], version: Optional[str] = None):
+        value = await loader()
+        if version is None:
+            await self.redis_client.add_key(key, json.dumps(value), expiration=self.expiration)
+        else:
+            await self.redis_client.run_script(
+                SET_IF_VERSION_UNCHANGED_SCRIPT,
+                [key, self._get_version_key(key)],
+                [version, json.dumps(value), self.expiration or 0]
+            )
+        return value
+
+    @staticmethod
+    def _get_version_key(key: str) -> str:
+        return f"{key}:version"
@@ -0,0 +1,107 @@
+import time
+from enum import Enum
+
+from prometheus.metrics import CIRCUIT_BREAKER_REJECTIONS, CIRCUIT_BREAKER_STATE
+
+
+class CircuitState(int, Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreakerOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_at: float):
+        self.name = name
+        self.retry_at = retry_at
+        super().__init__(f"{name} is unavailable, retry in {max(retry_at - time.time(), 0):.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the circuit opens and calls fail immediately for
+    `recovery_timeout` seconds. A single probe is then let through (half-open): its success closes
+    the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probe_in_flight = False
+        self._set_state(CircuitState.CLOSED)
+
+    def before_call(self):
+        """
+        :raises CircuitBreakerOpenError: If the call must not be made.
+        """
+        if self.state == CircuitState.CLOSED:
+            return
+        if self.state == CircuitState.OPEN and time.time() >= self.opened_until:
+            self._set_state(CircuitState.HALF_OPEN)
+        if self.state == CircuitState.HALF_OPEN and (not self.probe_in_flight or time.time() >= self.opened_until):
+            # A probe that never reported back (e.g. cancelled) is replaced after `recovery_timeout`.
+            self.probe_in_flight = True
+            self.opened_until = time.time() + self.recovery_timeout
+            return
+        CIRCUIT_BREAKER_REJECTIONS.labels(name=self.name, service_name="wayne").inc()
+        raise CircuitBreakerOpenError(self.name, self.opened_until)
+
+    def record_success(self):
+        self.failures = 0
+        self.probe_in_flight = False
+        if self.state != CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Opens the circuit for `recovery_timeout` seconds."""
+        self.opened_until = time.time() + self.recovery_timeout
+        self._set_state(CircuitState.OPEN)
+
+    def _set_state(self, state: CircuitState):
+        self.state = state
+        CIRCUIT_BREAKER_STATE.labels(name=self.name, service_name="wayne").set(state.value)
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries to a share of the traffic, so retries cannot multiply the load
+    on a dependency that is already failing.
+
+    Every request deposits `ratio` tokens and every retry withdraws one. `min_retries_per_second`
+    tokens are added over time so low-traffic processes can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.refilled_at = time.monotonic()
+
+    def record_request(self):
+        self._add(self.ratio)
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self._add((now - self.refilled_at) * self.min_retries_per_second)
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def _add(self, tokens: float):
+        self.tokens = min(self.tokens + tokens, self.max_tokens)
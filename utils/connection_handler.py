@@ -1,39 +1,81 @@
 from contextlib import asynccontextmanager
 from typing import Optional
 
+from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.settings import loaded_config
+from prometheus.metrics import DB_OPEN_SESSIONS
 
 
 class ConnectionHandler:
+    """
+    Owns the database sessions of one unit of work (a request or a background job).
 
-    def __init__(self, connection_manager=None, event_bridge=None):
+    Sessions are created lazily and must be released with `close`; use
+    `get_connection_handler_for_app` in routes and `connection_handler_scope` elsewhere.
+    """
+
+    def __init__(self, connection_manager=None, event_bridge=None, replica_connection_manager=None):
         self._session: Optional[AsyncSession] = None
+        self._read_session: Optional[AsyncSession] = None
         self._connection_manager = connection_manager
+        self._replica_connection_manager = replica_connection_manager
 
     @property
     def session(self):
         if not self._session:
-            session_factory = self._connection_manager.get_session_factory()
-            self._session = session_factory()
+            self._session = self._open_session(self._connection_manager)
         return self._session
 
+    @property
+    def read_session(self):
+        """
+        Session for read-only queries: on the read replica when one is configured and
+        healthy, otherwise the primary `session`.
+        """
+        if self._read_session:
+            return self._read_session
+        if not self._replica_connection_manager or not self._replica_connection_manager.is_available:
+            return self.session
+        self._read_session = self._open_session(self._replica_connection_manager)
+        return self._read_session
+
     @property
     def event_emitter(self):
         return self._event_emitter
 
+    @staticmethod
+    def _open_session(connection_manager) -> AsyncSession:
+        session_factory = connection_manager.get_session_factory()
+        session = session_factory()
+        DB_OPEN_SESSIONS.labels(pool=connection_manager.pool_name, service_name="wayne").inc()
+        return session
+
     async def session_commit(self):
         await self.session.commit()
 
     async def close(self):
+        """Closes every session opened by this handler; safe to call more than once."""
         if self._session:
-            await self._session.close()
+            session, self._session = self._session, None
+            await session.close()
+            DB_OPEN_SESSIONS.labels(pool=self._connection_manager.pool_name, service_name="wayne").dec()
+        if self._read_session:
+            read_session, self._read_session = self._read_session, None
+            await read_session.close()
+            DB_OPEN_SESSIONS.labels(pool=self._replica_connection_manager.pool_name, service_name="wayne").dec()
 
 
-async def get_connection_handler_for_app():
+@asynccontextmanager
+async def connection_handler_scope():
+    """
+    Connection handler for work outside a request (schedulers, startup jobs, scripts),
+    closed when the block exits.
+    """
     connection_handler = ConnectionHandler(
-        connection_manager=loaded_config.connection_manager
+        connection_manager=loaded_config.connection_manager,
+        replica_connection_manager=loaded_config.replica_connection_manager
     )
     try:
         yield connection_handler
@@ -41,3 +83,36 @@ async def get_connection_handler_for_app():
         await connection_handler.close()
 
 
+async def _run_background_tasks_and_close(tasks, connection_handler: ConnectionHandler):
+    try:
+        for task in tasks:
+            await task()
+    finally:
+        await connection_handler.close()
+
+
+async def get_connection_handler_for_app(background_tasks: BackgroundTasks):
+    """
+    Per-request connection handler.
+
+    It is closed when the request ends, unless the endpoint scheduled BackgroundTasks:
+    those run after this teardown and still use the request's sessions, so they are
+    wrapped into a single task that closes the handler once the last of them finished
+    or failed.
+    """
+    connection_handler = ConnectionHandler(
+        connection_manager=loaded_config.connection_manager,
+        replica_connection_manager=loaded_config.replica_connection_manager
+    )
+    try:
+        yield connection_handler
+    except BaseException:
+        await connection_handler.close()
+        raise
+
+    if not background_tasks.tasks:
+        await connection_handler.close()
+        return
+    pending_tasks = list(background_tasks.tasks)
+    background_tasks.tasks.clear()
+    background_tasks.add_task(_run_background_tasks_and_close, pending_tasks, connection_handler)
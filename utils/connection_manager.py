@@ -1,32 +1,108 @@
-from asyncio import current_task
+import time
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from prometheus.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_CONNECTIONS_IN_USE
 from utils.sqlalchemy import async_db_url
 
 
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long every checkout waited for a connection,
+    including the time spent opening a new one. The pool's `logging_name` is used
+    as the `pool` label.
+    """
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(pool=self._orig_logging_name, service_name="wayne").observe(
+                time.perf_counter() - start_time
+            )
+
+
 class ConnectionManager:
 
-    def __init__(self, db_url, db_echo):
+    def __init__(self, db_url, db_echo, pool_size: int = 10, max_overflow: int = 20, pool_timeout: float = 30,
+                 pool_recycle: int = 1800, pool_pre_ping: bool = True, prepared_statement_cache_size: int = 100,
+                 pool_name: str = "primary"):
         self.db_url = db_url
         self.db_echo = db_echo
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.prepared_statement_cache_size = prepared_statement_cache_size
+        self.pool_name = pool_name
         self._db_engine, self._db_session_factory = self._setup_db()
 
     def get_session_factory(self):
         return self._db_session_factory
 
     def _setup_db(self):
-        engine = create_async_engine(str(self.db_url), echo=self.db_echo)
-        session_factory = async_scoped_session(
-            sessionmaker(
-                engine,
-                expire_on_commit=False,
-                class_=AsyncSession,
-            ),
-            scopefunc=current_task,
+        engine = create_async_engine(
+            str(self.db_url),
+            echo=self.db_echo,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_logging_name=self.pool_name,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            # Set to 0 behind PgBouncer in transaction pooling mode.
+            connect_args={"prepared_statement_cache_size": self.prepared_statement_cache_size},
+        )
+        self._instrument_pool(engine)
+        # Plain factory: every ConnectionHandler owns and closes the sessions it creates.
+        session_factory = async_sessionmaker(
+            engine,
+            expire_on_commit=False,
+            class_=AsyncSession,
         )
         return engine, session_factory
 
+    def _instrument_pool(self, engine):
+        connections_in_use = DB_POOL_CONNECTIONS_IN_USE.labels(pool=self.pool_name, service_name="wayne")
+
+        @event.listens_for(engine.sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connections_in_use.inc()
+
+        @event.listens_for(engine.sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            connections_in_use.dec()
+
     async def close_connections(self):
         await self._db_engine.dispose()
+
+
+class ReplicaConnectionManager(ConnectionManager):
+    """
+    Connection manager for a read replica.
+
+    `is_available` is refreshed by `utils.load_config.monitor_read_replica`; it is False
+    while the replica cannot be reached or its replay lag exceeds `max_lag_seconds`, so
+    `ConnectionHandler.read_session` falls back to the primary until it recovers.
+    """
+
+    REPLICATION_LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, db_url, db_echo, max_lag_seconds: float = 5, **kwargs):
+        kwargs.setdefault("pool_name", "replica")
+        super().__init__(db_url, db_echo, **kwargs)
+        self.max_lag_seconds = max_lag_seconds
+        self.is_available = False
+
+    async def get_replication_lag(self) -> float:
+        """Seconds the replica's replay is behind the primary, 0 when it has replayed everything it received."""
+        async with self._db_engine.connect() as connection:
+            return float((await connection.execute(self.REPLICATION_LAG_QUERY)).scalar() or 0)
@@ -58,7 +58,7 @@ def latency(metric, **label_kwargs):
                     query_type=sanitize_label(query_type_string),
                     service_name="wayne"
                 ).inc()
-                logger.error("Exception in latency decorator", str(exp))
+                logger.error("Exception in latency decorator: %s", str(exp))
                 logger.error(traceback.format_exc())
                 raise exp
             except Exception as exp:
@@ -67,7 +67,7 @@ def latency(metric, **label_kwargs):
                     query_type=sanitize_label(query_type_string),
                     service_name="wayne"
                 ).inc()
-                logger.error("Exception in latency decorator", str(exp))
+                logger.error("Exception in latency decorator: %s", str(exp))
                 logger.error(traceback.format_exc())
                 raise exp
 
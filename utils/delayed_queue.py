@@ -0,0 +1,43 @@
+import time
+from typing import Dict, List, Optional
+
+from utils.redis_client import RedisClient
+
+
+# KEYS[1] = queue sorted set
+# ARGV[1] = now, ARGV[2] = maximum number of members to pop
+POP_DUE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #members > 0 then
+    redis.call('ZREM', KEYS[1], unpack(members))
+end
+return members
+"""
+
+
+class DelayedQueue:
+    """
+    Delayed jobs kept in a Redis sorted set, scored by the epoch second they are due at.
+
+    Due members are popped atomically, so with several consumers each job is handed to one of
+    them only. A popped job is gone from the queue: consumers that fail to run it must rely on
+    another way to find it again.
+    """
+
+    def __init__(self, redis_client: RedisClient, key: str):
+        self.redis_client = redis_client
+        self.key = key
+
+    async def schedule(self, jobs: Dict[str, int]):
+        """
+        :param jobs: Job IDs mapped to the epoch second they are due at.
+        """
+        await self.redis_client.add_to_sorted_set(self.key, jobs)
+
+    async def pop_due(self, limit: int, now: Optional[float] = None) -> List[str]:
+        """
+        Removes and returns up to `limit` jobs that are due, earliest first.
+        """
+        return await self.redis_client.run_script(
+            POP_DUE_SCRIPT, [self.key], [now if now is not None else time.time(), limit]
+        )
@@ -0,0 +1,39 @@
+import importlib.util
+from typing import Dict
+
+import httpx
+
+
+class HTTPClientManager:
+    """
+    Owns the process-wide `httpx.AsyncClient`s used by the PSP integrations, one per base URL.
+
+    A single instance is created in `utils.load_config.init_connections` and torn down in
+    `run_on_exit`, so requests to the same provider reuse kept-alive (and, when `h2` is
+    installed, HTTP/2 multiplexed) connections instead of paying DNS, TCP and TLS setup per call.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 http2: bool = True):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        # httpx only speaks HTTP/2 with the optional `h2` package installed.
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            self._clients[base_url] = client
+        return client
+
+    async def close_connections(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
@@ -1,48 +1,135 @@
+import asyncio
 import base64
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
+from config.logging import logger
 from config.settings import loaded_config
-from crons.downgrade_plan_cron import downgrade_users_to_basic
+from crons.downgrade_plan_cron import downgrade_due_trials, downgrade_users_to_basic
+from integrations.base_client import get_http_client_manager
+from prometheus.metrics import DB_REPLICA_LAG
+from rule_engine.cache import listen_for_plan_rules_invalidation
 from rule_engine.services import RulesService
-from utils.connection_handler import get_connection_handler_for_app, ConnectionHandler
-from utils.connection_manager import ConnectionManager
+from utils.connection_handler import connection_handler_scope
+from utils.connection_manager import ConnectionManager, ReplicaConnectionManager
+from utils.redis_client import get_redis_connection_manager, redis_connection_managers_by_url
+from webhooks.worker import run_webhook_workers
 
 
 async def run_on_startup():
     try:
         await init_connections()
         await init_scheduler()
+        await init_listeners()
         await init_data()
     except Exception as e:
         print(e)
 
 
 async def run_on_exit():
+    if loaded_config.plan_rules_invalidation_task:
+        loaded_config.plan_rules_invalidation_task.cancel()
+    if loaded_config.replica_health_task:
+        loaded_config.replica_health_task.cancel()
+    if loaded_config.webhook_workers_task:
+        loaded_config.webhook_workers_task.cancel()
     await loaded_config.connection_manager.close_connections()
+    if loaded_config.replica_connection_manager:
+        await loaded_config.replica_connection_manager.close_connections()
+    if loaded_config.redis_connection_manager:
+        await loaded_config.redis_connection_manager.close_connections()
+    for redis_connection_manager in redis_connection_managers_by_url.values():
+        await redis_connection_manager.close_connections()
+    if loaded_config.http_client_manager:
+        await loaded_config.http_client_manager.close_connections()
 
 
 async def init_connections():
     connection_manager = ConnectionManager(
         db_url=loaded_config.db_url,
-        db_echo=loaded_config.db_echo
+        db_echo=loaded_config.db_echo,
+        pool_size=loaded_config.db_pool_size,
+        max_overflow=loaded_config.db_max_overflow,
+        pool_timeout=loaded_config.db_pool_timeout,
+        pool_recycle=loaded_config.db_pool_recycle,
+        pool_pre_ping=loaded_config.db_pool_pre_ping,
+        prepared_statement_cache_size=loaded_config.db_prepared_statement_cache_size
     )
     loaded_config.connection_manager = connection_manager
+    if loaded_config.replica_db_url:
+        replica_connection_manager = ReplicaConnectionManager(
+            db_url=loaded_config.replica_db_url,
+            db_echo=loaded_config.db_echo,
+            max_lag_seconds=loaded_config.db_replica_max_lag_seconds,
+            pool_size=loaded_config.db_pool_size,
+            max_overflow=loaded_config.db_max_overflow,
+            pool_timeout=loaded_config.db_pool_timeout,
+            pool_recycle=loaded_config.db_pool_recycle,
+            pool_pre_ping=loaded_config.db_pool_pre_ping,
+            prepared_statement_cache_size=loaded_config.db_prepared_statement_cache_size
+        )
+        loaded_config.replica_connection_manager = replica_connection_manager
+    get_redis_connection_manager()
+    get_http_client_manager()
     loaded_config.razorpay_api_secret = base64.b64encode(
         f"{loaded_config.razorpay_api_key}:{loaded_config.razorpay_api_secret}".encode()).decode()
 
 
 async def init_scheduler():
+    """
+    Starts the scheduled jobs of the `downgrade_plan_scheduler` server type.
+
+    Every replica runs the jobs: trials are popped atomically from the trial expiry queue and
+    swept rows are claimed with FOR UPDATE SKIP LOCKED, so replicas share the backlog instead of
+    repeating each other's work. The jitter spreads the replicas' sweeps over the interval.
+    """
     loaded_config.aps_scheduler = AsyncIOScheduler()
     if loaded_config.server_type == 'downgrade_plan_scheduler':
-        loaded_config.aps_scheduler.add_job(downgrade_users_to_basic, IntervalTrigger(seconds=15))
+        loaded_config.aps_scheduler.add_job(
+            downgrade_due_trials, IntervalTrigger(seconds=loaded_config.trial_expiry_poll_interval),
+            max_instances=1, coalesce=True
+        )
+        loaded_config.aps_scheduler.add_job(
+            downgrade_users_to_basic, IntervalTrigger(seconds=loaded_config.downgrade_sweep_interval, jitter=5),
+            max_instances=1, coalesce=True
+        )
         loaded_config.aps_scheduler.start()
 
 
+async def init_listeners():
+    loaded_config.plan_rules_invalidation_task = asyncio.create_task(listen_for_plan_rules_invalidation())
+    if loaded_config.replica_connection_manager:
+        loaded_config.replica_health_task = asyncio.create_task(monitor_read_replica())
+    if loaded_config.server_type == "webhook":
+        loaded_config.webhook_workers_task = asyncio.create_task(run_webhook_workers())
+
+
+async def monitor_read_replica():
+    """
+    Periodically checks the read replica's replay lag and flips `is_available`, so read
+    sessions move back to the primary while the replica is down or lagging.
+    """
+    replica_connection_manager = loaded_config.replica_connection_manager
+    while True:
+        try:
+            replication_lag = await replica_connection_manager.get_replication_lag()
+            DB_REPLICA_LAG.labels(service_name="wayne").set(replication_lag)
+            is_available = replication_lag <= replica_connection_manager.max_lag_seconds
+            if is_available != replica_connection_manager.is_available:
+                logger.warning("Read replica lag is %.2fs, reads %s", replication_lag,
+                               "moved to the replica" if is_available else "moved to the primary")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if replica_connection_manager.is_available:
+                logger.error("Read replica unavailable, reads moved to the primary: %s", str(e))
+            is_available = False
+        replica_connection_manager.is_available = is_available
+        await asyncio.sleep(loaded_config.db_replica_health_check_interval)
+
+
 async def init_data():
-    connection_handler = ConnectionHandler(
-        connection_manager=loaded_config.connection_manager
-    )
-    rule_service = RulesService(connection_handler=connection_handler)
-    await rule_service.initialize_all_rules_in_redis()
+    async with connection_handler_scope() as connection_handler:
+        rule_service = RulesService(connection_handler=connection_handler)
+        await rule_service.initialize_all_rules_in_redis()
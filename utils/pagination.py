@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    """
+    Encodes the (sort value, id) of the last row of a page into an opaque cursor.
+
+    :param sort_value: The value of the sort column, an int or a datetime.
+    :param row_id: The primary key of the row, breaking ties between equal sort values.
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = {"dt": sort_value.isoformat()}
+    payload = json.dumps([sort_value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """
+    Decodes a cursor produced by `encode_cursor` back into (sort value, id).
+
+    :raises InvalidCursorError: If the cursor was not produced by `encode_cursor`.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(payload)
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["dt"])
+        return sort_value, UUID(row_id)
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor}") from e
@@ -1,39 +1,68 @@
 from contextlib import asynccontextmanager
-from urllib.parse import urlparse
-
-import redis.asyncio as redis
 
 from config.settings import loaded_config
+from utils.redis_connection_manager import RedisConnectionManager
+
+
+def get_redis_connection_manager() -> RedisConnectionManager:
+    """
+    Returns the process-wide Redis connection manager, creating it on first use
+    for entrypoints (scripts, tests) that never ran `init_connections`.
+    """
+    if not loaded_config.redis_connection_manager:
+        loaded_config.redis_connection_manager = RedisConnectionManager(
+            redis_url=loaded_config.redis_payments_url,
+            max_connections=loaded_config.redis_max_connections,
+            pool_timeout=loaded_config.redis_pool_timeout,
+            health_check_interval=loaded_config.redis_health_check_interval,
+            socket_timeout=loaded_config.redis_socket_timeout,
+            socket_connect_timeout=loaded_config.redis_socket_connect_timeout,
+        )
+    return loaded_config.redis_connection_manager
+
+
+# Connection managers for explicit Redis URLs, one pool per URL for the life of the process.
+redis_connection_managers_by_url = {}
+
+
+def get_redis_connection_manager_for_url(redis_url: str) -> RedisConnectionManager:
+    """Returns the connection manager of `redis_url`, creating it on first use."""
+    if redis_url not in redis_connection_managers_by_url:
+        redis_connection_managers_by_url[redis_url] = RedisConnectionManager(
+            redis_url=redis_url,
+            max_connections=loaded_config.redis_max_connections,
+            pool_timeout=loaded_config.redis_pool_timeout,
+            health_check_interval=loaded_config.redis_health_check_interval,
+            socket_timeout=loaded_config.redis_socket_timeout,
+            socket_connect_timeout=loaded_config.redis_socket_connect_timeout,
+        )
+    return redis_connection_managers_by_url[redis_url]
 
 
 class RedisClient:
     """
     A class that manages Redis operations with an async client.
+
+    Connections are borrowed from the process-wide pool owned by
+    `loaded_config.redis_connection_manager`, or from the pool of `payment_url`
+    when one is supplied.
     """
 
     def __init__(self, payment_url=None):
-        redis_url = payment_url or loaded_config.redis_payments_url
-        parsed_url = urlparse(redis_url)
-        self.redis_host = parsed_url.hostname
-        self.redis_port = parsed_url.port
-        self.redis_db = int(parsed_url.path.strip("/")) if parsed_url.path.strip("/") else 0
-
-        self.client = redis.Redis(
-            host=self.redis_host,
-            port=self.redis_port,
-            db=self.redis_db,
-            decode_responses=True
-        )
+        if payment_url:
+            self.client = get_redis_connection_manager_for_url(payment_url).get_client()
+        else:
+            self.client = get_redis_connection_manager().get_client()
 
     @asynccontextmanager
     async def connect(self):
         """
-        Provides an async Redis client via a context manager.
+        Provides the pooled async Redis client via a context manager.
+
+        The client is shared across the process, so it is not closed on exit;
+        connections go back to the pool after every command.
         """
-        try:
-            yield self.client
-        finally:
-            await self.client.close()
+        yield self.client
 
     async def add_key(self, key: str, value: str, expiration: int = None):
         """
@@ -49,6 +78,22 @@ class RedisClient:
             else:
                 await client.set(key, value)
 
+    async def add_keys(self, mapping: dict, expiration: int = None):
+        """
+        Adds several key-value pairs to Redis in a single round-trip.
+
+        :param mapping: Keys and the values to associate with them.
+        :param expiration: Expiration time in seconds applied to every key (optional).
+        """
+        async with self.connect() as client:
+            if not expiration:
+                await client.mset(mapping)
+                return
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=expiration)
+                await pipe.execute()
+
     async def delete_key(self, key: str):
         """
         Deletes a key from Redis.
@@ -58,6 +103,17 @@ class RedisClient:
         async with self.connect() as client:
             await client.delete(key)
 
+    async def delete_keys(self, keys: list):
+        """
+        Deletes several keys from Redis with a single UNLINK.
+
+        :param keys: The keys to delete.
+        """
+        if not keys:
+            return
+        async with self.connect() as client:
+            await client.unlink(*keys)
+
     async def exists_key(self, key: str) -> bool:
         """
         Deletes a key from Redis.
@@ -81,6 +137,31 @@ class RedisClient:
             except Exception as e:
                 return value
 
+    async def get_hash_values(self, key: str, fields: list):
+        """
+        Retrieves several fields of a Redis hash with a single HMGET.
+
+        :param key: The hash key.
+        :param fields: The fields to retrieve.
+        :return: The values in the same order as `fields`, None for fields that do not exist.
+        """
+        if not fields:
+            return []
+        async with self.connect() as client:
+            return await client.hmget(key, fields)
+
+    async def get_values(self, keys: list):
+        """
+        Retrieves the values of several keys from Redis with a single MGET.
+
+        :param keys: The keys to retrieve.
+        :return: The values in the same order as `keys`, None for keys that do not exist.
+        """
+        if not keys:
+            return []
+        async with self.connect() as client:
+            return await client.mget(keys)
+
     async def get_keys(self, pattern: str):
         """
         Retrieve all keys based on pattern
@@ -99,3 +180,160 @@ class RedisClient:
         except Exception as e:
             pass
         return keys
+
+    async def run_script(self, script: str, keys: list, args: list):
+        """
+        Runs a Lua script atomically on the server.
+
+        The script is sent with EVALSHA and only uploaded again when Redis does not
+        have it cached yet.
+
+        :param script: The Lua source.
+        :param keys: The keys the script touches, available as KEYS.
+        :param args: Additional arguments, available as ARGV.
+        :return: The script's reply.
+        """
+        return await self.client.register_script(script)(keys=keys, args=args)
+
+    async def run_scripts(self, calls: list):
+        """
+        Runs several Lua script invocations in a single non-transactional pipeline.
+
+        Each invocation is atomic on its own and they are applied in order.
+
+        :param calls: (script, keys, args) tuples.
+        :return: The replies in the same order as `calls`.
+        """
+        if not calls:
+            return []
+        async with self.connect() as client:
+            # One Script object per source, so the pipeline checks each SHA only once.
+            registered_scripts = {}
+            async with client.pipeline(transaction=False) as pipe:
+                for script, keys, args in calls:
+                    if script not in registered_scripts:
+                        registered_scripts[script] = client.register_script(script)
+                    await registered_scripts[script](keys=keys, args=args, client=pipe)
+                return await pipe.execute()
+
+    def lock(self, name: str, timeout: float = None):
+        """
+        Returns a distributed Redis lock; acquire and release it with `await`.
+
+        :param name: The key backing the lock.
+        :param timeout: Seconds after which the lock expires if it is never released.
+        """
+        return self.client.lock(name, timeout=timeout)
+
+    async def publish(self, channel: str, message: str):
+        """
+        Publishes a message on a Redis pub/sub channel.
+
+        :param channel: The channel to publish on.
+        :param message: The message to publish.
+        """
+        async with self.connect() as client:
+            return await client.publish(channel, message)
+
+    def pubsub(self):
+        """
+        Returns a pub/sub handle holding its own pooled connection; use it as an async context manager.
+        """
+        return self.client.pubsub()
+
+    async def iter_keys(self, pattern: str, count: int = 1000):
+        """
+        Iterates over the keys matching a pattern with SCAN, without collecting them in memory.
+
+        :param pattern: Glob-style pattern to match.
+        :param count: Hint for the number of keys examined per SCAN call.
+        """
+        async with self.connect() as client:
+            async for key in client.scan_iter(match=pattern, count=count):
+                yield key
+
+    async def add_to_sorted_set(self, key: str, scores_by_member: dict):
+        """
+        Adds members to a Redis sorted set, updating the score of existing ones.
+
+        :param key: The sorted set key.
+        :param scores_by_member: Members mapped to their scores.
+        """
+        async with self.connect() as client:
+            await client.zadd(key, scores_by_member)
+
+    async def delete_keys_matching(self, pattern: str, count: int = 1000) -> int:
+        """
+        Deletes the keys matching a pattern, found with SCAN and unlinked in batches of `count`.
+
+        :param pattern: Glob-style pattern to match.
+        :param count: Hint for the number of keys examined per SCAN call.
+        :return: The number of keys deleted.
+        """
+        deleted = 0
+        keys = []
+        async with self.connect() as client:
+            async for key in client.scan_iter(match=pattern, count=count):
+                keys.append(key)
+                if len(keys) >= count:
+                    deleted += await client.unlink(*keys)
+                    keys = []
+            if keys:
+                deleted += await client.unlink(*keys)
+        return deleted
+
+    async def add_to_sets(self, members_by_key: dict):
+        """
+        Adds members to several Redis sets in a single pipeline.
+
+        :param members_by_key: Set keys mapped to the members to add to each of them.
+        """
+        async with self.connect() as client:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, members in members_by_key.items():
+                    pipe.sadd(key, *members)
+                await pipe.execute()
+
+    async def delete_indexed_keys(self, index_key: str) -> int:
+        """
+        Deletes every key listed in a Redis set and removes them from the set.
+
+        Only the members read here are removed from the set, so a key registered
+        concurrently stays indexed for the next deletion.
+
+        :param index_key: The set listing the keys to delete.
+        :return: The number of keys deleted.
+        """
+        async with self.connect() as client:
+            keys = await client.smembers(index_key)
+            if not keys:
+                return 0
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.unlink(*keys)
+                pipe.srem(index_key, *keys)
+                await pipe.execute()
+            return len(keys)
+
+    async def delete_indexed_keys_batch(self, index_keys: list) -> int:
+        """
+        Same as `delete_indexed_keys` for several index sets, in two pipelined round trips.
+
+        :param index_keys: The sets listing the keys to delete.
+        :return: The number of keys deleted.
+        """
+        if not index_keys:
+            return 0
+        async with self.connect() as client:
+            async with client.pipeline(transaction=False) as pipe:
+                for index_key in index_keys:
+                    pipe.smembers(index_key)
+                members = await pipe.execute()
+            deleted = 0
+            async with client.pipeline(transaction=False) as pipe:
+                for index_key, keys in zip(index_keys, members):
+                    if keys:
+                        pipe.unlink(*keys)
+                        pipe.srem(index_key, *keys)
+                        deleted += len(keys)
+                await pipe.execute()
+            return deleted
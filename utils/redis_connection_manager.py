@@ -0,0 +1,43 @@
+import redis.asyncio as redis
+
+
+class RedisConnectionManager:
+    """
+    Owns the process-wide Redis connection pool.
+
+    A single instance is created in `utils.load_config.init_connections` and torn down in
+    `run_on_exit`, so every `RedisClient` borrows connections from the same pool instead of
+    opening (and closing) a TCP connection per key operation.
+    """
+
+    def __init__(self, redis_url: str, max_connections: int = 50, pool_timeout: float = 5.0,
+                 health_check_interval: int = 30, socket_timeout: float = 5.0,
+                 socket_connect_timeout: float = 5.0):
+        self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self.health_check_interval = health_check_interval
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self._connection_pool, self._client = self._setup_redis()
+
+    def get_client(self) -> redis.Redis:
+        return self._client
+
+    def _setup_redis(self):
+        connection_pool = redis.BlockingConnectionPool.from_url(
+            self.redis_url,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            health_check_interval=self.health_check_interval,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_keepalive=True,
+            decode_responses=True,
+        )
+        client = redis.Redis(connection_pool=connection_pool)
+        return connection_pool, client
+
+    async def close_connections(self):
+        await self._client.aclose()
+        await self._connection_pool.disconnect()
@@ -3,3 +3,28 @@ from enum import Enum
 
 class TransactionPaymentStatus(str, Enum):
     CAPTURED = "captured"
+
+
+class WebhookEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    DEAD = "dead"
+
+
+# Webhook event types and the `WebhookService` / `PaddleWebhookService` methods handling them.
+RAZORPAY_EVENT_HANDLERS = {
+    "subscription.activated": "handle_subscription_activated",
+    "payment.captured": "handle_payment_event",
+    "payment.failed": "handle_payment_event",
+    "subscription.cancelled": "handle_subscription_cancelled",
+    "invoice.paid": "handle_invoice_paid",
+    "invoice.expired": "handle_invoice_expired"
+}
+PADDLE_EVENT_HANDLERS = {
+    "transaction.completed": "handle_transaction_completed_failed",
+    "transaction.payment_failed": "handle_transaction_completed_failed",
+    "subscription.canceled": "handle_subscription_cancelled"
+}
+
+WEBHOOK_RETRY_MAX_DELAY = 3600
@@ -1,8 +1,19 @@
+import time
+from typing import List, Optional
+
 import uuid6
+from sqlalchemy import String, and_, cast, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 
 from config.logging import logger
 from payments.models import PSPName, Payments, PaymentStatus
+from prometheus.metrics import DB_QUERY_LATENCY
+from utils.decorators import latency
+from webhooks.constants import WebhookEventStatus
+from webhooks.exceptions import DuplicateWebhookEventError
+from webhooks.models import WebhookEvent
 
 
 class WebhookDAO:
@@ -31,3 +42,118 @@ class WebhookDAO:
         except Exception as e:
             logger.error("Error while recording subscription to DB: %s", str(e))
             raise e
+
+    @latency(metric=DB_QUERY_LATENCY)
+    async def has_payment(self, payment_id: str) -> bool:
+        """Whether a PSP payment was already recorded, so webhook retries do not record it twice."""
+        try:
+            result = await self.session.execute(
+                select(Payments.id).filter(Payments.psp_payment_id == payment_id).limit(1)
+            )
+            return result.scalar() is not None
+        except Exception as e:
+            logger.error("Error while fetching payment %s: %s", str(payment_id), str(e))
+            raise e
+
+    @latency(metric=DB_QUERY_LATENCY)
+    async def add_webhook_event(self, psp_name: PSPName, event_type: str, payload: dict,
+                                partition_key: Optional[str] = None, event_id: Optional[str] = None) -> WebhookEvent:
+        """
+        Stores a received webhook event in the inbox for the webhook workers.
+
+        :param partition_key: Events with the same key are processed one at a time, in order.
+        :param event_id: The PSP's ID of the event, unique per PSP.
+        :raises DuplicateWebhookEventError: If an event with the same ID was already stored.
+        """
+        try:
+            webhook_event = WebhookEvent(
+                id=uuid6.uuid6(),
+                psp_name=psp_name,
+                event_id=event_id,
+                event_type=event_type,
+                partition_key=partition_key,
+                payload=payload,
+                status=WebhookEventStatus.PENDING.value,
+                attempts=0,
+                next_attempt_at=int(time.time())
+            )
+            self.session.add(webhook_event)
+            await self.session.commit()
+            return webhook_event
+        except IntegrityError:
+            await self.session.rollback()
+            logger.info("Duplicate %s webhook event %s ignored", psp_name.value, event_id)
+            raise DuplicateWebhookEventError(event_id)
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error while storing %s webhook event %s: %s", psp_name.value, event_type, str(e))
+            raise e
+
+    @latency(metric=DB_QUERY_LATENCY)
+    async def claim_webhook_events(self, limit: int, lease_timeout: int) -> List[WebhookEvent]:
+        """
+        Claims up to `limit` due events for `lease_timeout` seconds.
+
+        Only the oldest unfinished (pending or processing) event of a partition is claimable, so
+        a subscription's events run one at a time and in order while different subscriptions run
+        in parallel. An event waiting for a retry holds back the rest of its partition until it
+        is processed or moved to the dead letters. An event whose worker died without reporting
+        back becomes due again once its lease expires.
+        """
+        try:
+            now = int(time.time())
+            is_unfinished = WebhookEvent.status.in_(
+                [WebhookEventStatus.PENDING.value, WebhookEventStatus.PROCESSING.value]
+            )
+            is_due = and_(is_unfinished, WebhookEvent.next_attempt_at <= now)
+            partition = func.coalesce(WebhookEvent.partition_key, cast(WebhookEvent.id, String))
+            partition_heads = (
+                select(WebhookEvent.id, WebhookEvent.next_attempt_at, WebhookEvent.created_at)
+                .where(is_unfinished)
+                .distinct(partition)
+                .order_by(partition, WebhookEvent.created_at, WebhookEvent.id)
+                .subquery()
+            )
+            claimable_events = (
+                select(partition_heads.c.id)
+                .where(partition_heads.c.next_attempt_at <= now)
+                .order_by(partition_heads.c.next_attempt_at, partition_heads.c.created_at)
+                .limit(limit)
+            )
+            # `is_due` is checked again against the locked row, so an event claimed by a
+            # concurrent worker in the meantime is skipped rather than claimed twice.
+            result = await self.session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_(claimable_events.scalar_subquery()), is_due)
+                .values(status=WebhookEventStatus.PROCESSING.value, attempts=WebhookEvent.attempts + 1,
+                        next_attempt_at=now + lease_timeout)
+                .returning(WebhookEvent)
+                .execution_options(synchronize_session=False)
+            )
+            webhook_events = result.scalars().all()
+            await self.session.commit()
+            return webhook_events
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error while claiming webhook events: %s", str(e))
+            raise e
+
+    @latency(metric=DB_QUERY_LATENCY)
+    async def complete_webhook_event(self, webhook_event_id, status: WebhookEventStatus,
+                                     next_attempt_at: int = None, error: str = None):
+        """
+        Records the outcome of an attempt: `processed`, `pending` again with the time of the
+        next attempt, or `dead`.
+        """
+        try:
+            values = {"status": status.value, "last_error": error}
+            if next_attempt_at is not None:
+                values["next_attempt_at"] = next_attempt_at
+            await self.session.execute(
+                update(WebhookEvent).where(WebhookEvent.id == webhook_event_id).values(**values)
+            )
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Error while updating webhook event %s: %s", str(webhook_event_id), str(e))
+            raise e
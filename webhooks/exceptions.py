@@ -0,0 +1,5 @@
+class DuplicateWebhookEventError(Exception):
+    """Raised when a PSP redelivers a webhook event that is already in the inbox."""
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        super().__init__(f"Webhook event '{event_id}' was already received.")
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from config.logging import logger
+from config.settings import loaded_config
+from payments.models import PSPName
+from utils.connection_handler import ConnectionHandler
+from utils.redis_client import RedisClient
+from webhooks.dao import WebhookDAO
+from webhooks.exceptions import DuplicateWebhookEventError
+from webhooks.utils import get_webhook_partition_key
+
+
+def get_webhook_event_key(psp_name: PSPName, event_id: str) -> str:
+    return f"webhook_event:{psp_name.value}:{event_id}"
+
+
+async def store_webhook_event(connection_handler: ConnectionHandler, psp_name: PSPName, event_type: str,
+                              event_id: Optional[str], payload: dict) -> bool:
+    """
+    Stores a received event in the webhook inbox unless its PSP event ID was already received.
+
+    The unique (psp_name, event_id) constraint of the inbox decides whether an event is new. Once
+    it is stored, the ID is also recorded in Redis for `webhook_dedup_ttl`, so later redeliveries
+    are acknowledged without touching the database. The Redis key is only written after the inbox
+    row is committed: a request cancelled in between leaves no key behind that would make the
+    PSP's retry look like a duplicate. Events without an ID are always stored.
+
+    :return: False if the event is a duplicate.
+    """
+    redis_client = RedisClient()
+    event_key = get_webhook_event_key(psp_name, event_id) if event_id else None
+    if event_key:
+        try:
+            if await redis_client.exists_key(event_key):
+                return False
+        except RedisError as e:
+            logger.warning("Webhook deduplication store unavailable, relying on the inbox constraint: %s", str(e))
+            event_key = None
+
+    try:
+        await WebhookDAO(session=connection_handler.session).add_webhook_event(
+            psp_name, event_type, payload, get_webhook_partition_key(psp_name, payload), event_id
+        )
+        is_new_event = True
+    except DuplicateWebhookEventError:
+        is_new_event = False
+
+    if event_key:
+        try:
+            await redis_client.add_key(event_key, "1", loaded_config.webhook_dedup_ttl)
+        except RedisError as e:
+            logger.warning("Failed to record webhook event %s as received: %s", event_id, str(e))
+    return is_new_event
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, UUID, Enum, Integer, Index, JSON, UniqueConstraint
+
+from payments.models import PSPName
+from utils.sqlalchemy import Base, TimestampMixin
+
+
+class WebhookEvent(TimestampMixin, Base):
+    """
+    Inbox of received webhook events. Events are stored before the PSP is acknowledged and
+    drained by the webhook workers; events out of attempts stay behind with status `dead`.
+
+    Events sharing a `partition_key` (the PSP subscription) are never processed concurrently
+    and are claimed in arrival order.
+    """
+    __tablename__ = 'webhook_events'
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    psp_name = Column(Enum(PSPName), nullable=False)
+    event_id = Column(String, nullable=True)
+    event_type = Column(String, nullable=False)
+    partition_key = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(Integer, nullable=False)  # Epoch time
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index('ix_webhook_events_status_next_attempt_at', 'status', 'next_attempt_at'),
+        Index('ix_webhook_events_partition_key_status', 'partition_key', 'status'),
+        UniqueConstraint('psp_name', 'event_id', name='uq_webhook_events_psp_name_event_id'),
+    )
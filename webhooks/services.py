@@ -1,4 +1,3 @@
-import asyncio
 import time
 from datetime import datetime
 from fastapi import HTTPException, status
@@ -8,6 +7,7 @@ from config.settings import loaded_config
 from integrations.paddle_client import PaddleClient
 from integrations.razorpay_client import RazorpayClient
 from invoices.dao import InvoicesDAO
+from invoices.exceptions import InvoiceNotFoundError
 from payments.dao import PaymentsDAO
 from payments.models import PaymentStatus, Subscriptions, PSPName
 from plans.dao import PlansDAO
@@ -33,10 +33,16 @@ class WebhookService:
         self.redis_client = RedisClient()
 
     async def handle_subscription_activated(self, payload):
-        """Handle the 'subscription.activated' webhook event."""
+        """
+        Handle the 'subscription.activated' webhook event.
+
+        Every step only sets state (the Basic subscription is looked up among active ones), so
+        a retry after a failure part way through converges to the same result.
+        """
         try:
             subscription_data = payload.get("payload", {}).get("subscription", {}).get("entity", {})
             subscription_id = subscription_data.get("id")
+            await self.razorpay_client.invalidate_subscription_details(subscription_id)
             subscription = await self.payments_dao.get_subscription_by_razorpay_id(subscription_id)
 
             if not subscription:
@@ -50,6 +56,10 @@ class WebhookService:
                 basic_subscription_of_user.status = "cancelled"
                 await self.payments_dao.update_subscription(basic_subscription_of_user)
 
+            subscription.current_start = subscription_data.get("current_start")
+            subscription.current_end = subscription_data.get("current_end")
+            await self.payments_dao.update_subscription(subscription)
+
             invoice_by_subscription = await self.invoices_dao.get_latest_invoice_by_subscription_id(
                 str(subscription.id))
             if invoice_by_subscription:
@@ -76,8 +86,10 @@ class WebhookService:
             currency = payment_data.get("currency")
             payment_status = payment_data.get("status")
 
+            # An issued invoice's amount and billing period do not change, so a cached copy is good enough.
             invoice_details = await self.razorpay_client.get_invoice_details(invoice_id)
             subscription_id = invoice_details.get("subscription_id")
+            await self.razorpay_client.invalidate_subscription_details(subscription_id)
             subscription = await self.payments_dao.get_subscription_by_razorpay_id(subscription_id)
 
             if not subscription:
@@ -86,23 +98,30 @@ class WebhookService:
 
             user_id = subscription.user_id
             org_id = subscription.org_id
-            subscription_details = await self.razorpay_client.get_subscription_details(subscription.psp_subscription_id)
+            subscription.current_start, subscription.current_end = await self._get_billing_period(
+                subscription, invoice_details)
+            await self.payments_dao.update_subscription(subscription)
 
-            if payment_status == PaymentStatus.CAPTURED.value:
+            # Webhook events are retried after a failure, so skip what an earlier attempt recorded.
+            if (payment_status == PaymentStatus.CAPTURED.value
+                    and not await self.invoices_dao.has_invoice_for_transaction(payment_id)):
                 await self.invoices_dao.create_invoice(
                     subscription.id,
                     invoice_id,
                     int(float(invoice_details["amount"]) / 100),
                     invoice_details["currency"],
                     invoice_details["status"],
-                    subscription_details["current_end"],
+                    subscription.current_end,
                     user_id,
                     org_id,
-                    invoice_details["short_url"]
+                    invoice_details["short_url"],
+                    payment_id,
+                    PSPName.RAZORPAY.name
                 )
 
-            await self.webhook_dao.record_payment_details(user_id, org_id, subscription.id, created_at, amount,
-                                                          currency, payment_id, payment_status)
+            if not await self.webhook_dao.has_payment(payment_id):
+                await self.webhook_dao.record_payment_details(user_id, org_id, subscription.id, created_at, amount,
+                                                              currency, payment_id, payment_status)
 
         except Exception as e:
             await self.connection_handler.session.rollback()
@@ -115,6 +134,7 @@ class WebhookService:
             end_date = int(time.time())
             subscription_data = payload.get("payload", {}).get("subscription", {}).get("entity", {})
             subscription_id = subscription_data.get("id")
+            await self.razorpay_client.invalidate_subscription_details(subscription_id)
             subscription = await self.payments_dao.get_subscription_by_razorpay_id(subscription_id)
 
             if not subscription:
@@ -132,34 +152,51 @@ class WebhookService:
             raise e
 
     async def handle_invoice_paid(self, payload):
-        """Handle the 'invoice.paid' webhook event."""
+        """
+        Handle the 'invoice.paid' webhook event.
+
+        Razorpay does not order invoice.paid after the payment.captured of the invoice, so an
+        invoice payment.captured has not recorded yet is recorded from the event itself; the
+        later payment.captured then finds it and only records the payment.
+        """
         try:
             invoice_data = payload.get("payload", {}).get("invoice", {}).get("entity", {})
             invoice_id = invoice_data.get("id")
             subscription_id = invoice_data.get("subscription_id")
             invoice_status = invoice_data.get("status")
+            await self.razorpay_client.invalidate_invoice_details(invoice_id)
+            await self.razorpay_client.invalidate_subscription_details(subscription_id)
 
             subscription = await self.payments_dao.get_subscription_by_razorpay_id(subscription_id)
-            subscription_details = await self.razorpay_client.get_subscription_details(subscription.psp_subscription_id)
-
             if not subscription:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail=f"Subscription with ID {subscription_id} not found")
-            for attempt in range(5):
-                try:
-                    invoice = await self.invoices_dao.get_invoice_by_psp_id(invoice_id)
-                    if invoice:
-                        break
-                    await asyncio.sleep(1)
-                except Exception:
-                    await asyncio.sleep(1)
-            await self.invoices_dao.update_invoice_status(
-                invoice_id=invoice_id,
-                status=invoice_status,
-                next_due_date=subscription_details["current_end"]
-            )
+            current_start, current_end = await self._get_billing_period(subscription, invoice_data)
+
+            try:
+                await self.invoices_dao.update_invoice_status(
+                    invoice_id=invoice_id,
+                    status=invoice_status,
+                    next_due_date=current_end
+                )
+            except InvoiceNotFoundError:
+                await self.invoices_dao.create_invoice(
+                    subscription.id,
+                    invoice_id,
+                    int(float(invoice_data["amount"]) / 100),
+                    invoice_data["currency"],
+                    invoice_status,
+                    current_end,
+                    subscription.user_id,
+                    subscription.org_id,
+                    invoice_data.get("short_url"),
+                    invoice_data.get("payment_id"),
+                    PSPName.RAZORPAY.name
+                )
             subscription.status = "active"
             subscription.is_active = True
+            subscription.current_start = current_start
+            subscription.current_end = current_end
             await self.payments_dao.update_subscription(subscription)
             logger.info("Invoice marked as paid")
         except Exception as e:
@@ -167,17 +204,37 @@ class WebhookService:
             logger.error("Error handling invoice.paid webhook: %s", str(e))
             raise e
 
+    async def _get_billing_period(self, subscription, invoice_details):
+        """
+        Billing period a subscription invoice was issued for.
+
+        Razorpay includes it in the invoice as billing_start / billing_end, so the subscription is
+        only fetched when an invoice comes without it.
+
+        :param subscription: The subscription the invoice belongs to.
+        :param invoice_details: The Razorpay invoice entity.
+        :return: (current_start, current_end) epoch seconds.
+        """
+        if invoice_details.get("billing_end"):
+            return invoice_details.get("billing_start"), invoice_details["billing_end"]
+        subscription_details = await self.razorpay_client.get_subscription_details(subscription.psp_subscription_id)
+        return subscription_details.get("current_start"), subscription_details.get("current_end")
+
     async def handle_invoice_expired(self, payload):
         """
         Handle the 'invoice.expired' webhook event.
 
         This function processes the invoice expiration payload and cancels the associated subscription via Razorpay API.
 
+        The subscription is only cancelled at Razorpay while it has no end date, so a retried
+        event does not cancel it again.
+
         :param payload: The webhook payload containing invoice details.
         """
         invoice_data = payload.get("payload", {}).get("invoice", {}).get("entity", {})
         invoice_id = invoice_data.get("id")
         subscription_id = invoice_data.get("subscription_id")
+        await self.razorpay_client.invalidate_invoice_details(invoice_id)
 
         subscription = await self.payments_dao.get_subscription_by_razorpay_id(subscription_id)
 
@@ -188,19 +245,21 @@ class WebhookService:
             )
 
         try:
-            razorpay_response = await self.razorpay_client.end_subscription(subscription_id)
-            logger.info(f"Subscription {subscription_id} cancelled via Razorpay due to invoice expiration.")
-            await self.invoices_dao.update_invoice_status(invoice_id, "failed", None)
-            subscription.end_date = int(time.time())
-            subscription.status = razorpay_response.get("status", "cancelled")
-            await self.payments_dao.update_subscription(subscription)
+            if subscription.end_date is None:
+                razorpay_response = await self.razorpay_client.end_subscription(subscription_id)
+                logger.info(f"Subscription {subscription_id} cancelled via Razorpay due to invoice expiration.")
+                subscription.end_date = int(time.time())
+                subscription.status = razorpay_response.get("status", "cancelled")
+                await self.payments_dao.update_subscription(subscription)
+            try:
+                await self.invoices_dao.update_invoice_status(invoice_id, "failed", None)
+            except InvoiceNotFoundError:
+                # Invoices are recorded once paid, an invoice that expired unpaid has none to update.
+                logger.info("No invoice recorded for expired invoice %s", invoice_id)
         except Exception as e:
             await self.connection_handler.session.rollback()
             logger.error("Error cancelling subscription %s via Razorpay: %s", str(subscription_id), str(e))
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to cancel subscription {subscription_id} via Razorpay due to invoice expiration."
-            )
+            raise e
 
 
 class PaddleWebhookService:
@@ -220,6 +279,8 @@ class PaddleWebhookService:
             data = event.get("data")
             custom_data = data.get("custom_data")
             is_payment_successful = data["payments"][0]["status"] == TransactionPaymentStatus.CAPTURED
+            if data.get("subscription_id"):
+                await self.paddle_client.invalidate_subscription_details(data["subscription_id"])
 
             if custom_data and custom_data["subscription_id"]:
                 subscription: Subscriptions = await self.payments_dao.get_subscription_by_id(
@@ -230,48 +291,48 @@ class PaddleWebhookService:
                     psp_subscription_id=data.get("subscription_id"))
             subscription.is_active = is_payment_successful
             subscription.status = "active" if is_payment_successful else "failed"
+            if data["billing_period"]:
+                subscription.current_start, subscription.current_end = PaddleClient.parse_billing_period(
+                    data["billing_period"])
+                next_due = subscription.current_end
             await self.payments_dao.update_subscription(subscription=subscription)
 
-            invoice_retries = 3
-            while invoice_retries > 0:
-                if data.get("invoice_id"):
-                    try:
-                        invoice = await self.paddle_client.get_transaction_invoice(transaction_id=data["id"])
-                        invoice_url = invoice.get("data").get("url") if invoice and invoice.get("data") else ""
-                        break
-                    except Exception as exp:
-                        logger.info(f"Failed to get invoice for transaction: {data['id']}")
+            if data.get("invoice_id"):
+                try:
+                    invoice = await self.paddle_client.get_transaction_invoice(transaction_id=data["id"])
+                    invoice_url = invoice.get("data").get("url") if invoice and invoice.get("data") else ""
+                except Exception as exp:
+                    logger.info(f"Failed to get invoice for transaction: {data['id']}")
 
-            if data["billing_period"]:
-                dt = datetime.strptime(data["billing_period"]["ends_at"], "%Y-%m-%dT%H:%M:%S.%fZ")
-                next_due = dt.timestamp()
-
-            await self.invoices_dao.create_invoice(
-                subscription_id=subscription.id,
-                invoice_id=data.get("invoice_id"),
-                amount=subscription.amount,
-                currency=subscription.currency,
-                status="paid" if is_payment_successful else "failed",
-                next_due=next_due,
-                user_id=subscription.user_id,
-                org_id=subscription.org_id,
-                short_url=invoice_url,
-                transaction_id=data["id"],
-                psp_name=PSPName.PADDLE.name
-            )
+            # Webhook events are retried after a failure, so skip what an earlier attempt recorded.
+            if not await self.invoices_dao.has_invoice_for_transaction(data["id"]):
+                await self.invoices_dao.create_invoice(
+                    subscription_id=subscription.id,
+                    invoice_id=data.get("invoice_id"),
+                    amount=subscription.amount,
+                    currency=subscription.currency,
+                    status="paid" if is_payment_successful else "failed",
+                    next_due=next_due,
+                    user_id=subscription.user_id,
+                    org_id=subscription.org_id,
+                    short_url=invoice_url,
+                    transaction_id=data["id"],
+                    psp_name=PSPName.PADDLE.name
+                )
 
-            dt = datetime.strptime(data["created_at"], "%Y-%m-%dT%H:%M:%S.%fZ")
-            await self.webhook_dao.record_payment_details(
-                user_id=subscription.user_id,
-                org_id=subscription.org_id,
-                subscription_id=subscription.id,
-                amount=subscription.amount,
-                currency=subscription.currency,
-                payment_id=data.get("id"),
-                payment_status=PaymentStatus.CAPTURED if is_payment_successful else PaymentStatus.FAILED,
-                created_at=dt.timestamp(),
-                psp_name=PSPName.PADDLE
-            )
+            if not await self.webhook_dao.has_payment(data["id"]):
+                dt = datetime.strptime(data["created_at"], "%Y-%m-%dT%H:%M:%S.%fZ")
+                await self.webhook_dao.record_payment_details(
+                    user_id=subscription.user_id,
+                    org_id=subscription.org_id,
+                    subscription_id=subscription.id,
+                    amount=subscription.amount,
+                    currency=subscription.currency,
+                    payment_id=data.get("id"),
+                    payment_status=PaymentStatus.CAPTURED if is_payment_successful else PaymentStatus.FAILED,
+                    created_at=dt.timestamp(),
+                    psp_name=PSPName.PADDLE
+                )
             if not is_payment_successful:
                 logger.info(
                     f"Payment attempt is not successful for transaction {data.get('id')} "
@@ -305,6 +366,7 @@ class PaddleWebhookService:
             end_date = int(time.time())
             subscription_data = event.get("data")
             subscription_id = subscription_data.get("id")
+            await self.paddle_client.invalidate_subscription_details(subscription_id)
             subscription = await self.payments_dao.get_subscription_by_psp_subscription_id(subscription_id)
 
             if not subscription:
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from payments.models import PSPName
+
+
+def get_webhook_partition_key(psp_name: PSPName, payload: dict) -> Optional[str]:
+    """
+    Returns the key webhook events are ordered by, read from the payload alone so storing an
+    event never waits on the PSP: the PSP subscription ID of the event when it carries one,
+    otherwise the ID of its invoice or payment.
+
+    Razorpay payment entities carry no subscription ID, so a `payment.captured` is keyed on its
+    invoice and not ordered with the other events of its subscription; the handlers do not rely
+    on that order.
+    """
+    if psp_name == PSPName.PADDLE:
+        data = payload.get("data") or {}
+        if str(payload.get("event_type", "")).startswith("subscription."):
+            return data.get("id")
+        return data.get("subscription_id") or (data.get("custom_data") or {}).get("subscription_id")
+
+    entities = payload.get("payload") or {}
+    subscription = (entities.get("subscription") or {}).get("entity") or {}
+    invoice = (entities.get("invoice") or {}).get("entity") or {}
+    payment = (entities.get("payment") or {}).get("entity") or {}
+    return (subscription.get("id") or invoice.get("subscription_id") or payment.get("subscription_id")
+            or invoice.get("id") or payment.get("invoice_id") or payment.get("id"))
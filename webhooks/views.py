@@ -1,40 +1,38 @@
-from fastapi import HTTPException, Request, BackgroundTasks
+from fastapi import HTTPException, Request
 from fastapi.params import Depends
 
 from config.logging import logger, get_call_stack
+from payments.models import PSPName
 from utils.connection_handler import get_connection_handler_for_app, ConnectionHandler
-from webhooks.services import WebhookService, PaddleWebhookService
+from webhooks.constants import PADDLE_EVENT_HANDLERS, RAZORPAY_EVENT_HANDLERS
+from webhooks.idempotency import store_webhook_event
+from webhooks.worker import notify_webhook_workers
 
 
 async def capture_razorpay_webhook(
         request: Request,
-        background_tasks: BackgroundTasks,
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app)
 ):
+    """
+    Stores the event in the webhook inbox and acknowledges it, the webhook workers handle it.
+    Redeliveries of an event already received are acknowledged without being stored again.
+    """
     try:
         payload = await request.json()
         logger.info(f"Received Razorpay webhook: {payload}")
         event = payload.get("event")
 
-        webhook_service = WebhookService(connection_handler=connection_handler)
-
-        event_mapper = {
-            "subscription.activated": webhook_service.handle_subscription_activated,
-            "payment.captured": webhook_service.handle_payment_event,
-            "payment.failed": webhook_service.handle_payment_event,
-            "subscription.cancelled": webhook_service.handle_subscription_cancelled,
-            "invoice.paid": webhook_service.handle_invoice_paid,
-            "invoice.expired": webhook_service.handle_invoice_expired
-        }
-
-        handler = event_mapper.get(event)
-        if handler:
-            background_tasks.add_task(handler, payload)
-        else:
+        if event not in RAZORPAY_EVENT_HANDLERS:
             logger.warning("Unhandled event type: %s", str(event))
             return {"status": "ignored", "message": f"Unhandled event type: {event}"}
 
-        logger.info("Processed Razorpay event: %s", str(event))
+        if not await store_webhook_event(connection_handler, PSPName.RAZORPAY, event,
+                                         request.headers.get("X-Razorpay-Event-Id"), payload):
+            logger.info("Duplicate Razorpay event: %s", str(event))
+            return {"status": "duplicate", "message": "Webhook already received"}
+        notify_webhook_workers()
+
+        logger.info("Queued Razorpay event: %s", str(event))
         return {"status": "success", "message": "Webhook processed successfully"}
 
     except Exception as e:
@@ -44,25 +42,29 @@ async def capture_razorpay_webhook(
 
 async def capture_paddle_webhook(
         request: Request,
-        background_tasks: BackgroundTasks,
         connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app)
 ):
-    event = await request.json()
-    # print("event >> ", event)
-    event_type = event.get("event_type")
+    """
+    Stores the event in the webhook inbox and acknowledges it, the webhook workers handle it.
+    Redeliveries of an event already received are acknowledged without being stored again.
+    """
+    try:
+        event = await request.json()
+        event_type = event.get("event_type")
+
+        if event_type not in PADDLE_EVENT_HANDLERS:
+            logger.warning("Unhandled event type: %s", str(event))
+            return {"status": "ignored", "message": f"Unhandled event type: {event}"}
 
-    webhook_service = PaddleWebhookService(connection_handler=connection_handler)
-    event_mapper = {
-        "transaction.completed": webhook_service.handle_transaction_completed_failed,
-        "transaction.payment_failed": webhook_service.handle_transaction_completed_failed,
-        "subscription.canceled": webhook_service.handle_subscription_cancelled
-    }
+        if not await store_webhook_event(connection_handler, PSPName.PADDLE, event_type,
+                                         event.get("event_id"), event):
+            logger.info("Duplicate Paddle event: %s", str(event_type))
+            return {"status": "duplicate", "message": "Webhook already received"}
+        notify_webhook_workers()
 
-    handler = event_mapper.get(event_type)
-    if handler:
-        background_tasks.add_task(handler, event)
-    else:
-        logger.warning("Unhandled event type: %s", str(event))
-        return {"status": "ignored", "message": f"Unhandled event type: {event}"}
+        logger.info("Queued Paddle event: %s", str(event_type))
+        return {"status": "success", "message": "Webhook processed successfully"}
 
-    pass
+    except Exception as e:
+        logger.error("Error processing Paddle webhook: %s", str(e), call_stack=get_call_stack())
+        raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -0,0 +1,129 @@
+import asyncio
+import random
+import time
+
+import httpx
+from redis.exceptions import RedisError
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from config.logging import logger
+from config.settings import loaded_config
+from integrations.base_client import PSPRequestError
+from payments.models import PSPName
+from prometheus.metrics import WEBHOOK_EVENTS_PROCESSED
+from utils.circuit_breaker import CircuitBreakerOpenError
+from utils.connection_handler import connection_handler_scope
+from webhooks.constants import (
+    PADDLE_EVENT_HANDLERS,
+    RAZORPAY_EVENT_HANDLERS,
+    WEBHOOK_RETRY_MAX_DELAY,
+    WebhookEventStatus
+)
+from webhooks.dao import WebhookDAO
+from webhooks.models import WebhookEvent
+from webhooks.services import PaddleWebhookService, WebhookService
+
+# Failures that may not happen again on a later attempt because a dependency was unavailable.
+# Handlers do not depend on the order of events, so an event is never retried waiting for another
+# one of its partition, which it would hold back.
+RETRYABLE_WEBHOOK_ERRORS = (
+    asyncio.TimeoutError, httpx.RequestError, CircuitBreakerOpenError, OperationalError, InterfaceError, RedisError
+)
+
+# Set when this process stores an event, so idle workers pick it up without waiting for the next poll.
+webhook_events_available = asyncio.Event()
+
+
+def notify_webhook_workers():
+    webhook_events_available.set()
+
+
+async def run_webhook_workers():
+    """
+    Drains the webhook inbox with at most `webhook_worker_concurrency` events in flight.
+
+    The inbox is polled every `webhook_poll_interval` seconds, and right away when this process
+    stores an event. Events still in flight when the workers stop are retried by whichever
+    worker claims them once their lease expires.
+    """
+    concurrency = loaded_config.webhook_worker_concurrency
+    in_flight = set()
+    try:
+        while True:
+            free_workers = concurrency - len(in_flight)
+            webhook_events = []
+            if free_workers:
+                webhook_events_available.clear()
+                try:
+                    async with connection_handler_scope() as connection_handler:
+                        webhook_events = await WebhookDAO(connection_handler.session).claim_webhook_events(
+                            free_workers, loaded_config.webhook_lease_timeout
+                        )
+                except Exception as e:
+                    logger.error("Failed to claim webhook events: %s", str(e))
+
+            for webhook_event in webhook_events:
+                task = asyncio.create_task(process_webhook_event(webhook_event))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if len(in_flight) >= concurrency:
+                await asyncio.wait(in_flight, timeout=loaded_config.webhook_poll_interval,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            elif len(webhook_events) < free_workers:
+                try:
+                    await asyncio.wait_for(webhook_events_available.wait(), loaded_config.webhook_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+async def process_webhook_event(webhook_event: WebhookEvent):
+    """
+    Runs the handler of a claimed event, then marks it processed, schedules its next attempt
+    with jittered exponential backoff, or moves it to the dead letters.
+
+    Only failures `is_retryable_webhook_error` accepts are retried, up to `webhook_max_attempts`
+    attempts; any other failure would happen again and goes to the dead letters right away.
+    """
+    try:
+        async with connection_handler_scope() as connection_handler:
+            await get_webhook_handler(webhook_event, connection_handler)(webhook_event.payload)
+        status, next_attempt_at, error = WebhookEventStatus.PROCESSED, None, None
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        if not is_retryable_webhook_error(e) or webhook_event.attempts >= loaded_config.webhook_max_attempts:
+            status, next_attempt_at = WebhookEventStatus.DEAD, None
+            logger.error("Webhook event %s (%s) moved to dead letters after %d attempts: %s",
+                         str(webhook_event.id), webhook_event.event_type, webhook_event.attempts, error)
+        else:
+            delay = min(loaded_config.webhook_retry_base_delay * 2 ** (webhook_event.attempts - 1),
+                        WEBHOOK_RETRY_MAX_DELAY)
+            status, next_attempt_at = WebhookEventStatus.PENDING, int(time.time() + random.uniform(0.5, 1) * delay)
+            logger.warning("Webhook event %s (%s) failed on attempt %d, retrying: %s",
+                           str(webhook_event.id), webhook_event.event_type, webhook_event.attempts, error)
+
+    WEBHOOK_EVENTS_PROCESSED.labels(psp=webhook_event.psp_name.value, event_type=webhook_event.event_type,
+                                    status=status.value, service_name="wayne").inc()
+    async with connection_handler_scope() as connection_handler:
+        await WebhookDAO(connection_handler.session).complete_webhook_event(
+            webhook_event.id, status, next_attempt_at, error
+        )
+
+
+def is_retryable_webhook_error(error: Exception) -> bool:
+    if isinstance(error, PSPRequestError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, RETRYABLE_WEBHOOK_ERRORS)
+
+
+def get_webhook_handler(webhook_event: WebhookEvent, connection_handler):
+    if webhook_event.psp_name == PSPName.PADDLE:
+        return getattr(PaddleWebhookService(connection_handler=connection_handler),
+                       PADDLE_EVENT_HANDLERS[webhook_event.event_type])
+    return getattr(WebhookService(connection_handler=connection_handler),
+                   RAZORPAY_EVENT_HANDLERS[webhook_event.event_type])